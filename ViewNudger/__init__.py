@@ -1,13 +1,13 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-__title__ = 'ViewNudger'
-__author__ = 'Christopher DeVito'
-__email__ = 'chrisdevito@chribis.com'
-__url__ = 'https://github.com/chrisdevito/ViewNudger'
-__version__ = '0.1.12'
-__license__ = 'MIT'
-__description__ = '''A Maya Camera or Object pixel nudger.'''
-
-from .logger import myLogger
-log = myLogger(debug=True)
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+__title__ = 'ViewNudger'
+__author__ = 'Christopher DeVito'
+__email__ = 'chrisdevito@chribis.com'
+__url__ = 'https://github.com/chrisdevito/ViewNudger'
+__version__ = '0.1.12'
+__license__ = 'MIT'
+__description__ = '''A Maya Camera or Object pixel nudger.'''
+
+from .logger import myLogger
+log = myLogger()
@@ -1,391 +1,2086 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-from __future__ import division
-
-import logging
-
-try:
-    from maya import cmds
-    from maya import OpenMaya
-    from maya import OpenMayaUI
-
-    from PySide import QtGui, QtCore, QtTest
-    import shiboken
-except:
-    pass
-
-log = logging.getLogger('ViewNudger')
-
-
-def getRenderer(view):
-    """
-    Gets the current renderer in viewport.
-
-    :param view: View to convert point.
-    :type view: OpenMaya.M3dView
-
-    :raises: None
-
-    :return: Name of current renderer.
-    :rtype: str
-    """
-    panelName = OpenMayaUI.MQtUtil.fullName(long(view.widget()))[:-1]
-    return cmds.modelEditor(panelName, q=True, rnm=True)
-
-
-def getSelection():
-    """
-    Gets the current selection.
-
-    :raises RuntimeError: If nothing selected.
-
-    :return: First index of object selected
-    :rtype: str
-    """
-    sel = cmds.ls(selection=True, type="transform")
-
-    if not sel:
-        log.error("Nothing selected!")
-        raise RuntimeError("Nothing selected!")
-
-    return sel[0]
-
-
-def parseArgs(transformName,
-              view=None):
-    """
-    Checks input values.
-
-    :param transformName: Name of a transform to nudge from.
-    :type transformName: str
-    :param view: Optional desired M3dView.
-    :type view: OpenMaya.M3dView or Str
-
-    :raises RuntimeError: If transformName isn't a transform or doesn't exist.
-    :raises RuntimeError: If view set is not a view.
-
-    :return: view
-    :rtype: OpenMaya.M3dView
-    """
-    if not transformName:
-        log.error("No transformName supplied.")
-        raise
-
-    if not cmds.objExists(transformName) or \
-            not cmds.nodeType(transformName) == "transform":
-
-        log.error("%s either does not exist or"
-                  " isn't a transform.")
-        raise
-
-    if not view:
-        log.debug("Getting active view...")
-        view = OpenMayaUI.M3dView.active3dView()
-
-    else:
-        if not type(view) is OpenMayaUI.M3dView and type(view) is str:
-
-            log.debug("Converting %s to OpenMayaUI.M3dView..." % view)
-
-            viewStr = view
-            view = OpenMayaUI.M3dView()
-
-            try:
-                OpenMayaUI.M3dView.getM3dViewFromModelPanel(
-                    viewStr, view)
-
-            except:
-                log.error("%s is not a model panel or view." % view)
-                raise
-
-        else:
-            log.error("%s is not a view." % view)
-            raise
-
-    return view
-
-
-def nudge(transformName=None,
-          pixelAmount=[1.0, 1.0],
-          moveObject=False,
-          rotateView=False,
-          view=None):
-    """
-    Moves object/camera by pixel amount in x and y.
-
-    :param transformName: Name of a transform to nudge from.
-    :type transformName: str
-    :param pixelAmount: Pixel amount to nudge in x and y.
-    :type pixelAmount: list of 2 floats
-    :param moveObject: Move the object instead of view.
-    :type moveObject: bool
-    :param rotateView: Rotate the camera back at point after nudge.
-    :type rotateView: bool
-    :param view: View to calculate nudge one.
-    :type view: OpenMaya.M3dView
-
-    :raises: None
-
-    :return: None
-    :rtype: NoneType
-    """
-    view = parseArgs(transformName,
-                     view=view)
-    renderer = getRenderer(view)
-
-    fnCamera, cameraTransform = getCamera(view)
-    cameraPoint = OpenMaya.MPoint(*cmds.xform(
-        cameraTransform.fullPathName(),
-        query=True,
-        worldSpace=True,
-        translation=True))
-
-    transformPoint = OpenMaya.MPoint(*cmds.xform(
-        transformName,
-        query=True,
-        worldSpace=True,
-        translation=True))
-
-    startDirVec = (cameraPoint - transformPoint)
-    pointDist = startDirVec.length()
-    startDirVec.normalize()
-
-    log.debug("Object is being moved by %s, %s..." % (
-        pixelAmount[0], pixelAmount[1]))
-
-    x, y = worldToScreen(fnCamera=fnCamera,
-                         cameraPoint=cameraPoint,
-                         transformPoint=transformPoint,
-                         view=view)
-
-    log.debug("Object is %s, %s in screen space..." % (x, y))
-
-    xyz = screenToWorld(fnCamera=fnCamera,
-                        point2D=[x + pixelAmount[0], y + pixelAmount[1]],
-                        cameraPoint=cameraPoint,
-                        setDistance=pointDist,
-                        view=view)
-
-    cmds.undoInfo(openChunk=True)
-
-    if moveObject:
-
-        cmds.xform(transformName,
-                   translation=[xyz.x, xyz.y, xyz.z],
-                   worldSpace=True)
-
-    else:
-
-        if rotateView:
-
-            loc = cmds.spaceLocator(name="cameraLoc")[0]
-
-            cmds.delete(cmds.parentConstraint(
-                cameraTransform.fullPathName(), loc))
-
-            locName = cmds.parent(loc, cameraTransform.fullPathName())[0]
-
-            cmds.aimConstraint(transformName, locName,
-                               aimVector=[0.0, 0.0, -1.0],
-                               upVector=[0.0, 1.0, 0.0],
-                               worldUpType="object",
-                               worldUpObject=cameraTransform.fullPathName(),
-                               maintainOffset=True)
-
-        offset = (xyz - transformPoint)
-
-        cmds.xform(cameraTransform.fullPathName(),
-                   translation=[offset.x, offset.y, offset.z],
-                   relative=True)
-
-        if rotateView:
-
-            rot = cmds.xform(
-                locName, query=True, rotation=True)
-
-            cmds.xform(cameraTransform.fullPathName(),
-                       rotation=rot,
-                       relative=True,
-                       objectSpace=True)
-
-            cmds.delete(locName)
-
-            cmds.select(transformName)
-
-    if not renderer == "vp2Renderer":
-        force_update(view)
-
-    cmds.undoInfo(closeChunk=True)
-
-
-def getCamera(view):
-    """
-    Gets the camera from the current view.
-
-    :param view: View to get camera from.
-    :type view: OpenMaya.M3dView
-
-    :raises: None
-
-    :return: Camera function set.
-    :rtype: OpenMaya.MFnCamera
-    """
-    dagCam = OpenMaya.MDagPath()
-    view.getCamera(dagCam)
-
-    fnCamera = OpenMaya.MFnCamera(dagCam)
-
-    dagCam.pop()
-
-    return fnCamera, dagCam
-
-
-def worldToScreen(fnCamera=None,
-                  cameraPoint=None,
-                  transformPoint=None,
-                  view=None):
-    '''
-    Converts a world point into a screen point.
-
-    :param fnCamera: Camera function set.
-    :type fnCamera: OpenMaya.MFnCamera
-    :param cameraPoint: Position to test.
-    :type cameraPoint: OpenMaya.MPoint
-    :param transformPoint: Position to test.
-    :type transformPoint: OpenMaya.MPoint
-    :param view: View to convert point.
-    :type view: OpenMaya.M3dView
-
-    :raises: None
-
-    :return: x and y position of 3d point.
-    :rtype: list of 2 floats
-    '''
-    # Get camera direction.
-    cameraDir = fnCamera.viewDirection(OpenMaya.MSpace.kWorld)
-
-    # Grab project and view matrices.
-    projectionMatrix = OpenMaya.MMatrix()
-    view.projectionMatrix(projectionMatrix)
-
-    viewMatrix = OpenMaya.MMatrix()
-    view.modelViewMatrix(viewMatrix)
-
-    # Grab viewport width/height.
-    width = view.portWidth()
-    height = view.portHeight()
-
-    # Check to see that point is in view by checking dot product.
-    # Positive means it's facing the camera.
-    pointDir = transformPoint - cameraPoint
-    z = pointDir * cameraDir
-
-    if z < 0.01:
-        return 0.0, 0.0
-
-    # Calculate 2d Screen space.
-    point3D = transformPoint * (viewMatrix * projectionMatrix)
-
-    x = (((point3D.x / point3D.w) + 1.0) / 2.0) * width
-    y = (((point3D.y / point3D.w) + 1.0) / 2.0) * height
-
-    return x, y
-
-
-def screenToWorld(fnCamera=None,
-                  point2D=None,
-                  cameraPoint=None,
-                  setDistance=1.0,
-                  view=None):
-    '''
-    Converts a screen point to world.
-
-    :param fnCamera: Camera function set.
-    :type fnCamera: OpenMaya.MFnCamera
-    :param point2D: x and y values to convert to 3d value.
-    :type point2D: list of 2 floats
-    :param cameraPoint: Position to test.
-    :type cameraPoint: OpenMaya.MPoint
-    :param setDistance: Distance to set returned point from camera.
-    :type setDistance: float
-    :param view: View to convert point.
-    :type view: OpenMaya.M3dView
-
-    :raises: None
-
-    :return: 2d Point converted to 3d point.
-    :rtype: OpenMaya.MPoint
-    '''
-    cameraDir = fnCamera.viewDirection(OpenMaya.MSpace.kWorld)
-
-    # Grab project and view matrices.
-    projectionMatrix = OpenMaya.MMatrix()
-    view.projectionMatrix(projectionMatrix)
-
-    viewMatrix = OpenMaya.MMatrix()
-    view.modelViewMatrix(viewMatrix)
-
-    # Grab viewport width/height.
-    width = view.portWidth()
-    height = view.portHeight()
-
-    # Get 2d point in 3d.
-    point3D = OpenMaya.MPoint()
-    point3D.x = (2.0 * (point2D[0] / width)) - 1.0
-    point3D.y = (2.0 * (point2D[1] / height)) - 1.0
-
-    viewProjectionMatrix = (viewMatrix * projectionMatrix)
-
-    point3D.z = viewProjectionMatrix(3, 2)
-    point3D.w = viewProjectionMatrix(3, 3)
-    point3D.x = point3D.x * point3D.w
-    point3D.y = point3D.y * point3D.w
-
-    point3D *= viewProjectionMatrix.inverse()
-
-    # Project point into setDistance depth.
-    directionVec = (point3D - cameraPoint)
-    directionVec.normalize()
-
-    z = directionVec * cameraDir
-    if z < 0:
-        directionVec = (cameraPoint - point3D)
-        directionVec.normalize()
-
-    point3D = (directionVec * setDistance) + OpenMaya.MVector(cameraPoint)
-
-    return OpenMaya.MPoint(point3D)
-
-
-def force_update(view):
-    '''
-    Selects the center of the viewport to force it to
-    refresh properly in VP1. THIS IS AWFUL.
-
-    :param view: View to convert point.
-    :type view: OpenMaya.M3dView
-
-    :raises: None
-
-    :return: None
-    :rtype: NoneType
-    '''
-    w = shiboken.wrapInstance(long(view.widget()), QtGui.QWidget)
-    cur_pos = QtGui.QCursor.pos()
-    p = w.mapToGlobal(w.rect().center())
-    QtTest.QTest.mouseMove(w)
-    QtTest.QTest.mousePress(
-        w, QtCore.Qt.LeftButton, QtCore.Qt.AltModifier, p)
-    QtTest.QTest.mouseRelease(
-        w, QtCore.Qt.LeftButton, QtCore.Qt.AltModifier, p)
-    QtGui.qApp.processEvents()
-    QtGui.QCursor.setPos(cur_pos)
-
-if __name__ == '__main__':
-
-    pixelAmount = [10.0, 10.0]
-    nudgeView = nudge(transformName="pSphere1",
-                      pixelAmount=pixelAmount,
-                      moveObject=False,
-                      rotateView=True)
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import logging
+
+try:
+    from maya import cmds
+    from maya import OpenMaya
+    from maya import OpenMayaUI
+
+    from PySide import QtGui, QtCore, QtTest
+    import shiboken
+except:
+    pass
+
+try:
+    import numpy
+except:
+    pass
+
+from . import keys
+from . import projection
+from . import pipeline
+from .cache import CameraCache
+from .history import NudgeHistory
+from .scheduler import Job
+from .surface import SurfaceAccelerator, DEPTH_SURFACE
+from .logger import trace
+
+log = logging.getLogger('ViewNudger')
+
+# Per-transform nudge history, independent of Maya's undo queue.
+history = NudgeHistory()
+
+# Node types whose points nudgePoints moves as arrays.
+PARTICLE_TYPES = ["particle", "nParticle"]
+INSTANCER_TYPE = "instancer"
+
+# Mesh intersection accelerators reused by DEPTH_SURFACE nudges.
+surfaces = SurfaceAccelerator()
+
+# Per-camera matrix cache shared by the per-frame tools.
+cameraCache = CameraCache()
+
+# Offset modes for nudge.
+OFFSET_PARENT = "offsetParent"
+OFFSET_LAYER = "animLayer"
+OFFSET_MODES = (OFFSET_PARENT, OFFSET_LAYER)
+
+TRANSLATE_ATTRS = ("translateX", "translateY", "translateZ")
+
+# Anim layer and attribute names used to hold offsets.
+OFFSET_LAYER_NAME = "viewNudgerOffset"
+OFFSET_ATTR = "viewNudgerOffset"
+OFFSET_ENABLED_ATTR = "viewNudgerOffsetEnabled"
+
+
+def getRenderer(view):
+    """
+    Gets the current renderer in viewport.
+
+    :param view: View to convert point.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: Name of current renderer.
+    :rtype: str
+    """
+    panelName = OpenMayaUI.MQtUtil.fullName(long(view.widget()))[:-1]
+    return cmds.modelEditor(panelName, q=True, rnm=True)
+
+
+def getSelection(multiple=False):
+    """
+    Gets the current selection.
+
+    :param multiple: Return every selected transform instead of the first.
+    :type multiple: bool
+
+    :raises RuntimeError: If nothing selected.
+
+    :return: First index of object selected or all selected objects.
+    :rtype: str or list of str
+    """
+    sel = cmds.ls(selection=True, type="transform")
+
+    if not sel:
+        log.error("Nothing selected!")
+        raise RuntimeError("Nothing selected!")
+
+    if multiple:
+        return sel
+
+    return sel[0]
+
+
+def parseArgs(transformName,
+              view=None):
+    """
+    Checks input values.
+
+    :param transformName: Name of a transform to nudge from.
+    :type transformName: str
+    :param view: Optional desired M3dView.
+    :type view: OpenMaya.M3dView or Str
+
+    :raises RuntimeError: If transformName isn't a transform or doesn't exist.
+    :raises RuntimeError: If view set is not a view.
+
+    :return: view
+    :rtype: OpenMaya.M3dView
+    """
+    if not transformName:
+        log.error("No transformName supplied.")
+        raise
+
+    if not cmds.objExists(transformName) or \
+            not cmds.nodeType(transformName) == "transform":
+
+        log.error("%s either does not exist or"
+                  " isn't a transform.", transformName)
+        raise
+
+    return getView(view)
+
+
+def getView(view=None):
+    """
+    Gets a view from a model panel name, defaulting to the active view.
+
+    :param view: Optional desired M3dView.
+    :type view: OpenMaya.M3dView or Str
+
+    :raises RuntimeError: If view set is not a view.
+
+    :return: view
+    :rtype: OpenMaya.M3dView
+    """
+    if not view:
+        log.debug("Getting active view...")
+        view = OpenMayaUI.M3dView.active3dView()
+
+    elif not type(view) is OpenMayaUI.M3dView:
+        if type(view) is str:
+
+            log.debug("Converting %s to OpenMayaUI.M3dView...", view)
+
+            viewStr = view
+            view = OpenMayaUI.M3dView()
+
+            try:
+                OpenMayaUI.M3dView.getM3dViewFromModelPanel(
+                    viewStr, view)
+
+            except:
+                log.error("%s is not a model panel or view.", viewStr)
+                raise
+
+        else:
+            log.error("%s is not a view.", view)
+            raise
+
+    return view
+
+
+def nudge(transformName=None,
+          pixelAmount=[1.0, 1.0],
+          moveObject=False,
+          rotateView=False,
+          view=None,
+          depthMode=projection.DEPTH_DISTANCE,
+          plane=None,
+          offsetMode=None,
+          mesh=None,
+          renderer=None,
+          points=True):
+    """
+    Moves object/camera by pixel amount in x and y.
+
+    Particle shapes and instancers, and particle transforms when
+    moveObject is set, have their points moved by :func:`nudgePoints`.
+
+    :param transformName: Name of a transform to nudge from.
+    :type transformName: str
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param moveObject: Move the object instead of view.
+    :type moveObject: bool
+    :param rotateView: Rotate the camera back at point after nudge.
+    :type rotateView: bool
+    :param view: View to calculate nudge one.
+    :type view: OpenMaya.M3dView
+    :param depthMode: How the nudged point keeps its depth, one of
+                      ViewNudger.projection.DEPTH_MODES or DEPTH_SURFACE.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param mesh: Mesh to slide on for DEPTH_SURFACE.
+    :type mesh: str
+    :param offsetMode: Write the nudge as a constant offset over the whole
+                       animation instead of the current frame, one of
+                       OFFSET_MODES. Offsets aren't recorded in history.
+    :type offsetMode: str
+    :param renderer: Renderer of view if already known.
+    :type renderer: str
+    :param points: Send particles and instancers to nudgePoints, turn off
+                   to skip the node type query.
+    :type points: bool
+
+    :raises RuntimeError: If offsetMode is combined with rotateView or
+                          can't be written to the target, see
+                          :func:`checkOffset`.
+    :raises ValueError: If offsetMode isn't valid.
+
+    :return: None
+    :rtype: NoneType
+    """
+    if points and transformName and isPointNode(transformName,
+                                                transforms=moveObject):
+        nudgePoints(transformName,
+                    pixelAmount=pixelAmount,
+                    view=view,
+                    depthMode=depthMode,
+                    plane=plane,
+                    mesh=mesh)
+        return
+
+    if offsetMode and rotateView and not moveObject:
+        log.error("rotateView can't be written as an offset.")
+        raise RuntimeError("rotateView can't be written as an offset.")
+
+    view = parseArgs(transformName,
+                     view=view)
+
+    if renderer is None:
+        renderer = getRenderer(view)
+
+    fnCamera, cameraTransform = getCamera(view)
+    cameraPoint = OpenMaya.MPoint(*cmds.xform(
+        cameraTransform.fullPathName(),
+        query=True,
+        worldSpace=True,
+        translation=True))
+
+    transformPoint = OpenMaya.MPoint(*cmds.xform(
+        transformName,
+        query=True,
+        worldSpace=True,
+        translation=True))
+
+    startDirVec = (cameraPoint - transformPoint)
+    pointDist = startDirVec.length()
+    startDirVec.normalize()
+
+    log.debug("Object is being moved by %s, %s...",
+              pixelAmount[0], pixelAmount[1])
+
+    x, y = worldToScreen(fnCamera=fnCamera,
+                         cameraPoint=cameraPoint,
+                         transformPoint=transformPoint,
+                         view=view)
+
+    log.debug("Object is %s, %s in screen space...", x, y)
+
+    if depthMode == projection.DEPTH_DISTANCE:
+        xyz = screenToWorld(fnCamera=fnCamera,
+                            point2D=[x + pixelAmount[0], y + pixelAmount[1]],
+                            cameraPoint=cameraPoint,
+                            setDistance=pointDist,
+                            view=view)
+
+    else:
+        xyz = OpenMaya.MPoint(*solvePoints(
+            getViewState(view),
+            [x + pixelAmount[0], y + pixelAmount[1]],
+            [transformPoint.x, transformPoint.y, transformPoint.z],
+            depthMode=depthMode,
+            plane=plane,
+            mesh=mesh)[0])
+
+    target = transformName if moveObject else cameraTransform.fullPathName()
+
+    if offsetMode:
+        checkOffset(target, offsetMode)
+
+    pre = getWorldMatrices([target])
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        _writeNudge(transformName, target, cameraTransform, transformPoint,
+                    xyz, moveObject, rotateView, offsetMode)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    if not offsetMode:
+        history.record([target], pre, getWorldMatrices([target]))
+
+    trace.record("nudge",
+                 target=target,
+                 pixelAmount=list(pixelAmount),
+                 screen=(x, y),
+                 moveObject=moveObject,
+                 rotateView=rotateView)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+
+def _writeNudge(transformName, target, cameraTransform, transformPoint, xyz,
+                moveObject, rotateView, offsetMode):
+    if offsetMode:
+
+        offset = (xyz - transformPoint)
+        applyOffset(target, [offset.x, offset.y, offset.z], offsetMode)
+
+    elif moveObject:
+
+        cmds.xform(transformName,
+                   translation=[xyz.x, xyz.y, xyz.z],
+                   worldSpace=True)
+
+    else:
+
+        if rotateView:
+
+            loc = cmds.spaceLocator(name="cameraLoc")[0]
+
+            cmds.delete(cmds.parentConstraint(
+                cameraTransform.fullPathName(), loc))
+
+            locName = cmds.parent(loc, cameraTransform.fullPathName())[0]
+
+            cmds.aimConstraint(transformName, locName,
+                               aimVector=[0.0, 0.0, -1.0],
+                               upVector=[0.0, 1.0, 0.0],
+                               worldUpType="object",
+                               worldUpObject=cameraTransform.fullPathName(),
+                               maintainOffset=True)
+
+        offset = (xyz - transformPoint)
+
+        cmds.xform(cameraTransform.fullPathName(),
+                   translation=[offset.x, offset.y, offset.z],
+                   relative=True)
+
+        if rotateView:
+
+            rot = cmds.xform(
+                locName, query=True, rotation=True)
+
+            cmds.xform(cameraTransform.fullPathName(),
+                       rotation=rot,
+                       relative=True,
+                       objectSpace=True)
+
+            cmds.delete(locName)
+
+            cmds.select(transformName)
+
+
+def checkOffset(transformName, offsetMode):
+    """
+    Checks an offset can be written to a transform, call before opening
+    an undo chunk.
+
+    :param transformName: Name of a transform to offset.
+    :type transformName: str
+    :param offsetMode: One of OFFSET_MODES.
+    :type offsetMode: str
+
+    :raises ValueError: If offsetMode isn't valid.
+    :raises RuntimeError: If offsetParentMatrix isn't available (before
+                          Maya 2020) or offsets are turned off, where a
+                          nudge wouldn't show.
+
+    :return: None
+    :rtype: NoneType
+    """
+    if offsetMode not in OFFSET_MODES:
+        raise ValueError("Unknown offset mode %s." % offsetMode)
+
+    if offsetMode == OFFSET_PARENT:
+
+        if not cmds.attributeQuery("offsetParentMatrix",
+                                   node=transformName,
+                                   exists=True):
+            log.error("%s has no offsetParentMatrix.", transformName)
+            raise RuntimeError(
+                "%s has no offsetParentMatrix." % transformName)
+
+        plug = transformName + "." + OFFSET_ENABLED_ATTR
+        enabled = not cmds.objExists(plug) or cmds.getAttr(plug)
+
+    else:
+        enabled = not cmds.objExists(OFFSET_LAYER_NAME) or \
+            not cmds.animLayer(OFFSET_LAYER_NAME, query=True, mute=True)
+
+    if not enabled:
+        log.error("Offsets are off on %s, turn them on to nudge.",
+                  transformName)
+        raise RuntimeError(
+            "Offsets are off on %s, turn them on to nudge." % transformName)
+
+
+def applyOffset(transformName, offset, offsetMode=OFFSET_PARENT):
+    """
+    Adds a constant world space translation to a transform across its
+    whole animation with a single write, either into its
+    offsetParentMatrix (Maya 2020+) or into a key on an additive anim layer.
+
+    :param transformName: Name of a transform to offset.
+    :type transformName: str
+    :param offset: World space translation.
+    :type offset: list of 3 floats
+    :param offsetMode: One of OFFSET_MODES.
+    :type offsetMode: str
+
+    :raises ValueError: If offsetMode isn't valid.
+    :raises RuntimeError: See :func:`checkOffset`.
+
+    :return: None
+    :rtype: NoneType
+    """
+    checkOffset(transformName, offsetMode)
+
+    worldOffset = OpenMaya.MVector(*offset)
+
+    if offsetMode == OFFSET_PARENT:
+
+        # world = matrix * offsetParentMatrix * parentMatrix, so the
+        # offset goes into offsetParentMatrix in parent space.
+        local = worldOffset * _getMatrix(
+            transformName + ".parentMatrix").inverse()
+
+        if not cmds.attributeQuery(OFFSET_ATTR,
+                                   node=transformName,
+                                   exists=True):
+            cmds.addAttr(transformName,
+                         longName=OFFSET_ATTR,
+                         attributeType="double3")
+            for axis in "XYZ":
+                cmds.addAttr(transformName,
+                             longName=OFFSET_ATTR + axis,
+                             attributeType="double",
+                             parent=OFFSET_ATTR)
+            cmds.addAttr(transformName,
+                         longName=OFFSET_ENABLED_ATTR,
+                         attributeType="bool",
+                         defaultValue=True)
+
+        stored = cmds.getAttr(transformName + "." + OFFSET_ATTR)[0]
+        cmds.setAttr(transformName + "." + OFFSET_ATTR,
+                     stored[0] + local.x,
+                     stored[1] + local.y,
+                     stored[2] + local.z,
+                     type="double3")
+
+        if cmds.getAttr(transformName + "." + OFFSET_ENABLED_ATTR):
+            _shiftOffsetParent(transformName, [local.x, local.y, local.z])
+
+        return
+
+    # Translate lives in the space of offsetParentMatrix * parentMatrix.
+    space = _getMatrix(transformName + ".matrix").inverse() * \
+        _getMatrix(transformName + ".worldMatrix")
+    local = worldOffset * space.inverse()
+
+    if not cmds.objExists(OFFSET_LAYER_NAME):
+        cmds.animLayer(OFFSET_LAYER_NAME)
+
+    plugs = [transformName + "." + attr for attr in TRANSLATE_ATTRS]
+    layerPlugs = cmds.animLayer(
+        OFFSET_LAYER_NAME, query=True, attribute=True) or []
+
+    missing = [plug for plug in plugs if plug not in layerPlugs]
+    if missing:
+        cmds.animLayer(OFFSET_LAYER_NAME, edit=True, attribute=missing)
+
+    for plug, value in zip(plugs, [local.x, local.y, local.z]):
+        curves = cmds.animLayer(OFFSET_LAYER_NAME,
+                                query=True,
+                                findCurveForPlug=plug)
+
+        if curves:
+            # Shift every key so the layer stays a constant offset.
+            cmds.keyframe(curves[0],
+                          edit=True,
+                          relative=True,
+                          valueChange=value)
+        else:
+            cmds.setKeyframe(plug,
+                             animLayer=OFFSET_LAYER_NAME,
+                             value=value)
+
+
+def setOffsetEnabled(transformNames=None, enabled=True):
+    """
+    Toggles offsets written by :func:`applyOffset`. The anim layer is
+    muted as a whole and offsetParentMatrix offsets are taken out or put
+    back per transform.
+
+    :param transformNames: Transforms with offsetParentMatrix offsets.
+                           Defaults to every transform with one.
+    :type transformNames: list of str
+    :param enabled: Enable or disable the offsets.
+    :type enabled: bool
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    if cmds.objExists(OFFSET_LAYER_NAME):
+        cmds.animLayer(OFFSET_LAYER_NAME, edit=True, mute=not enabled)
+
+    if transformNames is None:
+        transformNames = cmds.ls("*." + OFFSET_ENABLED_ATTR,
+                                 objectsOnly=True,
+                                 recursive=True) or []
+
+    for transformName in transformNames:
+        plug = transformName + "." + OFFSET_ENABLED_ATTR
+
+        if not cmds.objExists(plug) or cmds.getAttr(plug) == enabled:
+            continue
+
+        stored = cmds.getAttr(transformName + "." + OFFSET_ATTR)[0]
+        sign = 1.0 if enabled else -1.0
+
+        _shiftOffsetParent(transformName, [sign * v for v in stored])
+        cmds.setAttr(plug, enabled)
+
+
+def _getMatrix(plug):
+    matrix = OpenMaya.MMatrix()
+    OpenMaya.MScriptUtil.createMatrixFromList(cmds.getAttr(plug), matrix)
+    return matrix
+
+
+def _shiftOffsetParent(transformName, translation):
+    plug = transformName + ".offsetParentMatrix"
+    matrix = cmds.getAttr(plug)
+
+    matrix[12] += translation[0]
+    matrix[13] += translation[1]
+    matrix[14] += translation[2]
+
+    cmds.setAttr(plug, matrix, type="matrix")
+
+
+def getCamera(view):
+    """
+    Gets the camera from the current view.
+
+    :param view: View to get camera from.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: Camera function set.
+    :rtype: OpenMaya.MFnCamera
+    """
+    dagCam = OpenMaya.MDagPath()
+    view.getCamera(dagCam)
+
+    fnCamera = OpenMaya.MFnCamera(dagCam)
+
+    dagCam.pop()
+
+    return fnCamera, dagCam
+
+
+def worldToScreen(fnCamera=None,
+                  cameraPoint=None,
+                  transformPoint=None,
+                  view=None):
+    '''
+    Converts a world point into a screen point.
+
+    :param fnCamera: Camera function set.
+    :type fnCamera: OpenMaya.MFnCamera
+    :param cameraPoint: Position to test.
+    :type cameraPoint: OpenMaya.MPoint
+    :param transformPoint: Position to test.
+    :type transformPoint: OpenMaya.MPoint
+    :param view: View to convert point.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: x and y position of 3d point.
+    :rtype: list of 2 floats
+    '''
+    # Get camera direction.
+    cameraDir = fnCamera.viewDirection(OpenMaya.MSpace.kWorld)
+
+    # Grab project and view matrices.
+    projectionMatrix = OpenMaya.MMatrix()
+    view.projectionMatrix(projectionMatrix)
+
+    viewMatrix = OpenMaya.MMatrix()
+    view.modelViewMatrix(viewMatrix)
+
+    # Grab viewport width/height.
+    width = view.portWidth()
+    height = view.portHeight()
+
+    # Check to see that point is in view by checking dot product.
+    # Positive means it's facing the camera.
+    pointDir = transformPoint - cameraPoint
+    z = pointDir * cameraDir
+
+    if z < 0.01:
+        return 0.0, 0.0
+
+    # Calculate 2d Screen space.
+    point3D = transformPoint * (viewMatrix * projectionMatrix)
+
+    x = (((point3D.x / point3D.w) + 1.0) / 2.0) * width
+    y = (((point3D.y / point3D.w) + 1.0) / 2.0) * height
+
+    return x, y
+
+
+def screenToWorld(fnCamera=None,
+                  point2D=None,
+                  cameraPoint=None,
+                  setDistance=1.0,
+                  view=None):
+    '''
+    Converts a screen point to world.
+
+    :param fnCamera: Camera function set.
+    :type fnCamera: OpenMaya.MFnCamera
+    :param point2D: x and y values to convert to 3d value.
+    :type point2D: list of 2 floats
+    :param cameraPoint: Position to test.
+    :type cameraPoint: OpenMaya.MPoint
+    :param setDistance: Distance to set returned point from camera.
+    :type setDistance: float
+    :param view: View to convert point.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: 2d Point converted to 3d point.
+    :rtype: OpenMaya.MPoint
+    '''
+    cameraDir = fnCamera.viewDirection(OpenMaya.MSpace.kWorld)
+
+    # Grab project and view matrices.
+    projectionMatrix = OpenMaya.MMatrix()
+    view.projectionMatrix(projectionMatrix)
+
+    viewMatrix = OpenMaya.MMatrix()
+    view.modelViewMatrix(viewMatrix)
+
+    # Grab viewport width/height.
+    width = view.portWidth()
+    height = view.portHeight()
+
+    # Get 2d point in 3d.
+    point3D = OpenMaya.MPoint()
+    point3D.x = (2.0 * (point2D[0] / width)) - 1.0
+    point3D.y = (2.0 * (point2D[1] / height)) - 1.0
+
+    viewProjectionMatrix = (viewMatrix * projectionMatrix)
+
+    point3D.z = viewProjectionMatrix(3, 2)
+    point3D.w = viewProjectionMatrix(3, 3)
+    point3D.x = point3D.x * point3D.w
+    point3D.y = point3D.y * point3D.w
+
+    point3D *= viewProjectionMatrix.inverse()
+
+    # Project point into setDistance depth.
+    directionVec = (point3D - cameraPoint)
+    directionVec.normalize()
+
+    z = directionVec * cameraDir
+    if z < 0:
+        directionVec = (cameraPoint - point3D)
+        directionVec.normalize()
+
+    point3D = (directionVec * setDistance) + OpenMaya.MVector(cameraPoint)
+
+    return OpenMaya.MPoint(point3D)
+
+
+def getViewState(view):
+    """
+    Captures the camera and viewport of a view for the array functions
+    in :mod:`ViewNudger.projection`.
+
+    :param view: View to capture.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: Snapshot of the view.
+    :rtype: ViewNudger.projection.ViewState
+    """
+    fnCamera, cameraTransform = getCamera(view)
+
+    cameraPoint = cmds.xform(cameraTransform.fullPathName(),
+                             query=True,
+                             worldSpace=True,
+                             translation=True)
+    cameraDir = fnCamera.viewDirection(OpenMaya.MSpace.kWorld)
+
+    projectionMatrix = OpenMaya.MMatrix()
+    view.projectionMatrix(projectionMatrix)
+
+    viewMatrix = OpenMaya.MMatrix()
+    view.modelViewMatrix(viewMatrix)
+
+    viewProjectionMatrix = (viewMatrix * projectionMatrix)
+
+    return projection.makeViewState(
+        viewProjection=[[viewProjectionMatrix(i, j) for j in range(4)]
+                        for i in range(4)],
+        width=view.portWidth(),
+        height=view.portHeight(),
+        cameraPoint=cameraPoint,
+        cameraDir=[cameraDir.x, cameraDir.y, cameraDir.z])
+
+
+def getCameraMatrices(camera=None,
+                      start=None,
+                      end=None,
+                      view=None):
+    """
+    Gets the world, view and projection matrices of a camera for every
+    frame, memory-mapped from :data:`cameraCache` when the camera's
+    animation hasn't changed since they were cached.
+
+    :param camera: Camera transform, defaults to the view's camera.
+    :type camera: str
+    :param start: First frame, defaults to the playback start.
+    :type start: int
+    :param end: Last frame, defaults to the playback end.
+    :type end: int
+    :param view: View to take the camera and viewport size from.
+    :type view: OpenMaya.M3dView or str
+
+    :raises RuntimeError: If the camera uses attributes
+                          projection.cameraProjection doesn't model.
+
+    :return: Read only matrices, index with ViewNudger.cache.WORLD, VIEW
+             and PROJECTION.
+    :rtype: numpy.memmap (frames, 3, 4, 4)
+    """
+    view = getView(view)
+
+    if camera is None:
+        camera = getViewCamera(view)
+
+    if start is None:
+        start = cmds.playbackOptions(query=True, minTime=True)
+    if end is None:
+        end = cmds.playbackOptions(query=True, maxTime=True)
+
+    return cameraCache.get(camera,
+                           int(start),
+                           int(end),
+                           view.portWidth(),
+                           view.portHeight())
+
+
+def cameraCacheStats():
+    """
+    Gets the camera cache hits and misses of this session.
+
+    :raises: None
+
+    :return: hits and misses.
+    :rtype: dict
+    """
+    return cameraCache.stats()
+
+
+def solvePoints(state,
+                points2D,
+                points,
+                depthMode=projection.DEPTH_DISTANCE,
+                plane=None,
+                mesh=None):
+    """
+    Places screen points back in the world, like
+    :func:`ViewNudger.projection.solveDepth` plus DEPTH_SURFACE, which
+    raycasts onto mesh through the cached accelerator in :data:`surfaces`.
+    Rays that miss the mesh keep their camera distance.
+
+    :param state: View to convert points with.
+    :type state: ViewNudger.projection.ViewState
+    :param points2D: New screen positions.
+    :type points2D: numpy.ndarray (N, 2)
+    :param points: Current world positions.
+    :type points: numpy.ndarray (N, 3)
+    :param depthMode: One of ViewNudger.projection.DEPTH_MODES or
+                      DEPTH_SURFACE.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param mesh: Mesh to slide on for DEPTH_SURFACE.
+    :type mesh: str
+
+    :raises RuntimeError: If DEPTH_SURFACE is used without a mesh.
+
+    :return: World positions.
+    :rtype: numpy.ndarray (N, 3)
+    """
+    if not depthMode == DEPTH_SURFACE:
+        return projection.solveDepth(state,
+                                     points2D,
+                                     points,
+                                     mode=depthMode,
+                                     plane=plane)
+
+    if not mesh:
+        log.error("No mesh supplied to slide on.")
+        raise RuntimeError("No mesh supplied to slide on.")
+
+    directions = projection.screenRays(state, points2D)
+    distances = numpy.linalg.norm(
+        numpy.asarray(points).reshape(-1, 3) - state.cameraPoint, axis=1)
+
+    result = state.cameraPoint + directions * distances[:, numpy.newaxis]
+
+    hits, hit = surfaces.raycast(mesh, state.cameraPoint, directions)
+    result[hit] = hits[hit]
+
+    return result
+
+
+def getWorldPositions(transformNames):
+    """
+    Reads the world translation of many transforms in a single query.
+
+    :param transformNames: Names of transforms to read.
+    :type transformNames: list of str
+
+    :raises: None
+
+    :return: World positions.
+    :rtype: numpy.ndarray (N, 3)
+    """
+    positions = cmds.xform(transformNames,
+                           query=True,
+                           worldSpace=True,
+                           translation=True)
+
+    return numpy.array(positions, dtype=numpy.float64).reshape(-1, 3)
+
+
+def _longNames(transformNames):
+    longNames = cmds.ls(transformNames, long=True)
+
+    # ls merges duplicates, fall back to one query per name.
+    if not len(longNames) == len(transformNames):
+        longNames = [cmds.ls(name, long=True)[0] for name in transformNames]
+
+    return longNames
+
+
+def _parentsFirst(transformNames):
+    """
+    Orders transforms so parents are written before their children.
+    Children are written to an absolute world position, so writing them
+    first would let a selected parent move them a second time.
+
+    :param transformNames: Names of transforms.
+    :type transformNames: list of str
+
+    :raises: None
+
+    :return: Indices into transformNames, shallowest first.
+    :rtype: list of int
+    """
+    longNames = _longNames(transformNames)
+
+    return sorted(range(len(transformNames)),
+                  key=lambda index: longNames[index].count("|"))
+
+
+def setWorldPositions(transformNames, positions):
+    """
+    Writes the world translation of many transforms, parents first.
+
+    Wrap in an undo chunk to keep it a single undo step.
+
+    :param transformNames: Names of transforms to write.
+    :type transformNames: list of str
+    :param positions: World positions.
+    :type positions: numpy.ndarray (N, 3)
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    positions = positions.tolist()
+
+    for index in _parentsFirst(transformNames):
+        cmds.xform(transformNames[index],
+                   translation=positions[index],
+                   worldSpace=True)
+
+
+def moveWorldPositions(transformNames, offsets):
+    """
+    Moves many transforms by a world space offset each. Moves don't
+    depend on order, but a transform's move also moves its children.
+
+    Wrap in an undo chunk to keep it a single undo step.
+
+    :param transformNames: Names of transforms to move.
+    :type transformNames: list of str
+    :param offsets: World space offsets.
+    :type offsets: numpy.ndarray (N, 3)
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    for transformName, offset in zip(transformNames, offsets.tolist()):
+        cmds.xform(transformName,
+                   translation=offset,
+                   worldSpace=True,
+                   relative=True)
+
+
+def getWorldMatrices(transformNames):
+    """
+    Reads the world matrix of many transforms in a single query.
+
+    :param transformNames: Names of transforms to read.
+    :type transformNames: list of str
+
+    :raises: None
+
+    :return: World matrices.
+    :rtype: list of 16 floats per transform
+    """
+    matrices = cmds.xform(transformNames,
+                          query=True,
+                          worldSpace=True,
+                          matrix=True)
+
+    return [matrices[i:i + 16] for i in range(0, len(matrices), 16)]
+
+
+def setWorldMatrices(transformNames, matrices):
+    """
+    Writes the world matrix of many transforms, parents first.
+
+    Wrap in an undo chunk to keep it a single undo step.
+
+    :param transformNames: Names of transforms to write.
+    :type transformNames: list of str
+    :param matrices: World matrices.
+    :type matrices: list of 16 floats per transform
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    for index in _parentsFirst(transformNames):
+        cmds.xform(transformNames[index],
+                   matrix=matrices[index],
+                   worldSpace=True)
+
+
+def getViewCamera(view=None):
+    """
+    Gets the camera transform of a view.
+
+    :param view: View to get the camera from, defaults to the active view.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: Full path of the camera transform.
+    :rtype: str
+    """
+    if view is None:
+        view = OpenMayaUI.M3dView.active3dView()
+
+    return getCamera(view)[1].fullPathName()
+
+
+def revertNudges(transformNames=None, count=1):
+    """
+    Steps back the last count nudges of every transform in one write,
+    without touching Maya's undo queue or unrelated edits.
+
+    :param transformNames: Names of nudged transforms.
+                           Defaults to every transform with history.
+    :type transformNames: list of str
+    :param count: Number of nudges to step back, at least 1.
+    :type count: int
+
+    :raises ValueError: If count is less than 1.
+
+    :return: Names of the transforms that were restored.
+    :rtype: list of str
+    """
+    if transformNames is None:
+        transformNames = history.transforms()
+
+    return _restore(*history.revert(transformNames, count=count))
+
+
+def resetNudges(transformNames=None):
+    """
+    Puts every transform back where it was before its recorded nudges.
+
+    :param transformNames: Names of nudged transforms.
+                           Defaults to every transform with history.
+    :type transformNames: list of str
+
+    :raises: None
+
+    :return: Names of the transforms that were restored.
+    :rtype: list of str
+    """
+    if transformNames is None:
+        transformNames = history.transforms()
+
+    return _restore(*history.reset(transformNames))
+
+
+def _restore(transformNames, matrices):
+    if not transformNames:
+        log.warning("No nudge history to restore.")
+        return transformNames
+
+    log.debug("Restoring %s transforms...", len(transformNames))
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        setWorldMatrices(transformNames, matrices)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return transformNames
+
+
+def isPointNode(nodeName, transforms=True):
+    """
+    Checks if a node holds points :func:`nudgePoints` moves, with a single
+    query for anything but particle transforms.
+
+    :param nodeName: Node to check.
+    :type nodeName: str
+    :param transforms: Also check transforms for a particle shape.
+    :type transforms: bool
+
+    :raises: None
+
+    :return: True for particles, instancers and, with transforms,
+             particle transforms.
+    :rtype: bool
+    """
+    # [name, type], empty if nodeName doesn't exist.
+    found = cmds.ls(nodeName, showType=True)
+
+    if not found:
+        return False
+
+    if found[1] in PARTICLE_TYPES or found[1] == INSTANCER_TYPE:
+        return True
+
+    if transforms and found[1] == "transform":
+        return bool(cmds.listRelatives(nodeName,
+                                       shapes=True,
+                                       type=PARTICLE_TYPES))
+
+    return False
+
+
+def getPointNode(nodeName, transforms=True):
+    """
+    Gets the particle shape holding the points of a particle, nParticle
+    or instancer node.
+
+    :param nodeName: Particle shape, instancer or a particle transform.
+    :type nodeName: str
+    :param transforms: Also resolve transforms to their particle shape.
+    :type transforms: bool
+
+    :raises RuntimeError: If an instancer has no particle input points.
+
+    :return: Particle shape or None if nodeName holds no points.
+    :rtype: str
+    """
+    if cmds.ls(nodeName, type=PARTICLE_TYPES):
+        return cmds.ls(nodeName, long=True)[0]
+
+    if cmds.ls(nodeName, type=INSTANCER_TYPE):
+        inputs = cmds.listConnections(nodeName + ".inputPoints",
+                                      source=True,
+                                      destination=False,
+                                      shapes=True,
+                                      fullNodeName=False) or []
+        particles = cmds.ls(inputs, type=PARTICLE_TYPES, long=True)
+
+        if not particles:
+            log.error("%s has no particle input points.", nodeName)
+            raise RuntimeError(
+                "%s has no particle input points." % nodeName)
+
+        return particles[0]
+
+    if transforms:
+        shapes = cmds.listRelatives(nodeName,
+                                    shapes=True,
+                                    type=PARTICLE_TYPES,
+                                    fullPath=True)
+        if shapes:
+            return shapes[0]
+
+    return None
+
+
+def nudgePoints(nodeName,
+                pixelAmount=[1.0, 1.0],
+                indices=None,
+                view=None,
+                depthMode=projection.DEPTH_DISTANCE,
+                plane=None,
+                mesh=None):
+    """
+    Moves the points of a particle, nParticle or instancer by pixel amount
+    in x and y. Positions are read with one getAttr, solved as one batch
+    and written back with one vectorArray setAttr.
+
+    Dynamics overwrite positions on the next solved frame, save the
+    initial state to keep a nudge on simulated particles.
+
+    :param nodeName: Particle shape, instancer or a particle transform.
+    :type nodeName: str
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param indices: Only nudge these points, defaults to all.
+    :type indices: list of int
+    :param view: View to calculate nudge on.
+    :type view: OpenMaya.M3dView or str
+    :param depthMode: How nudged points keep their depth, one of
+                      ViewNudger.projection.DEPTH_MODES or DEPTH_SURFACE.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param mesh: Mesh to slide on for DEPTH_SURFACE.
+    :type mesh: str
+
+    :raises RuntimeError: If nodeName holds no points.
+
+    :return: Number of points moved.
+    :rtype: int
+    """
+    shape = getPointNode(nodeName)
+
+    if not shape:
+        log.error("%s isn't a particle or instancer.", nodeName)
+        raise RuntimeError("%s isn't a particle or instancer." % nodeName)
+
+    view = getView(view)
+    renderer = getRenderer(view)
+    state = getViewState(view)
+
+    local = numpy.array(cmds.getAttr(shape + ".position") or [],
+                        dtype=numpy.float64).reshape(-1, 3)
+
+    if not len(local):
+        log.warning("%s has no points.", shape)
+        return 0
+
+    worldMatrix = numpy.array(
+        cmds.getAttr(shape + ".worldMatrix[0]")).reshape(4, 4)
+
+    selected = numpy.arange(len(local)) if indices is None else \
+        numpy.asarray(indices, dtype=int)
+
+    points = local[selected].dot(worldMatrix[:3, :3]) + worldMatrix[3, :3]
+    screen, depth = projection.worldToScreenArray(state, points)
+
+    valid = depth >= projection.NEAR_CLIP
+    selected = selected[valid]
+
+    log.debug("Nudging %s points of %s by %s, %s...",
+              len(selected), shape, pixelAmount[0], pixelAmount[1])
+
+    result = solvePoints(state,
+                         screen[valid] + pixelAmount,
+                         points[valid],
+                         depthMode=depthMode,
+                         plane=plane,
+                         mesh=mesh)
+
+    inverse = numpy.linalg.inv(worldMatrix)
+    local[selected] = result.dot(inverse[:3, :3]) + inverse[3, :3]
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        cmds.setAttr(shape + ".position",
+                     len(local),
+                     *[tuple(point) for point in local.tolist()],
+                     type="vectorArray")
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    trace.record("nudgePoints",
+                 target=shape,
+                 count=len(selected),
+                 pixelAmount=list(pixelAmount),
+                 depthMode=depthMode)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+    return len(selected)
+
+
+def screenReport(view=None,
+                 transformNames=None,
+                 objectSet=None,
+                 region=None):
+    """
+    Projects every transform in the scene, or in a set, for a view in one
+    vectorized pass.
+
+    :param view: View to project into.
+    :type view: OpenMaya.M3dView or str
+    :param transformNames: Transforms to project, defaults to all of them.
+    :type transformNames: list of str
+    :param objectSet: Only project transforms in this set.
+    :type objectSet: str
+    :param region: Only report transforms inside (xMin, yMin, xMax, yMax).
+    :type region: list of 4 floats
+
+    :raises: None
+
+    :return: names plus the arrays from
+             :func:`ViewNudger.projection.screenReportArrays`.
+    :rtype: dict
+    """
+    if objectSet:
+        transformNames = cmds.ls(cmds.sets(objectSet, query=True) or [],
+                                 type="transform",
+                                 long=True)
+
+    elif transformNames is None:
+        transformNames = cmds.ls(type="transform", long=True)
+
+    state = getViewState(getView(view))
+
+    if transformNames:
+        points = getWorldPositions(transformNames)
+    else:
+        points = numpy.empty((0, 3))
+
+    report = projection.screenReportArrays(state, points, region=region)
+
+    log.debug("Projected %s transforms...", len(transformNames))
+
+    mask = report.pop("mask")
+    report["names"] = [name for name, keep in zip(transformNames, mask)
+                       if keep]
+
+    return report
+
+
+def nudgeObjects(transformNames=None,
+                 pixelAmount=[1.0, 1.0],
+                 view=None,
+                 depthMode=projection.DEPTH_DISTANCE,
+                 plane=None,
+                 mesh=None,
+                 state=None,
+                 renderer=None):
+    """
+    Moves many objects by pixel amount in x and y in one vectorized solve.
+
+    :param transformNames: Names of transforms to nudge.
+                           Defaults to the current selection.
+    :type transformNames: list of str
+    :param pixelAmount: Pixel amount to nudge in x and y, or one row per
+                        transform.
+    :type pixelAmount: list of 2 floats or numpy.ndarray (N, 2)
+    :param view: View to calculate nudge on.
+    :type view: OpenMaya.M3dView or str
+    :param depthMode: How nudged points keep their depth, one of
+                      ViewNudger.projection.DEPTH_MODES or DEPTH_SURFACE.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param mesh: Mesh to slide on for DEPTH_SURFACE.
+    :type mesh: str
+    :param state: Snapshot of view if already known.
+    :type state: ViewNudger.projection.ViewState
+    :param renderer: Renderer of view if already known.
+    :type renderer: str
+
+    :raises: None
+
+    :return: Names of the transforms that were moved.
+    :rtype: list of str
+    """
+    if not transformNames:
+        transformNames = getSelection(multiple=True)
+
+    view = parseArgs(transformNames[0], view=view)
+
+    if renderer is None:
+        renderer = getRenderer(view)
+    if state is None:
+        state = getViewState(view)
+
+    points = getWorldPositions(transformNames)
+    screen, depth = projection.worldToScreenArray(state, points)
+
+    valid = depth >= projection.NEAR_CLIP
+    moved = [name for name, isValid in zip(transformNames, valid) if isValid]
+
+    if not moved:
+        log.warning("Nothing to nudge in front of the camera.")
+        return moved
+
+    amounts = numpy.broadcast_to(numpy.asarray(pixelAmount, dtype=float),
+                                 screen.shape)
+
+    log.debug("Nudging %s objects by up to %s pixels...",
+              len(moved), numpy.abs(amounts[valid]).max())
+
+    result = solvePoints(state,
+                         screen[valid] + amounts[valid],
+                         points[valid],
+                         depthMode=depthMode,
+                         plane=plane,
+                         mesh=mesh)
+
+    pre = getWorldMatrices(moved)
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        setWorldPositions(moved, result)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    history.record(moved, pre, getWorldMatrices(moved))
+
+    trace.record("nudgeObjects",
+                 count=len(moved),
+                 pixelAmount=numpy.asarray(pixelAmount).tolist(),
+                 depthMode=depthMode)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+    return moved
+
+
+def resize(transformNames=None,
+           pixelAmount=10.0,
+           axis="height",
+           method="dolly",
+           view=None):
+    """
+    Grows or shrinks the combined on-screen footprint of transforms by a
+    pixel amount with one closed form solve and one write.
+
+    dolly moves the camera along its view axis and scale scales the
+    transforms about their bounding box center, both solved with
+    :func:`ViewNudger.projection.solveScreenSize` from the corners that
+    bound the footprint. focalLength scales the focal length by the size
+    ratio. Orthographic cameras change orthographicWidth for dolly and
+    focalLength.
+
+    :param transformNames: Names of transforms to measure.
+                           Defaults to the current selection.
+    :type transformNames: list of str
+    :param pixelAmount: Pixels to add to the footprint, negative shrinks.
+    :type pixelAmount: float
+    :param axis: "height" or "width" of the footprint.
+    :type axis: str
+    :param method: "dolly", "focalLength" or "scale".
+    :type method: str
+    :param view: View to measure in.
+    :type view: OpenMaya.M3dView or str
+
+    :raises ValueError: If axis or method isn't valid.
+    :raises RuntimeError: If the footprint is behind the camera, would
+                          shrink to nothing or can't be reached.
+
+    :return: Size ratio applied.
+    :rtype: float
+    """
+    if axis not in ("height", "width"):
+        raise ValueError("axis must be 'height' or 'width', got %s." % axis)
+
+    if method not in ("dolly", "focalLength", "scale"):
+        raise ValueError("Unknown resize method %s." % method)
+
+    if not transformNames:
+        transformNames = getSelection(multiple=True)
+
+    view = parseArgs(transformNames[0], view=view)
+    renderer = getRenderer(view)
+    state = getViewState(view)
+
+    bounds = cmds.exactWorldBoundingBox(transformNames)
+    corners = projection.boxCorners(bounds)
+
+    try:
+        screen = projection.screenBounds(state, corners)
+    except ValueError:
+        log.error("Bounding box crosses behind the camera.")
+        raise RuntimeError("Bounding box crosses behind the camera.")
+
+    index = 1 if axis == "height" else 0
+    size = screen[index + 2] - screen[index]
+
+    if size <= 0 or size + pixelAmount <= 0:
+        log.error("Can't resize a %s px footprint by %s px.",
+                  size, pixelAmount)
+        raise RuntimeError("Can't resize a %s px footprint by %s px." % (
+            size, pixelAmount))
+
+    ratio = (size + pixelAmount) / size
+
+    log.debug("Resizing %s px %s by %s...", size, axis, ratio)
+
+    camera = getViewCamera(view)
+    shape = cmds.listRelatives(camera, shapes=True, type="camera",
+                               fullPath=True)[0]
+    orthographic = cmds.getAttr(shape + ".orthographic")
+
+    center = numpy.array([(bounds[i] + bounds[i + 3]) / 2.0
+                          for i in range(3)])
+
+    # Corners after a dolly or scale, checked against the target below.
+    moved = None
+
+    try:
+        if method == "scale":
+            scale = 1.0 + projection.solveScreenSize(
+                state, corners, corners - center, size + pixelAmount, index)
+            moved = center + scale * (corners - center)
+
+        elif method == "dolly" and not orthographic:
+            dolly = projection.solveScreenSize(
+                state, corners, -state.cameraDir, size + pixelAmount, index)
+            moved = corners - dolly * state.cameraDir
+
+    except ValueError:
+        log.error("Can't reach %s px in front of the camera.",
+                  size + pixelAmount)
+        raise RuntimeError("Can't reach %s px in front of the camera." % (
+            size + pixelAmount))
+
+    if moved is not None:
+        screen = projection.screenBounds(state, moved)
+        reached = screen[index + 2] - screen[index]
+
+        if (method == "scale" and scale <= 0) or \
+                abs(reached - size - pixelAmount) > 1e-3:
+            log.error("Resize solve missed, got %s px.", reached)
+            raise RuntimeError("Resize solve missed, got %s px." % reached)
+
+    targets = transformNames if method == "scale" else [camera]
+    pre = getWorldMatrices(targets)
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        if method == "scale":
+            cmds.scale(scale, scale, scale, transformNames,
+                       relative=True,
+                       pivot=center.tolist())
+
+        elif orthographic:
+            cmds.setAttr(shape + ".orthographicWidth",
+                         cmds.getAttr(shape + ".orthographicWidth") / ratio)
+
+        elif method == "focalLength":
+            cmds.setAttr(shape + ".focalLength",
+                         cmds.getAttr(shape + ".focalLength") * ratio)
+
+        else:
+            cmds.xform(camera,
+                       translation=(dolly * state.cameraDir).tolist(),
+                       worldSpace=True,
+                       relative=True)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    if method == "scale" or (method == "dolly" and not orthographic):
+        history.record(targets, pre, getWorldMatrices(targets))
+
+    trace.record("resize",
+                 count=len(transformNames),
+                 pixelAmount=pixelAmount,
+                 axis=axis,
+                 method=method,
+                 ratio=ratio)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+    return ratio
+
+
+def nudgeObjectsJob(transformNames=None,
+                    pixelAmount=[1.0, 1.0],
+                    chunkSize=500,
+                    view=None,
+                    depthMode=projection.DEPTH_DISTANCE,
+                    plane=None,
+                    mesh=None):
+    """
+    Builds a cancellable :class:`ViewNudger.scheduler.Job` that does the
+    same as :func:`nudgeObjects` a chunk at a time. The view is captured
+    now, so tumbling while it runs doesn't change the result. Submit it
+    to :data:`ViewNudger.scheduler.scheduler`.
+
+    Transforms are written parents first across every chunk, so a
+    selected parent never moves a child that's already been written.
+    An undo chunk can't stay open between event-loop ticks, so chunks
+    are written without undo. Once the last one is done, every transform
+    is put back with undo off and written again in one undo chunk, which
+    makes the whole job a single undo step, and one nudge in
+    :data:`history`.
+
+    :param transformNames: Names of transforms to nudge.
+                           Defaults to the current selection.
+    :type transformNames: list of str
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param chunkSize: Transforms solved and written per step.
+    :type chunkSize: int
+    :param view: View to calculate nudge on.
+    :type view: OpenMaya.M3dView or str
+    :param depthMode: How nudged points keep their depth, one of
+                      ViewNudger.projection.DEPTH_MODES or DEPTH_SURFACE.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param mesh: Mesh to slide on for DEPTH_SURFACE.
+    :type mesh: str
+
+    :raises: None
+
+    :return: Job that rolls back finished chunks when cancelled.
+    :rtype: ViewNudger.scheduler.Job
+    """
+    if not transformNames:
+        transformNames = getSelection(multiple=True)
+
+    view = parseArgs(transformNames[0], view=view)
+    renderer = getRenderer(view)
+    state = getViewState(view)
+
+    points = getWorldPositions(transformNames)
+    screen, depth = projection.worldToScreenArray(state, points)
+
+    valid = depth >= projection.NEAR_CLIP
+    names = [name for name, isValid in zip(transformNames, valid) if isValid]
+
+    order = _parentsFirst(names) if names else []
+    names = [names[index] for index in order]
+    points = points[valid][order]
+    screen = screen[valid][order]
+
+    pre = getWorldMatrices(names) if names else []
+    result = points.copy()
+    written = [0]
+
+    def steps():
+        for start in range(0, len(names), chunkSize):
+            end = min(start + chunkSize, len(names))
+
+            result[start:end] = solvePoints(state,
+                                            screen[start:end] + pixelAmount,
+                                            points[start:end],
+                                            depthMode=depthMode,
+                                            plane=plane,
+                                            mesh=mesh)
+
+            _withoutUndo(setWorldPositions,
+                         names[start:end],
+                         result[start:end])
+
+            written[0] = end
+            yield end
+
+        if names:
+            # Redo the whole move as one undoable write.
+            _withoutUndo(setWorldPositions, names, points)
+
+            cmds.undoInfo(openChunk=True)
+            try:
+                setWorldPositions(names, result)
+            finally:
+                cmds.undoInfo(closeChunk=True)
+
+            history.record(names, pre, getWorldMatrices(names))
+
+        if not renderer == "vp2Renderer":
+            force_update(view)
+
+    def rollback():
+        _withoutUndo(setWorldPositions,
+                     names[:written[0]],
+                     points[:written[0]])
+
+        if not renderer == "vp2Renderer":
+            force_update(view)
+
+    return Job(steps(), len(names), rollback=rollback, name="nudgeObjects")
+
+
+def _withoutUndo(function, *args):
+    undoState = cmds.undoInfo(query=True, state=True)
+
+    # Leave the queue as it is, only skip recording these writes.
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        return function(*args)
+    finally:
+        cmds.undoInfo(stateWithoutFlush=undoState)
+
+
+def nudgeObjectsPipelined(transformNames=None,
+                          pixelAmount=[1.0, 1.0],
+                          chunkSize=5000,
+                          workers=pipeline.DEFAULT_WORKERS,
+                          view=None,
+                          depthMode=projection.DEPTH_DISTANCE,
+                          plane=None,
+                          state=None,
+                          renderer=None):
+    """
+    Does the same as :func:`nudgeObjects` through a
+    :class:`ViewNudger.pipeline.Pipeline`, writing chunks here while
+    worker threads solve the ones in between. Must be called from the
+    main thread.
+
+    Every position is read up front in one query, so writes can't change
+    what later chunks read. Chunks finish in any order, so moves are
+    written relative, with a child's move less its closest selected
+    parent's, and every transform lands where it would alone.
+
+    :param transformNames: Names of transforms to nudge.
+                           Defaults to the current selection.
+    :type transformNames: list of str
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param chunkSize: Transforms per chunk.
+    :type chunkSize: int
+    :param workers: Number of solve threads.
+    :type workers: int
+    :param view: View to calculate nudge on.
+    :type view: OpenMaya.M3dView or str
+    :param depthMode: One of ViewNudger.projection.DEPTH_MODES.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param state: Snapshot of view if already known.
+    :type state: ViewNudger.projection.ViewState
+    :param renderer: Renderer of view if already known.
+    :type renderer: str
+
+    :raises RuntimeError: If depthMode is DEPTH_SURFACE, raycasts use
+                          OpenMaya and can't leave the main thread.
+
+    :return: Names of the transforms that were moved.
+    :rtype: list of str
+    """
+    if depthMode == DEPTH_SURFACE:
+        log.error("Surface depth can't be solved off the main thread.")
+        raise RuntimeError(
+            "Surface depth can't be solved off the main thread.")
+
+    if not transformNames:
+        transformNames = getSelection(multiple=True)
+
+    view = parseArgs(transformNames[0], view=view)
+    if renderer is None:
+        renderer = getRenderer(view)
+    if state is None:
+        state = getViewState(view)
+
+    pre = getWorldMatrices(transformNames)
+    points = getWorldPositions(transformNames)
+    moved = []
+
+    children, parents = _closestParents(transformNames)
+    parentIndices = numpy.full(len(transformNames), -1, dtype=int)
+    parentIndices[children] = parents
+
+    def read(chunk):
+        start, end = chunk
+        chunkParents = parentIndices[start:end]
+        chunkChildren = numpy.flatnonzero(chunkParents >= 0)
+
+        if not len(chunkChildren):
+            return points[start:end], None
+
+        return points[start:end], \
+            (chunkChildren, points[chunkParents[chunkChildren]])
+
+    def write(chunk, result):
+        valid, moves = result
+        names = [name for name, isValid in
+                 zip(transformNames[chunk[0]:chunk[1]], valid) if isValid]
+
+        moveWorldPositions(names, moves)
+        moved.extend(names)
+
+    log.debug("Nudging %s objects by %s, %s on %s workers...",
+              len(transformNames), pixelAmount[0], pixelAmount[1], workers)
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        pipeline.Pipeline(
+            pipeline.nudgeSolver(state, pixelAmount, depthMode, plane),
+            workers=workers).run(
+                pipeline.chunkRanges(len(transformNames), chunkSize),
+                read,
+                write)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    if not moved:
+        log.warning("Nothing to nudge in front of the camera.")
+        return moved
+
+    matrices = dict(zip(transformNames, pre))
+    history.record(moved,
+                   [matrices[name] for name in moved],
+                   getWorldMatrices(moved))
+
+    trace.record("nudgeObjectsPipelined",
+                 count=len(moved),
+                 pixelAmount=list(pixelAmount),
+                 depthMode=depthMode)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+    return moved
+
+
+def _framePlugs(transformNames):
+    """
+    Looks up the plugs :func:`nudgeFrames` reads on every frame.
+
+    :param transformNames: Names of transforms.
+    :type transformNames: list of str
+
+    :raises: None
+
+    :return: worldMatrix[0], matrix and translate x, y, z per transform.
+    :rtype: list of tuple of OpenMaya.MPlug, OpenMaya.MPlug and
+            list of 3 OpenMaya.MPlug
+    """
+    selection = OpenMaya.MSelectionList()
+    for transformName in transformNames:
+        selection.add(transformName)
+
+    plugs = []
+    for index in range(len(transformNames)):
+        node = OpenMaya.MObject()
+        selection.getDependNode(index, node)
+        fnNode = OpenMaya.MFnDependencyNode(node)
+
+        plugs.append((
+            fnNode.findPlug("worldMatrix").elementByLogicalIndex(0),
+            fnNode.findPlug("matrix"),
+            [fnNode.findPlug(attr) for attr in TRANSLATE_ATTRS]))
+
+    return plugs
+
+
+def _matrixAt(plug, context):
+    matrix = OpenMaya.MFnMatrixData(plug.asMObject(context)).matrix()
+    return [matrix(row, column) for row in range(4) for column in range(4)]
+
+
+def _closestParents(transformNames):
+    """
+    Pairs every transform with its closest ancestor among transformNames.
+
+    :param transformNames: Names of transforms.
+    :type transformNames: list of str
+
+    :raises: None
+
+    :return: Indices of children and of their parents.
+    :rtype: tuple of 2 numpy.ndarray (M,)
+    """
+    longNames = _longNames(transformNames)
+    indices = dict((name, index) for index, name in enumerate(longNames))
+
+    children = []
+    parents = []
+
+    for index, name in enumerate(longNames):
+        path = name.split("|")
+
+        for depth in range(len(path) - 1, 1, -1):
+            parent = indices.get("|".join(path[:depth]))
+            if parent is not None:
+                children.append(index)
+                parents.append(parent)
+                break
+
+    return (numpy.array(children, dtype=int),
+            numpy.array(parents, dtype=int))
+
+
+def nudgeFrames(transformNames=None,
+                pixelAmount=[1.0, 1.0],
+                start=None,
+                end=None,
+                workers=pipeline.DEFAULT_WORKERS,
+                view=None,
+                depthMode=projection.DEPTH_DISTANCE,
+                plane=None):
+    """
+    Nudges transforms in screen space on every frame of a range and keys
+    their translate, each frame solved against where the camera is on
+    that frame. Frames are read here, with one MDGContext per frame over
+    plugs looked up once, while worker threads solve the ones already
+    read, through a :class:`ViewNudger.pipeline.Pipeline`. Keys are only
+    written once every frame is read, so new keys don't change what the
+    frames after them evaluate to, with one addKeys per curve through
+    :func:`ViewNudger.keys.setKeys`. Must be called from the main thread.
+
+    The keys are one undo step and aren't added to the nudge history.
+
+    :param transformNames: Names of transforms to nudge.
+                           Defaults to the current selection.
+    :type transformNames: list of str
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param start: First frame, defaults to the playback start.
+    :type start: int
+    :param end: Last frame, defaults to the playback end.
+    :type end: int
+    :param workers: Number of solve threads.
+    :type workers: int
+    :param view: View whose camera and viewport to solve with.
+    :type view: OpenMaya.M3dView or str
+    :param depthMode: One of ViewNudger.projection.DEPTH_MODES.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+
+    :raises RuntimeError: If depthMode is DEPTH_SURFACE, raycasts use
+                          OpenMaya and can't leave the main thread.
+    :raises RuntimeError: If a translate is driven by something other
+                          than an anim curve.
+    :raises RuntimeError: If the camera uses attributes
+                          projection.cameraProjection doesn't model.
+
+    :return: Number of transforms keyed, summed over the frames.
+    :rtype: int
+    """
+    if depthMode == DEPTH_SURFACE:
+        log.error("Surface depth can't be solved off the main thread.")
+        raise RuntimeError(
+            "Surface depth can't be solved off the main thread.")
+
+    if not transformNames:
+        transformNames = getSelection(multiple=True)
+
+    view = parseArgs(transformNames[0], view=view)
+    renderer = getRenderer(view)
+
+    if start is None:
+        start = cmds.playbackOptions(query=True, minTime=True)
+    if end is None:
+        end = cmds.playbackOptions(query=True, maxTime=True)
+
+    frames = list(enumerate(range(int(start), int(end) + 1)))
+    cameraMatrices = getCameraMatrices(start=start, end=end, view=view)
+
+    plugs = _framePlugs(transformNames)
+    unit = OpenMaya.MTime.uiUnit()
+
+    def read(chunk):
+        index, frame = chunk
+        context = OpenMaya.MDGContext(OpenMaya.MTime(frame, unit))
+
+        worlds = numpy.empty((len(plugs), 16))
+        matrices = numpy.empty((len(plugs), 16))
+        translates = numpy.empty((len(plugs), 3))
+
+        for row, (world, matrix, translate) in enumerate(plugs):
+            worlds[row] = _matrixAt(world, context)
+            matrices[row] = _matrixAt(matrix, context)
+            translates[row] = [plug.asDouble(context) for plug in translate]
+
+        return (cameraMatrices[index],
+                worlds.reshape(-1, 4, 4),
+                matrices.reshape(-1, 4, 4),
+                translates)
+
+    results = {}
+
+    def write(chunk, result):
+        results[chunk[1]] = result
+
+    log.debug("Nudging %s objects over frames %s-%s on %s workers...",
+              len(transformNames), frames[0][1], frames[-1][1], workers)
+
+    pipeline.Pipeline(
+        pipeline.frameSolver(pixelAmount,
+                             view.portWidth(),
+                             view.portHeight(),
+                             depthMode,
+                             plane,
+                             _closestParents(transformNames)),
+        workers=workers).run(frames, read, write)
+
+    values = numpy.full((len(transformNames), 3, len(frames)), numpy.nan)
+
+    for index, frame in frames:
+        valid, translates = results[frame]
+        values[valid, :, index] = translates
+
+    values = values.reshape(-1, len(frames))
+    keyed = numpy.flatnonzero(~numpy.isnan(values).all(axis=1))
+
+    plugNames = [name + "." + attr for name in transformNames
+                 for attr in TRANSLATE_ATTRS]
+
+    keys.setKeys([plugNames[index] for index in keyed],
+                 numpy.array([frame for index, frame in frames]),
+                 values[keyed])
+
+    keyCount = int((~numpy.isnan(values[::3])).sum())
+
+    trace.record("nudgeFrames",
+                 count=len(transformNames),
+                 frames=len(frames),
+                 pixelAmount=list(pixelAmount),
+                 depthMode=depthMode)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+    return keyCount
+
+
+def align(transformNames=None,
+          grid=None,
+          pixel=None,
+          axis=None,
+          view=None,
+          depthMode=projection.DEPTH_DISTANCE,
+          plane=None,
+          mesh=None):
+    """
+    Snaps the screen position of every transform to a pixel grid,
+    an exact pixel or a shared screen row/column. Every target is solved
+    at its own distance from the camera in one batch.
+
+    :param transformNames: Names of transforms to align.
+                           Defaults to the current selection.
+    :type transformNames: list of str
+    :param grid: Pixel grid size to snap to.
+    :type grid: float
+    :param pixel: Exact pixel to snap to, takes precedence over grid.
+    :type pixel: list of 2 floats
+    :param axis: "row" or "column" to only align along one screen axis.
+                 Without pixel the first transform is used as the anchor.
+    :type axis: str
+    :param view: View to align in.
+    :type view: OpenMaya.M3dView or str
+    :param depthMode: How aligned points keep their depth, one of
+                      ViewNudger.projection.DEPTH_MODES or DEPTH_SURFACE.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param mesh: Mesh to slide on for DEPTH_SURFACE.
+    :type mesh: str
+
+    :raises RuntimeError: If nothing to align or no target is in front
+                          of the camera.
+    :raises ValueError: If axis isn't valid, grid isn't positive or
+                        nothing to snap to.
+
+    :return: Names of the transforms that were moved.
+    :rtype: list of str
+    """
+    if not transformNames:
+        transformNames = getSelection(multiple=True)
+
+    projection.checkAlign(grid=grid, pixel=pixel, axis=axis)
+
+    view = parseArgs(transformNames[0], view=view)
+    renderer = getRenderer(view)
+    state = getViewState(view)
+
+    points = getWorldPositions(transformNames)
+    screen, depth = projection.worldToScreenArray(state, points)
+
+    valid = depth >= projection.NEAR_CLIP
+    if not valid.any():
+        log.error("Nothing to align in front of the camera.")
+        raise RuntimeError("Nothing to align in front of the camera.")
+
+    target = projection.alignTargets(screen, valid,
+                                     grid=grid, pixel=pixel, axis=axis)
+
+    result = solvePoints(state,
+                         target,
+                         points,
+                         depthMode=depthMode,
+                         plane=plane,
+                         mesh=mesh)
+
+    moved = [name for name, isValid in zip(transformNames, valid) if isValid]
+
+    log.debug("Aligning %s transforms...", len(moved))
+
+    pre = getWorldMatrices(moved)
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        setWorldPositions(moved, result[valid])
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    history.record(moved, pre, getWorldMatrices(moved))
+
+    trace.record("align",
+                 count=len(moved),
+                 grid=grid,
+                 pixel=pixel,
+                 axis=axis)
+
+    if not renderer == "vp2Renderer":
+        force_update(view)
+
+    return moved
+
+
+def force_update(view):
+    '''
+    Selects the center of the viewport to force it to
+    refresh properly in VP1. THIS IS AWFUL.
+
+    :param view: View to convert point.
+    :type view: OpenMaya.M3dView
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    '''
+    w = shiboken.wrapInstance(long(view.widget()), QtGui.QWidget)
+    cur_pos = QtGui.QCursor.pos()
+    p = w.mapToGlobal(w.rect().center())
+    QtTest.QTest.mouseMove(w)
+    QtTest.QTest.mousePress(
+        w, QtCore.Qt.LeftButton, QtCore.Qt.AltModifier, p)
+    QtTest.QTest.mouseRelease(
+        w, QtCore.Qt.LeftButton, QtCore.Qt.AltModifier, p)
+    QtGui.qApp.processEvents()
+    QtGui.QCursor.setPos(cur_pos)
+
+if __name__ == '__main__':
+
+    pixelAmount = [10.0, 10.0]
+    nudgeView = nudge(transformName="pSphere1",
+                      pixelAmount=pixelAmount,
+                      moveObject=False,
+                      rotateView=True)
@@ -0,0 +1,444 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import os
+import re
+import glob
+import hashlib
+import logging
+
+try:
+    from maya import cmds
+except:
+    pass
+
+try:
+    import numpy
+    from numpy.lib import format as npformat
+except:
+    pass
+
+from . import projection
+
+log = logging.getLogger("ViewNudger")
+
+# Camera shape attributes passed to projection.cameraProjection.
+CAMERA_ATTRS = [
+    "focalLength",
+    "horizontalFilmAperture",
+    "verticalFilmAperture",
+    "filmFit",
+    "overscan",
+    "orthographic",
+    "orthographicWidth",
+    "nearClipPlane",
+    "farClipPlane",
+]
+
+# Camera shape attributes projection.cameraProjection doesn't model, with
+# the value that leaves the projection as it is.
+UNSUPPORTED_ATTRS = [
+    ("horizontalFilmOffset", 0.0),
+    ("verticalFilmOffset", 0.0),
+    ("filmFitOffset", 0.0),
+    ("lensSqueezeRatio", 1.0),
+    ("cameraScale", 1.0),
+    ("filmTranslateH", 0.0),
+    ("filmTranslateV", 0.0),
+    ("filmRollValue", 0.0),
+    ("preScale", 1.0),
+    ("postScale", 1.0),
+]
+
+# Unsupported attributes that only apply while their switch is on.
+SWITCHED_ATTRS = [
+    ("panZoomEnabled", [("horizontalPan", 0.0),
+                        ("verticalPan", 0.0),
+                        ("zoom", 1.0)]),
+    ("shakeEnabled", [("horizontalShake", 0.0),
+                      ("verticalShake", 0.0)]),
+]
+
+# Index of each matrix in a cached frame.
+WORLD = 0
+VIEW = 1
+PROJECTION = 2
+
+# Bump when the file layout changes so old caches miss.
+VERSION = 2
+
+
+class CameraCache(object):
+    """
+    :class:`CameraCache` stores the world, view and projection matrices of
+    a camera for a frame range in one .npy file in a folder per camera.
+    Files are keyed by a hash of everything upstream of the camera and
+    memory-mapped on later runs, so nothing is re-evaluated until the
+    animation changes.
+    """
+    def __init__(self, directory=None):
+        """
+        :param directory: Cache folder, defaults to viewNudgerCache in
+                          Maya's user app dir.
+        :type directory: str
+        """
+        self._directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = os.path.join(
+                cmds.internalVar(userAppDir=True), "viewNudgerCache")
+
+        return self._directory
+
+    def stats(self):
+        """
+        Gets the cache hit and miss counts of this session.
+
+        :raises: None
+
+        :return: hits and misses.
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def cameraDirectory(self, camera):
+        """
+        Gets the folder holding the cache files of a camera.
+
+        :param camera: Camera transform's full path.
+        :type camera: str
+
+        :raises: None
+
+        :return: Folder path.
+        :rtype: str
+        """
+        return os.path.join(self.directory, _safeName(camera))
+
+    def path(self, camera, key):
+        """
+        Gets the cache file of a camera and key.
+
+        :param camera: Camera transform's full path.
+        :type camera: str
+        :param key: Hash from :func:`cameraKey`.
+        :type key: str
+
+        :raises: None
+
+        :return: File path.
+        :rtype: str
+        """
+        return os.path.join(self.cameraDirectory(camera), key + ".npy")
+
+    def load(self, camera, key):
+        """
+        Memory-maps the cached matrices of a camera.
+
+        :param camera: Camera transform's full path.
+        :type camera: str
+        :param key: Hash from :func:`cameraKey`.
+        :type key: str
+
+        :raises: None
+
+        :return: Read only matrices or None on a miss.
+        :rtype: numpy.memmap (frames, 3, 4, 4)
+        """
+        path = self.path(camera, key)
+
+        if not os.path.isfile(path):
+            self.misses += 1
+            log.debug("Camera cache miss for %s.", camera)
+            return None
+
+        self.hits += 1
+        log.debug("Camera cache hit for %s.", camera)
+
+        return numpy.load(path, mmap_mode="r")
+
+    def save(self, camera, key, matrices):
+        """
+        Writes matrices for a camera, replacing its stale files.
+
+        :param camera: Camera transform's full path.
+        :type camera: str
+        :param key: Hash from :func:`cameraKey`.
+        :type key: str
+        :param matrices: Matrices per frame.
+        :type matrices: numpy.ndarray (frames, 3, 4, 4)
+
+        :raises: None
+
+        :return: Read only matrices mapped from the new file.
+        :rtype: numpy.memmap (frames, 3, 4, 4)
+        """
+        directory = self.cameraDirectory(camera)
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        for stale in glob.glob(os.path.join(directory, "*.npy")):
+            try:
+                os.remove(stale)
+            except OSError:
+                # Still mapped somewhere, it just won't be hit again.
+                log.debug("Couldn't remove stale cache %s.", stale)
+
+        path = self.path(camera, key)
+        temp = path + ".tmp"
+
+        output = npformat.open_memmap(
+            temp, mode="w+", dtype=numpy.float64, shape=matrices.shape)
+        output[:] = matrices
+        output.flush()
+        del output
+
+        os.rename(temp, path)
+
+        return numpy.load(path, mmap_mode="r")
+
+    def get(self, camera, start, end, width, height):
+        """
+        Gets the matrices of a camera for every frame from start to end,
+        evaluating and caching them on a miss.
+
+        :param camera: Camera transform.
+        :type camera: str
+        :param start: First frame.
+        :type start: int
+        :param end: Last frame, inclusive.
+        :type end: int
+        :param width: Viewport width in pixels.
+        :type width: int
+        :param height: Viewport height in pixels.
+        :type height: int
+
+        :raises RuntimeError: If the camera uses attributes
+                              projection.cameraProjection doesn't model.
+
+        :return: Read only matrices, index with WORLD, VIEW and PROJECTION.
+        :rtype: numpy.memmap (frames, 3, 4, 4)
+        """
+        camera = cmds.ls(camera, long=True)[0]
+        key = cameraKey(camera, start, end, width, height)
+
+        matrices = self.load(camera, key)
+        if matrices is None:
+            matrices = self.save(camera, key, evaluateCamera(
+                camera, start, end, width, height))
+
+        return matrices
+
+    def clear(self):
+        """
+        Deletes every cache file.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        for path in glob.glob(os.path.join(self.directory, "*", "*.npy")):
+            os.remove(path)
+
+
+def _safeName(camera):
+    # Readable, plus a hash of the exact path since |grp|cam and grp_cam
+    # would otherwise collide.
+    digest = hashlib.sha1(camera.encode("utf-8")).hexdigest()[:8]
+    return "{0}-{1}".format(re.sub(r"[^\w]", "_", camera.strip("|")), digest)
+
+
+def _cameraShape(camera):
+    return cmds.listRelatives(
+        camera, shapes=True, type="camera", fullPath=True)[0]
+
+
+def _unsupportedValues(shape, frame):
+    values = [(attr, default, cmds.getAttr(shape + "." + attr, time=frame))
+              for attr, default in UNSUPPORTED_ATTRS]
+
+    for switch, attrs in SWITCHED_ATTRS:
+        if cmds.getAttr(shape + "." + switch, time=frame):
+            values.extend(
+                (attr, default, cmds.getAttr(shape + "." + attr, time=frame))
+                for attr, default in attrs)
+
+    return values
+
+
+def checkCamera(camera, frame):
+    """
+    Checks a camera only uses what projection.cameraProjection models.
+
+    :param camera: Camera transform.
+    :type camera: str
+    :param frame: Frame to check.
+    :type frame: int
+
+    :raises RuntimeError: If a film offset, lens squeeze, camera scale,
+                          film transform, 2D pan/zoom or shake isn't at
+                          its default.
+
+    :return: None
+    :rtype: NoneType
+    """
+    _checkShape(_cameraShape(camera), frame)
+
+
+def _checkShape(shape, frame):
+    changed = [attr for attr, default, value in
+               _unsupportedValues(shape, frame)
+               if abs(value - default) > 1e-9]
+
+    if changed:
+        log.error("%s changes %s on frame %s, which cached projections"
+                  " don't support.", shape, ", ".join(changed), frame)
+        raise RuntimeError(
+            "%s changes %s on frame %s, which cached projections don't"
+            " support." % (shape, ", ".join(changed), frame))
+
+
+def cameraKey(camera, start, end, width, height):
+    """
+    Hashes everything that changes the matrices of a camera: the frame
+    range, viewport size, the camera and its parents' values and every
+    animation curve upstream of them.
+
+    :param camera: Camera transform.
+    :type camera: str
+    :param start: First frame.
+    :type start: int
+    :param end: Last frame, inclusive.
+    :type end: int
+    :param width: Viewport width in pixels.
+    :type width: int
+    :param height: Viewport height in pixels.
+    :type height: int
+
+    :raises: None
+
+    :return: Hex digest.
+    :rtype: str
+    """
+    digest = hashlib.sha1()
+
+    def update(value):
+        digest.update(repr(value).encode("utf-8"))
+
+    update((VERSION, start, end, width, height))
+
+    camera = cmds.ls(camera, long=True)[0]
+    shape = _cameraShape(camera)
+
+    # The camera and each of its parents.
+    parts = camera.split("|")
+    nodes = ["|".join(parts[:i]) for i in range(2, len(parts) + 1)]
+    nodes.append(shape)
+
+    for node in nodes:
+        update(node)
+
+    # Sampled at the first frame so the key doesn't depend on current time,
+    # this catches static edits that animation curves don't.
+    for node in nodes[:-1]:
+        update(cmds.getAttr(node + ".matrix", time=start))
+
+    for attr in CAMERA_ATTRS:
+        update(cmds.getAttr(shape + "." + attr, time=start))
+
+    update(_unsupportedValues(shape, start))
+
+    history = cmds.listHistory(nodes) or []
+    update(sorted(set(cmds.nodeType(node) for node in history)))
+
+    for curve in sorted(cmds.ls(history, type="animCurve")):
+        update(curve)
+        update(cmds.keyframe(curve, query=True, timeChange=True,
+                             valueChange=True))
+        update(cmds.keyTangent(curve, query=True, inAngle=True,
+                               outAngle=True, inWeight=True,
+                               outWeight=True))
+        update(cmds.getAttr(curve + ".preInfinity"))
+        update(cmds.getAttr(curve + ".postInfinity"))
+
+    return digest.hexdigest()
+
+
+def frameViewState(matrices, width, height):
+    """
+    Builds the view state of one cached frame without touching Maya, so
+    it can be called from worker threads.
+
+    :param matrices: Matrices of one frame, index with WORLD, VIEW and
+                     PROJECTION.
+    :type matrices: numpy.ndarray (3, 4, 4)
+    :param width: Viewport width in pixels.
+    :type width: int
+    :param height: Viewport height in pixels.
+    :type height: int
+
+    :raises: None
+
+    :return: View state of the frame.
+    :rtype: ViewNudger.projection.ViewState
+    """
+    world = matrices[WORLD]
+
+    # Cameras look down their -Z axis.
+    return projection.makeViewState(
+        viewProjection=matrices[VIEW].dot(matrices[PROJECTION]),
+        width=width,
+        height=height,
+        cameraPoint=world[3, :3],
+        cameraDir=-world[2, :3])
+
+
+def evaluateCamera(camera, start, end, width, height):
+    """
+    Evaluates the world, view and projection matrix of a camera per frame.
+
+    :param camera: Camera transform.
+    :type camera: str
+    :param start: First frame.
+    :type start: int
+    :param end: Last frame, inclusive.
+    :type end: int
+    :param width: Viewport width in pixels.
+    :type width: int
+    :param height: Viewport height in pixels.
+    :type height: int
+
+    :raises RuntimeError: If the camera uses attributes
+                          projection.cameraProjection doesn't model.
+
+    :return: Matrices per frame.
+    :rtype: numpy.ndarray (frames, 3, 4, 4)
+    """
+    shape = _cameraShape(camera)
+    frames = range(int(start), int(end) + 1)
+
+    matrices = numpy.empty((len(frames), 3, 4, 4))
+
+    for index, frame in enumerate(frames):
+        _checkShape(shape, frame)
+
+        world = numpy.array(cmds.getAttr(
+            camera + ".worldMatrix", time=frame)).reshape(4, 4)
+
+        attrs = dict((attr, cmds.getAttr(shape + "." + attr, time=frame))
+                     for attr in CAMERA_ATTRS)
+
+        matrices[index, WORLD] = world
+        matrices[index, VIEW] = numpy.linalg.inv(world)
+        matrices[index, PROJECTION] = projection.cameraProjection(
+            width, height, **attrs)
+
+    return matrices
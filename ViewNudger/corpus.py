@@ -0,0 +1,577 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import logging
+
+try:
+    from maya import OpenMaya
+except:
+    pass
+
+try:
+    import numpy
+except:
+    pass
+
+from . import api
+from . import projection
+
+log = logging.getLogger("ViewNudger")
+
+this_package = os.path.abspath(os.path.dirname(__file__))
+
+CORPUS_PATH = os.path.join(this_package, "data", "projection_corpus.json")
+
+# Relative error allowed against the recorded results.
+TOLERANCE = 1e-7
+
+# Relative error allowed when a perspective point goes to screen and back.
+ROUND_TRIP_TOLERANCE = 1e-6
+
+# Camera space depths sampled for every setup, including both sides of
+# the NEAR_CLIP early return and a point behind the camera.
+DEPTHS = [-5.0, 0.0099, 0.0101, 0.5, 5.0, 50.0, 500.0, 5000.0]
+
+PORT_SIZES = [(1920, 1080), (1080, 1920), (640, 480), (2048, 858), (512, 512)]
+APERTURES = [(1.417, 0.945), (0.980, 0.735), (1.260, 0.530), (0.825, 0.446)]
+FOCAL_LENGTHS = [12.0, 35.0, 85.0, 300.0]
+OVERSCANS = [1.0, 1.3]
+CLIP_PLANES = [(0.1, 10000.0), (0.001, 100000.0), (1.0, 1000.0)]
+
+
+def _pythonWorldToScreen(setup, state, points):
+    viewProjection = state.viewProjection.tolist()
+    cameraPoint = state.cameraPoint.tolist()
+    cameraDir = state.cameraDir.tolist()
+
+    result = []
+
+    for point in points:
+        z = sum((point[i] - cameraPoint[i]) * cameraDir[i] for i in range(3))
+
+        if z < projection.NEAR_CLIP:
+            result.append([0.0, 0.0])
+            continue
+
+        clip = [point[0] * viewProjection[0][j] +
+                point[1] * viewProjection[1][j] +
+                point[2] * viewProjection[2][j] +
+                viewProjection[3][j] for j in range(4)]
+
+        result.append([((clip[0] / clip[3]) + 1.0) / 2.0 * state.width,
+                       ((clip[1] / clip[3]) + 1.0) / 2.0 * state.height])
+
+    return result
+
+
+def _pythonScreenToWorld(setup, state, points2D, distances):
+    viewProjection = state.viewProjection.tolist()
+    inverse = state.inverseViewProjection.tolist()
+    cameraPoint = state.cameraPoint.tolist()
+    cameraDir = state.cameraDir.tolist()
+
+    result = []
+
+    for point2D, distance in zip(points2D, distances):
+        w = viewProjection[3][3]
+        clip = [((2.0 * (point2D[0] / state.width)) - 1.0) * w,
+                ((2.0 * (point2D[1] / state.height)) - 1.0) * w,
+                viewProjection[3][2],
+                w]
+
+        world = [sum(clip[i] * inverse[i][j] for i in range(4))
+                 for j in range(4)]
+
+        direction = [world[i] / world[3] - cameraPoint[i] for i in range(3)]
+        length = math.sqrt(sum(v * v for v in direction))
+        direction = [v / length for v in direction]
+
+        if sum(direction[i] * cameraDir[i] for i in range(3)) < 0:
+            direction = [-v for v in direction]
+
+        result.append([cameraPoint[i] + direction[i] * distance
+                       for i in range(3)])
+
+    return result
+
+
+def _numpyWorldToScreen(setup, state, points):
+    screen, depth = projection.worldToScreenArray(state, points)
+    screen[depth < projection.NEAR_CLIP] = 0.0
+    return screen
+
+
+def _numpyScreenToWorld(setup, state, points2D, distances):
+    return projection.screenToWorldArray(state, points2D, distances)
+
+
+class StubView(object):
+    """
+    :class:`StubView` has the parts of OpenMayaUI.M3dView that
+    :func:`ViewNudger.api.worldToScreen` and
+    :func:`ViewNudger.api.screenToWorld` use, built from a corpus setup.
+    """
+    def __init__(self, setup):
+        """
+        :param setup: Corpus setup.
+        :type setup: dict
+        """
+        viewMatrix, projectionMatrix = setupMatrices(setup)
+
+        self._viewMatrix = viewMatrix.ravel().tolist()
+        self._projectionMatrix = projectionMatrix.ravel().tolist()
+        self._width = setup["width"]
+        self._height = setup["height"]
+
+    def projectionMatrix(self, matrix):
+        OpenMaya.MScriptUtil.createMatrixFromList(
+            self._projectionMatrix, matrix)
+
+    def modelViewMatrix(self, matrix):
+        OpenMaya.MScriptUtil.createMatrixFromList(self._viewMatrix, matrix)
+
+    def portWidth(self):
+        return self._width
+
+    def portHeight(self):
+        return self._height
+
+
+class StubCamera(object):
+    """
+    :class:`StubCamera` has the parts of OpenMaya.MFnCamera that
+    :func:`ViewNudger.api.worldToScreen` and
+    :func:`ViewNudger.api.screenToWorld` use.
+    """
+    def __init__(self, state):
+        """
+        :param state: View state of the corpus setup.
+        :type state: ViewNudger.projection.ViewState
+        """
+        self._viewDirection = state.cameraDir.tolist()
+
+    def viewDirection(self, space):
+        return OpenMaya.MVector(*self._viewDirection)
+
+
+def _apiWorldToScreen(setup, state, points):
+    view = StubView(setup)
+    camera = StubCamera(state)
+    cameraPoint = OpenMaya.MPoint(*state.cameraPoint.tolist())
+
+    return [list(api.worldToScreen(camera,
+                                   cameraPoint,
+                                   OpenMaya.MPoint(*point),
+                                   view))
+            for point in numpy.asarray(points).tolist()]
+
+
+def _apiScreenToWorld(setup, state, points2D, distances):
+    view = StubView(setup)
+    camera = StubCamera(state)
+    cameraPoint = OpenMaya.MPoint(*state.cameraPoint.tolist())
+
+    result = []
+
+    for point2D, distance in zip(numpy.asarray(points2D).tolist(),
+                                 numpy.asarray(distances).tolist()):
+        point = api.screenToWorld(camera, point2D, cameraPoint, distance, view)
+        result.append([point.x, point.y, point.z])
+
+    return result
+
+
+# name: (worldToScreen, screenToWorld). "api" runs the real
+# api.worldToScreen and api.screenToWorld on stubs and needs OpenMaya,
+# the others must match their semantics including the early return.
+BACKENDS = {
+    "api": (_apiWorldToScreen, _apiScreenToWorld),
+    "python": (_pythonWorldToScreen, _pythonScreenToWorld),
+    "numpy": (_numpyWorldToScreen, _numpyScreenToWorld),
+}
+
+# Backend the corpus should be recorded with.
+REFERENCE_BACKEND = "api"
+
+
+def availableBackends():
+    """
+    Gets the backends that can run here, "api" only runs inside Maya.
+
+    :raises: None
+
+    :return: Backend names.
+    :rtype: list of str
+    """
+    names = sorted(BACKENDS)
+
+    if "OpenMaya" not in globals():
+        names.remove("api")
+
+    return names
+
+
+def composeMatrix(translate, rotate):
+    """
+    Builds a row major world matrix with an xyz rotate order.
+
+    :param translate: Translation.
+    :type translate: list of 3 floats
+    :param rotate: Rotation in degrees.
+    :type rotate: list of 3 floats
+
+    :raises: None
+
+    :return: World matrix.
+    :rtype: numpy.ndarray (4, 4)
+    """
+    x, y, z = [math.radians(r) for r in rotate]
+
+    rx = numpy.array([[1, 0, 0], [0, math.cos(x), math.sin(x)],
+                      [0, -math.sin(x), math.cos(x)]])
+    ry = numpy.array([[math.cos(y), 0, -math.sin(y)], [0, 1, 0],
+                      [math.sin(y), 0, math.cos(y)]])
+    rz = numpy.array([[math.cos(z), math.sin(z), 0],
+                      [-math.sin(z), math.cos(z), 0], [0, 0, 1]])
+
+    matrix = numpy.identity(4)
+    matrix[:3, :3] = rx.dot(ry).dot(rz)
+    matrix[3, :3] = translate
+
+    return matrix
+
+
+def setupMatrices(setup):
+    """
+    Builds the view and projection matrix of a corpus setup.
+
+    :param setup: Corpus setup.
+    :type setup: dict
+
+    :raises: None
+
+    :return: View and projection matrix.
+    :rtype: tuple of 2 numpy.ndarray (4, 4)
+    """
+    worldMatrix = numpy.array(setup["worldMatrix"]).reshape(4, 4)
+
+    projectionMatrix = projection.cameraProjection(
+        setup["width"], setup["height"], **setup["camera"])
+
+    return numpy.linalg.inv(worldMatrix), projectionMatrix
+
+
+def setupState(setup):
+    """
+    Builds the view state of a corpus setup.
+
+    :param setup: Corpus setup.
+    :type setup: dict
+
+    :raises: None
+
+    :return: View state.
+    :rtype: ViewNudger.projection.ViewState
+    """
+    worldMatrix = numpy.array(setup["worldMatrix"]).reshape(4, 4)
+    viewMatrix, projectionMatrix = setupMatrices(setup)
+
+    return projection.makeViewState(
+        viewProjection=viewMatrix.dot(projectionMatrix),
+        width=setup["width"],
+        height=setup["height"],
+        cameraPoint=worldMatrix[3, :3],
+        cameraDir=-worldMatrix[2, :3])
+
+
+def _setupPoints(rng, setup):
+    worldMatrix = numpy.array(setup["worldMatrix"]).reshape(4, 4)
+    projectionMatrix = projection.cameraProjection(
+        setup["width"], setup["height"], **setup["camera"])
+
+    # Half of the visible extent at depth 1, or absolute when ortho.
+    halfWidth = 1.0 / projectionMatrix[0, 0]
+    halfHeight = 1.0 / projectionMatrix[1, 1]
+    orthographic = setup["camera"]["orthographic"]
+
+    points = []
+
+    for depth in DEPTHS:
+        for _ in range(2):
+            scale = 1.0 if orthographic else abs(depth)
+            local = [rng.uniform(-1.2, 1.2) * halfWidth * scale,
+                     rng.uniform(-1.2, 1.2) * halfHeight * scale,
+                     -depth,
+                     1.0]
+            points.append(numpy.dot(local, worldMatrix)[:3].tolist())
+
+    return points
+
+
+def generate(seed=0):
+    """
+    Generates the corpus camera setups and sample points.
+
+    :param seed: Random seed.
+    :type seed: int
+
+    :raises: None
+
+    :return: Corpus setups without results.
+    :rtype: list of dict
+    """
+    rng = random.Random(seed)
+    setups = []
+
+    def add(name, camera, width, height):
+        setup = {
+            "name": name,
+            "camera": camera,
+            "width": width,
+            "height": height,
+            "worldMatrix": composeMatrix(
+                [rng.uniform(-50, 50) for _ in range(3)],
+                [rng.uniform(-180, 180) for _ in range(3)]).ravel().tolist(),
+        }
+        setup["points"] = _setupPoints(rng, setup)
+        setups.append(setup)
+
+    for index, focalLength in enumerate(FOCAL_LENGTHS):
+        for filmFit in (projection.FIT_FILL, projection.FIT_HORIZONTAL,
+                        projection.FIT_VERTICAL, projection.FIT_OVERSCAN):
+            for apertureIndex, aperture in enumerate(APERTURES):
+                width, height = PORT_SIZES[
+                    (index + filmFit + apertureIndex) % len(PORT_SIZES)]
+                near, far = CLIP_PLANES[
+                    (index + apertureIndex) % len(CLIP_PLANES)]
+                overscan = OVERSCANS[(filmFit + apertureIndex) % 2]
+
+                add("persp_f%s_fit%s_ap%s" % (focalLength, filmFit,
+                                             apertureIndex),
+                    {"focalLength": focalLength,
+                     "horizontalFilmAperture": aperture[0],
+                     "verticalFilmAperture": aperture[1],
+                     "filmFit": filmFit,
+                     "overscan": overscan,
+                     "orthographic": False,
+                     "nearClipPlane": near,
+                     "farClipPlane": far},
+                    width, height)
+
+    for filmFit in (projection.FIT_FILL, projection.FIT_HORIZONTAL,
+                    projection.FIT_VERTICAL, projection.FIT_OVERSCAN):
+        width, height = PORT_SIZES[filmFit % len(PORT_SIZES)]
+
+        add("ortho_fit%s" % filmFit,
+            {"orthographic": True,
+             "orthographicWidth": [1.0, 30.0, 500.0, 30.0][filmFit],
+             "filmFit": filmFit,
+             "overscan": OVERSCANS[filmFit % 2],
+             "nearClipPlane": 0.1,
+             "farClipPlane": 10000.0},
+            width, height)
+
+    for near, far in ((1e-4, 1e7), (100.0, 1e6), (0.5, 1.0)):
+        add("near_%s_far_%s" % (near, far),
+            {"focalLength": 35.0,
+             "orthographic": False,
+             "nearClipPlane": near,
+             "farClipPlane": far},
+            1920, 1080)
+
+    return setups
+
+
+def record(path=CORPUS_PATH, seed=0, backend=REFERENCE_BACKEND):
+    """
+    Generates the corpus and records the results of a backend.
+    Only re-record when a behaviour change is intended, from mayapy so
+    the real api functions are the reference.
+
+    :param path: Corpus file.
+    :type path: str
+    :param seed: Random seed.
+    :type seed: int
+    :param backend: Name of the backend to record.
+    :type backend: str
+
+    :raises RuntimeError: If the backend can't run here.
+
+    :return: Recorded setups.
+    :rtype: list of dict
+    """
+    if backend not in availableBackends():
+        log.error("Backend %s can't run here, record from mayapy.", backend)
+        raise RuntimeError(
+            "Backend %s can't run here, record from mayapy." % backend)
+
+    worldToScreen, screenToWorld = BACKENDS[backend]
+    setups = generate(seed=seed)
+
+    for setup in setups:
+        state = setupState(setup)
+        points = numpy.array(setup["points"])
+        distances = numpy.linalg.norm(points - state.cameraPoint, axis=1)
+
+        screen = numpy.asarray(worldToScreen(setup, state, points))
+        setup["screen"] = screen.tolist()
+        setup["world"] = numpy.asarray(
+            screenToWorld(setup, state, screen, distances)).tolist()
+
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with open(path, "w") as f:
+        json.dump({"seed": seed,
+                   "backend": backend,
+                   "provisional": backend != REFERENCE_BACKEND,
+                   "setups": setups}, f)
+
+    return setups
+
+
+def _relativeError(result, expected):
+    result = numpy.asarray(result, dtype=numpy.float64)
+    expected = numpy.asarray(expected, dtype=numpy.float64)
+
+    scale = numpy.maximum(1.0, numpy.abs(expected))
+    return float(numpy.max(numpy.abs(result - expected) / scale))
+
+
+def check(backends=None, path=CORPUS_PATH, repeat=3, bulkSize=10000):
+    """
+    Checks backends against the recorded corpus and measures throughput.
+    The backend the corpus was recorded with is flagged as the reference,
+    its errors are zero by construction. A corpus recorded without Maya
+    is provisional, it pins the reimplementations to each other but not
+    to the real api functions until it's re-recorded from mayapy.
+
+    Points in front of the camera must also survive the round trip to
+    screen and back at their own distance. Orthographic setups are known
+    to fail it, screenToWorld casts their rays from the camera position
+    instead of along the view axis, and are reported in knownFailures.
+
+    :param backends: Backend names, defaults to every available backend.
+    :type backends: list of str
+    :param path: Corpus file.
+    :type path: str
+    :param repeat: Timing runs, the fastest is reported.
+    :type repeat: int
+    :param bulkSize: Points projected per timing run.
+    :type bulkSize: int
+
+    :raises: None
+
+    :return: Per backend errors, points per second and pass state.
+    :rtype: dict
+    """
+    with open(path) as f:
+        corpus = json.load(f)
+
+    setups = corpus["setups"]
+    provisional = corpus.get("provisional", False)
+
+    if provisional:
+        log.warning("Corpus was recorded with the %s backend, re-record it"
+                    " from mayapy to check against the api functions.",
+                    corpus.get("backend"))
+
+    prepared = []
+    for setup in setups:
+        state = setupState(setup)
+        points = numpy.array(setup["points"])
+        distances = numpy.linalg.norm(points - state.cameraPoint, axis=1)
+        prepared.append((setup, state, points, distances))
+
+    report = {}
+
+    for name in backends or availableBackends():
+        worldToScreen, screenToWorld = BACKENDS[name]
+
+        screenError = 0.0
+        worldError = 0.0
+        roundTripError = 0.0
+        failures = []
+        knownFailures = []
+
+        for setup, state, points, distances in prepared:
+            screen = worldToScreen(setup, state, points)
+            world = screenToWorld(setup, state, setup["screen"], distances)
+
+            setupScreenError = _relativeError(screen, setup["screen"])
+            setupWorldError = _relativeError(world, setup["world"])
+
+            if setupScreenError > TOLERANCE or setupWorldError > TOLERANCE:
+                failures.append(setup["name"])
+
+            screenError = max(screenError, setupScreenError)
+            worldError = max(worldError, setupWorldError)
+
+            depth = (points - state.cameraPoint).dot(state.cameraDir)
+            front = depth >= projection.NEAR_CLIP
+            error = _relativeError(numpy.asarray(world)[front], points[front])
+
+            if error > ROUND_TRIP_TOLERANCE:
+                if setup["camera"]["orthographic"]:
+                    knownFailures.append(setup["name"] + " round trip")
+                    continue
+
+                failures.append(setup["name"] + " round trip")
+
+            roundTripError = max(roundTripError, error)
+
+        setup, state, points, distances = prepared[0]
+        tiles = max(1, bulkSize // len(points))
+        points = numpy.tile(points, (tiles, 1))
+        screen = numpy.tile(setup["screen"], (tiles, 1))
+        distances = numpy.tile(distances, tiles)
+        best = None
+
+        for _ in range(repeat):
+            start = time.time()
+
+            worldToScreen(setup, state, points)
+            screenToWorld(setup, state, screen, distances)
+
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        count = len(points)
+
+        report[name] = {
+            "screenError": screenError,
+            "worldError": worldError,
+            "roundTripError": roundTripError,
+            "pointsPerSecond": count / best if best else float("inf"),
+            "failures": failures,
+            "knownFailures": knownFailures,
+            "reference": name == corpus.get("backend"),
+            "provisional": provisional,
+            "passed": not failures,
+        }
+
+        log.info("%s: %s points/s, %s failures, %s known failures.",
+                 name, int(report[name]["pointsPerSecond"]), len(failures),
+                 len(knownFailures))
+
+    return report
+
+
+if __name__ == '__main__':
+
+    if "--record" in sys.argv:
+        record()
+
+    results = check()
+    print(json.dumps(results, indent=4))
+
+    sys.exit(not all(result["passed"] for result in results.values()))
@@ -0,0 +1,181 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import array
+
+# Floats per entry, a pre and post 4x4 matrix.
+STRIDE = 32
+
+
+class NudgeHistory(object):
+    """
+    :class:`NudgeHistory` keeps a bounded ring buffer of world matrices
+    per nudged transform, independent of Maya's undo queue.
+
+    Every entry holds the matrix before and after a nudge, so stepping
+    back any number of nudges is index arithmetic plus one write.
+    """
+    def __init__(self, size=100):
+        """
+        :param size: Number of nudges kept per transform.
+        :type size: int
+        """
+        self.size = size
+        self._buffers = {}
+
+    def _buffer(self, transformName):
+        buf = self._buffers.get(transformName)
+
+        if buf is None:
+            # [pre/post matrices, next write index, number of entries]
+            buf = [array.array("d", [0.0]) * (self.size * STRIDE), 0, 0]
+            self._buffers[transformName] = buf
+
+        return buf
+
+    def record(self, transformNames, pre, post):
+        """
+        Records one nudge for every transform.
+
+        :param transformNames: Names of nudged transforms.
+        :type transformNames: list of str
+        :param pre: World matrices before the nudge.
+        :type pre: list of 16 floats per transform
+        :param post: World matrices after the nudge.
+        :type post: list of 16 floats per transform
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        for transformName, preMatrix, postMatrix in zip(
+                transformNames, pre, post):
+
+            buf = self._buffer(transformName)
+            entries, head, count = buf
+
+            offset = head * STRIDE
+            entries[offset:offset + 16] = array.array("d", preMatrix)
+            entries[offset + 16:offset + STRIDE] = array.array(
+                "d", postMatrix)
+
+            buf[1] = (head + 1) % self.size
+            buf[2] = min(count + 1, self.size)
+
+    def count(self, transformName):
+        """
+        Gets the number of nudges that can be stepped back.
+
+        :param transformName: Name of a nudged transform.
+        :type transformName: str
+
+        :raises: None
+
+        :return: Number of recorded nudges.
+        :rtype: int
+        """
+        buf = self._buffers.get(transformName)
+        return buf[2] if buf else 0
+
+    def latest(self, transformName):
+        """
+        Gets the matrix after the most recent nudge.
+
+        :param transformName: Name of a nudged transform.
+        :type transformName: str
+
+        :raises: None
+
+        :return: World matrix or None without history.
+        :rtype: list of 16 floats
+        """
+        buf = self._buffers.get(transformName)
+
+        if not buf or not buf[2]:
+            return None
+
+        offset = ((buf[1] - 1) % self.size) * STRIDE
+        return buf[0][offset + 16:offset + STRIDE].tolist()
+
+    def revert(self, transformNames, count=1):
+        """
+        Steps back the last count nudges of every transform.
+
+        :param transformNames: Names of nudged transforms.
+        :type transformNames: list of str
+        :param count: Number of nudges to step back, at least 1.
+        :type count: int
+
+        :raises ValueError: If count is less than 1.
+
+        :return: Transforms with history and the matrices to restore.
+        :rtype: tuple of list of str and list of 16 floats per transform
+        """
+        if count < 1:
+            raise ValueError("Can't step back %s nudges." % count)
+
+        names = []
+        matrices = []
+
+        for transformName in transformNames:
+            buf = self._buffers.get(transformName)
+
+            if not buf or not buf[2]:
+                continue
+
+            steps = min(count, buf[2])
+            index = (buf[1] - steps) % self.size
+
+            names.append(transformName)
+            offset = index * STRIDE
+            matrices.append(buf[0][offset:offset + 16].tolist())
+
+            buf[1] = index
+            buf[2] -= steps
+
+        return names, matrices
+
+    def reset(self, transformNames):
+        """
+        Steps back every recorded nudge of every transform.
+
+        :param transformNames: Names of nudged transforms.
+        :type transformNames: list of str
+
+        :raises: None
+
+        :return: Transforms with history and their pre-nudge matrices.
+        :rtype: tuple of list of str and list of 16 floats per transform
+        """
+        return self.revert(transformNames, count=self.size)
+
+    def transforms(self):
+        """
+        Gets every transform with recorded nudges.
+
+        :raises: None
+
+        :return: Names of nudged transforms.
+        :rtype: list of str
+        """
+        return [name for name, buf in self._buffers.items() if buf[2]]
+
+    def clear(self, transformNames=None):
+        """
+        Forgets the history of some or all transforms.
+
+        :param transformNames: Names of transforms, defaults to all.
+        :type transformNames: list of str
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        if transformNames is None:
+            self._buffers.clear()
+            return
+
+        for transformName in transformNames:
+            self._buffers.pop(transformName, None)
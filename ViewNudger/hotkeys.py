@@ -0,0 +1,328 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import logging
+
+try:
+    from maya import cmds
+    from maya import OpenMaya
+    from maya import OpenMayaUI
+except:
+    pass
+
+from . import api
+from . import scheduler
+
+log = logging.getLogger("ViewNudger")
+
+CATEGORY = "ViewNudger"
+
+# Selections bigger than this are solved on worker threads.
+PIPELINE_THRESHOLD = 1000
+
+# optionVar name, default.
+OPTION_VARS = {
+    "step": ("viewNudgerStep", 1.0),
+    "multiplier": ("viewNudgerMultiplier", 10.0),
+    "moveObject": ("viewNudgerMoveObject", 0),
+    "rotateView": ("viewNudgerRotateView", 0),
+    "depthMode": ("viewNudgerDepthMode", api.projection.DEPTH_DISTANCE),
+}
+
+DIRECTIONS = {
+    "Up": (0.0, 1.0),
+    "Down": (0.0, -1.0),
+    "Left": (-1.0, 0.0),
+    "Right": (1.0, 0.0),
+}
+
+COMMAND = "from ViewNudger import hotkeys; hotkeys.nudge({0}, {1}, {2})"
+
+_settings = {}
+
+# Warm data per viewport widget: view, renderer, camera and view state.
+# The state is dropped when the camera is edited, the rest when the
+# viewport shows another camera.
+_views = {}
+
+_sceneCallbacks = []
+
+
+def loadSettings():
+    """
+    Reads the settings from optionVars into the warm cache.
+
+    :raises: None
+
+    :return: Settings.
+    :rtype: dict
+    """
+    _settings.clear()
+
+    for key, (optionVar, default) in OPTION_VARS.items():
+        if cmds.optionVar(exists=optionVar):
+            _settings[key] = cmds.optionVar(query=optionVar)
+        else:
+            _settings[key] = default
+
+    return _settings
+
+
+def setSettings(**settings):
+    """
+    Stores settings in optionVars and the warm cache.
+
+    :param settings: Any of step, multiplier, moveObject, rotateView and
+                     depthMode.
+    :type settings: dict
+
+    :raises KeyError: If a setting doesn't exist.
+
+    :return: None
+    :rtype: NoneType
+    """
+    if not _settings:
+        loadSettings()
+
+    for key, value in settings.items():
+        optionVar = OPTION_VARS[key][0]
+
+        if isinstance(value, str):
+            cmds.optionVar(stringValue=(optionVar, value))
+        elif isinstance(value, float):
+            cmds.optionVar(floatValue=(optionVar, value))
+        else:
+            cmds.optionVar(intValue=(optionVar, int(value)))
+
+        _settings[key] = value
+
+
+def getViewCache():
+    """
+    Gets the warm data of the active viewport, rebuilding it when the
+    viewport shows another camera.
+
+    :raises: None
+
+    :return: view, renderer and camera full path.
+    :rtype: dict
+    """
+    view = OpenMayaUI.M3dView.active3dView()
+    key = long(view.widget())
+
+    camera = OpenMaya.MDagPath()
+    view.getCamera(camera)
+    cameraName = camera.fullPathName()
+
+    cache = _views.get(key)
+
+    if cache is None or not cache["camera"] == cameraName:
+        if cache is not None:
+            _release(cache)
+
+        log.debug("Warming view cache for %s...", cameraName)
+
+        cache = {
+            "view": view,
+            "renderer": api.getRenderer(view),
+            "camera": cameraName,
+            "state": None,
+            "size": None,
+            "callbacks": [],
+        }
+
+        for node in (camera.node(), camera.transform()):
+            cache["callbacks"].append(
+                OpenMaya.MNodeMessage.addNodeDirtyCallback(
+                    node, _onCameraDirty, key))
+
+        _views[key] = cache
+
+    cache["view"] = view
+
+    return cache
+
+
+def getViewState(cache):
+    """
+    Gets the view state of a warm viewport, captured again only after
+    the camera was edited or the viewport resized.
+
+    :param cache: From :func:`getViewCache`.
+    :type cache: dict
+
+    :raises: None
+
+    :return: Snapshot of the view.
+    :rtype: ViewNudger.projection.ViewState
+    """
+    view = cache["view"]
+    size = (view.portWidth(), view.portHeight())
+
+    if cache["state"] is None or not cache["size"] == size:
+        cache["state"] = api.getViewState(view)
+        cache["size"] = size
+
+    return cache["state"]
+
+
+def _onCameraDirty(node, key):
+    cache = _views.get(key)
+
+    if cache is not None:
+        cache["state"] = None
+
+
+def _release(cache):
+    for callbackId in cache["callbacks"]:
+        try:
+            OpenMaya.MMessage.removeCallback(callbackId)
+        except RuntimeError:
+            # The camera was deleted along with its callbacks.
+            pass
+
+
+def invalidate(*args):
+    """
+    Drops the warm data of every viewport.
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    for cache in _views.values():
+        _release(cache)
+
+    _views.clear()
+
+
+def nudge(x, y, multiplier=1):
+    """
+    Nudges the selection by the stored step, the hotkey entry point.
+
+    Objects are solved against the warm view state and particles aren't
+    looked for. Selections over PIPELINE_THRESHOLD are solved on worker
+    threads. With the Surface depth mode the last selected transform is
+    the mesh to slide on.
+
+    :param x: Direction in x.
+    :type x: float
+    :param y: Direction in y.
+    :type y: float
+    :param multiplier: 1 for a single step, otherwise the stored multiplier.
+    :type multiplier: int
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    if scheduler.scheduler.busy:
+        log.warning("Wait for the running nudge to finish or cancel it.")
+        return
+
+    settings = _settings or loadSettings()
+
+    step = settings["step"]
+    if multiplier != 1:
+        step *= settings["multiplier"]
+
+    transforms = cmds.ls(selection=True, type="transform")
+    if not transforms:
+        log.warning("Nothing selected!")
+        return
+
+    depthMode = settings["depthMode"]
+
+    mesh = None
+    if depthMode == api.DEPTH_SURFACE:
+        if len(transforms) < 2:
+            log.warning("Select objects then the mesh to slide on.")
+            return
+        mesh = transforms.pop()
+
+    pixelAmount = [x * step, y * step]
+    cache = getViewCache()
+
+    if settings["moveObject"] and len(transforms) > PIPELINE_THRESHOLD and \
+            not depthMode == api.DEPTH_SURFACE:
+        api.nudgeObjectsPipelined(transforms,
+                                  pixelAmount=pixelAmount,
+                                  view=cache["view"],
+                                  depthMode=depthMode,
+                                  state=getViewState(cache),
+                                  renderer=cache["renderer"])
+        return
+
+    if settings["moveObject"]:
+        api.nudgeObjects(transforms,
+                         pixelAmount=pixelAmount,
+                         view=cache["view"],
+                         depthMode=depthMode,
+                         mesh=mesh,
+                         state=getViewState(cache),
+                         renderer=cache["renderer"])
+        return
+
+    api.nudge(transforms[0],
+              pixelAmount=pixelAmount,
+              rotateView=bool(settings["rotateView"]),
+              view=cache["view"],
+              depthMode=depthMode,
+              mesh=mesh,
+              renderer=cache["renderer"],
+              points=False)
+
+
+def register():
+    """
+    Registers runtime and name commands for every direction at a single
+    step and at the multiplied step, ready to be bound in the Hotkey
+    Editor. Also warms the settings cache and drops the view cache when
+    a scene is opened or created.
+
+    :raises: None
+
+    :return: Names of the runtime commands.
+    :rtype: list of str
+    """
+    names = []
+
+    for direction, (x, y) in sorted(DIRECTIONS.items()):
+        for multiplier in (1, 10):
+            name = "ViewNudger" + direction
+            annotation = "Nudge " + direction.lower()
+
+            if multiplier != 1:
+                name += "x10"
+                annotation += " by the step multiplier"
+
+            command = COMMAND.format(x, y, multiplier)
+
+            if cmds.runTimeCommand(name, exists=True):
+                cmds.runTimeCommand(name,
+                                    edit=True,
+                                    command=command,
+                                    commandLanguage="python")
+            else:
+                cmds.runTimeCommand(name,
+                                    annotation=annotation,
+                                    category=CATEGORY,
+                                    command=command,
+                                    commandLanguage="python")
+                cmds.nameCommand(name + "NameCommand",
+                                 annotation=annotation,
+                                 command=name)
+
+            names.append(name)
+
+    loadSettings()
+
+    if not _sceneCallbacks:
+        for message in (OpenMaya.MSceneMessage.kBeforeNew,
+                        OpenMaya.MSceneMessage.kBeforeOpen):
+            _sceneCallbacks.append(
+                OpenMaya.MSceneMessage.addCallback(message, invalidate))
+
+    return names
@@ -0,0 +1,224 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+
+try:
+    from maya import cmds
+    from maya import OpenMaya
+    from maya import OpenMayaAnim
+except:
+    pass
+
+try:
+    import numpy
+except:
+    pass
+
+log = logging.getLogger("ViewNudger")
+
+# Undoable command registered by viewNudgerKeys.py.
+COMMAND = "viewNudgerSetKeys"
+PLUGIN = "viewNudgerKeys"
+
+# Edits waiting for the command to pick them up.
+_pending = []
+
+
+class KeyEdit(object):
+    """
+    :class:`KeyEdit` writes a run of keys to many plugs through
+    MFnAnimCurve.addKeys, one call per run of frames per plug instead of
+    a setKeyframe per key. It keeps what it changed so the command can
+    undo and redo it.
+    """
+    def __init__(self, plugs, frames, values):
+        """
+        :param plugs: Plugs to key, like "pCube1.translateX".
+        :type plugs: list of str
+        :param frames: Frames to key.
+        :type frames: numpy.ndarray (F,)
+        :param values: Values per plug and frame in internal units, NaN
+                       where a plug isn't keyed on that frame.
+        :type values: numpy.ndarray (P, F)
+        """
+        self.plugs = plugs
+        self.frames = numpy.asarray(frames)
+        self.values = numpy.asarray(values, dtype=numpy.float64)
+
+        self.modifier = None
+        self.change = None
+
+    def _curve(self, plug):
+        sources = OpenMaya.MPlugArray()
+        plug.connectedTo(sources, True, False)
+
+        if sources.length():
+            if not sources[0].node().hasFn(OpenMaya.MFn.kAnimCurve):
+                log.error("%s isn't driven by an anim curve.", plug.name())
+                raise RuntimeError(
+                    "%s isn't driven by an anim curve." % plug.name())
+
+            return OpenMayaAnim.MFnAnimCurve(sources[0].node())
+
+        fnCurve = OpenMayaAnim.MFnAnimCurve()
+        fnCurve.create(plug, self.modifier)
+
+        return fnCurve
+
+    def doIt(self):
+        """
+        Writes the keys, creating curves for plugs that have none.
+
+        :raises RuntimeError: If a plug is driven by something other than
+                              an anim curve, like an anim layer.
+
+        :return: None
+        :rtype: NoneType
+        """
+        self.modifier = OpenMaya.MDGModifier()
+        self.change = OpenMayaAnim.MAnimCurveChange()
+
+        selection = OpenMaya.MSelectionList()
+        for plug in self.plugs:
+            selection.add(plug)
+
+        curves = []
+        for index in range(len(self.plugs)):
+            plug = OpenMaya.MPlug()
+            selection.getPlug(index, plug)
+            curves.append(self._curve(plug))
+
+        # Connects the new curves before they're keyed.
+        self.modifier.doIt()
+
+        unit = OpenMaya.MTime.uiUnit()
+        keyed = ~numpy.isnan(self.values)
+
+        for fnCurve, values, mask in zip(curves, self.values, keyed):
+            for start, end in runs(mask):
+                times = OpenMaya.MTimeArray()
+                doubles = OpenMaya.MDoubleArray()
+
+                for frame, value in zip(self.frames[start:end].tolist(),
+                                        values[start:end].tolist()):
+                    times.append(OpenMaya.MTime(frame, unit))
+                    doubles.append(value)
+
+                fnCurve.addKeys(times,
+                                doubles,
+                                OpenMayaAnim.MFnAnimCurve.kTangentGlobal,
+                                OpenMayaAnim.MFnAnimCurve.kTangentGlobal,
+                                False,
+                                self.change)
+
+    def undoIt(self):
+        """
+        Puts the curves back as they were.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self.change.undoIt()
+        self.modifier.undoIt()
+
+    def redoIt(self):
+        """
+        Writes the keys again after an undo.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self.modifier.doIt()
+        self.change.redoIt()
+
+
+def runs(mask):
+    """
+    Splits the keyed frames of a plug into runs of consecutive frames.
+    addKeys replaces every key between the first and last time it's
+    given, so frames a plug skips are keyed as separate runs.
+
+    :param mask: Which frames are keyed.
+    :type mask: numpy.ndarray (F,) of bool
+
+    :raises: None
+
+    :return: (start, end) index ranges of the runs.
+    :rtype: list of tuple of 2 ints
+    """
+    mask = numpy.asarray(mask, dtype=bool)
+
+    edges = numpy.flatnonzero(numpy.diff(mask.astype(int))) + 1
+    bounds = [0] + edges.tolist() + [len(mask)]
+
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:])
+            if mask[start]]
+
+
+def take():
+    """
+    Gets the oldest edit waiting for the command.
+
+    :raises RuntimeError: If no edit is waiting.
+
+    :return: Edit to run.
+    :rtype: KeyEdit
+    """
+    if not _pending:
+        log.error("No keys to set, call ViewNudger.keys.setKeys.")
+        raise RuntimeError("No keys to set, call ViewNudger.keys.setKeys.")
+
+    return _pending.pop(0)
+
+
+def loadPlugin():
+    """
+    Loads the plugin registering the undoable keying command.
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    if cmds.pluginInfo(PLUGIN, query=True, loaded=True):
+        return
+
+    cmds.loadPlugin(os.path.join(os.path.dirname(__file__),
+                                 PLUGIN + ".py"),
+                    quiet=True)
+
+
+def setKeys(plugs, frames, values):
+    """
+    Keys many plugs over many frames as a single undo step.
+
+    :param plugs: Plugs to key, like "pCube1.translateX".
+    :type plugs: list of str
+    :param frames: Frames to key.
+    :type frames: numpy.ndarray (F,)
+    :param values: Values per plug and frame in internal units, NaN where
+                   a plug isn't keyed on that frame.
+    :type values: numpy.ndarray (P, F)
+
+    :raises RuntimeError: If a plug is driven by something other than an
+                          anim curve, like an anim layer.
+
+    :return: None
+    :rtype: NoneType
+    """
+    if not plugs:
+        return
+
+    loadPlugin()
+
+    _pending.append(KeyEdit(plugs, frames, values))
+    try:
+        getattr(cmds, COMMAND)()
+    finally:
+        del _pending[:]
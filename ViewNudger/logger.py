@@ -1,12 +1,17 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import time
 import logging
+import collections
+
+HANDLER_NAME = "ViewNudger"
 
 
 def myLogger(debug=False):
     """
-    Creates a logger object.
+    Creates a logger object. Safe to call again on reload, the stream
+    handler is only attached once.
 
     :param debug: Sets logging to level DEBUG.
     :type debug: (bool)
@@ -16,13 +21,16 @@ def myLogger(debug=False):
     :return: logger
     :rtype: logger object
     """
-    LFMT = '%(asctime)-15s %(name)s [%(levelname)s] %(message)s'
-    DFMT = '%Y-%m-%d %H:%M:%S'
-    FMT = logging.Formatter(LFMT, DFMT)
-    shandler = logging.StreamHandler()
-    shandler.setFormatter(FMT)
     log = logging.getLogger("ViewNudger")
-    log.addHandler(shandler)
+
+    if not any(h.get_name() == HANDLER_NAME for h in log.handlers):
+        LFMT = '%(asctime)-15s %(name)s [%(levelname)s] %(message)s'
+        DFMT = '%Y-%m-%d %H:%M:%S'
+        FMT = logging.Formatter(LFMT, DFMT)
+        shandler = logging.StreamHandler()
+        shandler.set_name(HANDLER_NAME)
+        shandler.setFormatter(FMT)
+        log.addHandler(shandler)
 
     if debug:
         log.setLevel(logging.DEBUG)
@@ -32,3 +40,68 @@ def myLogger(debug=False):
     log.propagate = False
 
     return log
+
+
+class TraceBuffer(object):
+    """
+    :class:`TraceBuffer` keeps the most recent structured events in memory.
+    Recording is a no-op while disabled and never writes to a stream,
+    call :meth:`dump` to look at the events.
+    """
+    def __init__(self, size=1000, enabled=False):
+        """
+        :param size: Number of events kept.
+        :type size: int
+        :param enabled: Start recording straight away.
+        :type enabled: bool
+        """
+        self.enabled = enabled
+        self.events = collections.deque(maxlen=size)
+
+    def record(self, event, **fields):
+        """
+        Records an event if enabled.
+
+        :param event: Event name.
+        :type event: str
+        :param fields: Event data.
+        :type fields: dict
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        if self.enabled:
+            self.events.append((time.time(), event, fields))
+
+    def dump(self, log=None, clear=False, level=logging.INFO):
+        """
+        Gets the recorded events, oldest first.
+
+        :param log: Also write every event to this logger.
+        :type log: logging.Logger
+        :param clear: Empty the buffer afterwards.
+        :type clear: bool
+        :param level: Level to write events at.
+        :type level: int
+
+        :raises: None
+
+        :return: (time, event, fields) tuples.
+        :rtype: list of tuple
+        """
+        events = list(self.events)
+
+        if log is not None:
+            for stamp, event, fields in events:
+                log.log(level, "%.6f %s %s", stamp, event, fields)
+
+        if clear:
+            self.events.clear()
+
+        return events
+
+
+# Shared nudge trace, enable with trace.enabled = True.
+trace = TraceBuffer()
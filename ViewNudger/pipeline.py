@@ -0,0 +1,574 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import time
+import logging
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    import numpy
+except:
+    pass
+
+from . import cache
+from . import projection
+
+log = logging.getLogger("ViewNudger")
+
+DEFAULT_WORKERS = 2
+
+# Chunks allowed in each queue, bounds memory and keeps stages in step.
+DEFAULT_DEPTH = 4
+
+
+class Pipeline(object):
+    """
+    :class:`Pipeline` overlaps main thread reads and writes with solves on
+    a pool of worker threads. Reads and writes run on the calling thread,
+    which must be Maya's main thread when they touch the scene, and NumPy
+    releases the GIL while the workers solve.
+    """
+    def __init__(self, solve, workers=DEFAULT_WORKERS, depth=DEFAULT_DEPTH):
+        """
+        :param solve: Called on a worker with a chunk and what read returned,
+                      must not touch Maya.
+        :type solve: callable
+        :param workers: Number of worker threads.
+        :type workers: int
+        :param depth: Chunks allowed in each queue.
+        :type depth: int
+        """
+        self.solve = solve
+        self.workers = workers
+        self.depth = depth
+
+    def _work(self, inbox, outbox):
+        while True:
+            item = inbox.get()
+            if item is None:
+                return
+
+            chunk, data = item
+
+            try:
+                outbox.put((chunk, self.solve(chunk, data), None))
+            except Exception as e:
+                outbox.put((chunk, None, e))
+
+    def _write(self, outbox, write, block):
+        try:
+            chunk, result, error = outbox.get(block)
+        except queue.Empty:
+            return 0
+
+        if error is not None:
+            raise error
+
+        write(chunk, result)
+
+        return 1
+
+    def run(self, chunks, read, write):
+        """
+        Reads, solves and writes every chunk. Results are written as soon
+        as they're ready, not necessarily in order.
+
+        :param chunks: Chunks to process, anything read and write accept.
+        :type chunks: list
+        :param read: Called on this thread with a chunk, returns its data.
+        :type read: callable
+        :param write: Called on this thread with a chunk and its result.
+        :type write: callable
+
+        :raises: Whatever solve raised, after stopping the workers.
+
+        :return: None
+        :rtype: NoneType
+        """
+        inbox = queue.Queue(self.depth)
+        outbox = queue.Queue(self.depth)
+
+        threads = [threading.Thread(target=self._work, args=(inbox, outbox))
+                   for _ in range(self.workers)]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        pending = 0
+
+        try:
+            for chunk in chunks:
+                item = (chunk, read(chunk))
+
+                # Write finished chunks while the workers are busy.
+                while True:
+                    try:
+                        inbox.put_nowait(item)
+                        break
+                    except queue.Full:
+                        pending -= self._write(outbox, write, True)
+
+                pending += 1
+                pending -= self._write(outbox, write, False)
+
+            while pending:
+                pending -= self._write(outbox, write, True)
+
+        finally:
+            for thread in threads:
+                while True:
+                    try:
+                        inbox.put(None, timeout=0.01)
+                        break
+                    except queue.Full:
+                        # Unblock workers waiting on a full outbox.
+                        try:
+                            outbox.get_nowait()
+                        except queue.Empty:
+                            pass
+
+            for thread in threads:
+                thread.join()
+
+
+def chunkRanges(count, chunkSize):
+    """
+    Splits count items into (start, end) ranges.
+
+    :param count: Number of items.
+    :type count: int
+    :param chunkSize: Items per chunk.
+    :type chunkSize: int
+
+    :raises: None
+
+    :return: Ranges.
+    :rtype: list of tuple of 2 ints
+    """
+    return [(start, min(start + chunkSize, count))
+            for start in range(0, count, chunkSize)]
+
+
+def nudgeSolver(state,
+                pixelAmount,
+                depthMode=projection.DEPTH_DISTANCE,
+                plane=None):
+    """
+    Builds a solve for :class:`Pipeline` that nudges world positions.
+
+    :param state: View to convert points with.
+    :type state: ViewNudger.projection.ViewState
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param depthMode: One of ViewNudger.projection.DEPTH_MODES.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+
+    :raises: None
+
+    :return: Solve taking a chunk and (positions, parents), returning
+             which points were in front of the camera and how far they
+             move in world space. parents is None or (indices of the
+             chunk's children, positions of their closest nudged parent),
+             and each child's move leaves out its parent's.
+    :rtype: callable
+    """
+    def moves(points):
+        screen, depth = projection.worldToScreenArray(state, points)
+        valid = depth >= projection.NEAR_CLIP
+
+        offsets = numpy.zeros_like(points)
+        offsets[valid] = projection.solveDepth(state,
+                                               screen[valid] + pixelAmount,
+                                               points[valid],
+                                               mode=depthMode,
+                                               plane=plane) - points[valid]
+
+        return valid, offsets
+
+    def solve(chunk, data):
+        points, parents = data
+        valid, offsets = moves(points)
+
+        if parents is not None:
+            children, parentPoints = parents
+            offsets[children] -= moves(parentPoints)[1]
+
+        return valid, offsets[valid]
+
+    return solve
+
+
+def frameSolver(pixelAmount,
+                width,
+                height,
+                depthMode=projection.DEPTH_DISTANCE,
+                plane=None,
+                hierarchy=None):
+    """
+    Builds a solve for :class:`Pipeline` that nudges transforms on one
+    frame of a range and returns their new translate values. Each frame
+    is solved against its own camera from
+    :meth:`ViewNudger.cache.CameraCache.get`.
+
+    :param pixelAmount: Pixel amount to nudge in x and y.
+    :type pixelAmount: list of 2 floats
+    :param width: Viewport width in pixels.
+    :type width: int
+    :param height: Viewport height in pixels.
+    :type height: int
+    :param depthMode: One of ViewNudger.projection.DEPTH_MODES.
+    :type depthMode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+    :param hierarchy: Indices of (children, parents) pairs, each child
+                      with its closest ancestor among the transforms,
+                      so children don't also move with a nudged parent.
+    :type hierarchy: tuple of 2 numpy.ndarray (M,)
+
+    :raises: None
+
+    :return: Solve taking a chunk and (camera matrices, world matrices,
+             matrices, translates) of its frame, returning which
+             transforms were in front of the camera and their new
+             translates.
+    :rtype: callable
+    """
+    def solve(chunk, data):
+        cameraMatrices, worlds, matrices, translates = data
+
+        state = cache.frameViewState(cameraMatrices, width, height)
+        points = worlds[:, 3, :3]
+
+        screen, depth = projection.worldToScreenArray(state, points)
+        valid = depth >= projection.NEAR_CLIP
+
+        deltas = numpy.zeros_like(points)
+        deltas[valid] = projection.solveDepth(state,
+                                              screen[valid] + pixelAmount,
+                                              points[valid],
+                                              mode=depthMode,
+                                              plane=plane) - points[valid]
+
+        if hierarchy is not None:
+            children, parents = hierarchy
+            moved = valid[children]
+            deltas[children[moved]] -= deltas[parents[moved]]
+
+        # Translate lives in the space of offsetParentMatrix * parentMatrix.
+        spaces = numpy.linalg.solve(matrices, worlds)[:, :3, :3]
+        offsets = numpy.einsum("ni,nij->nj",
+                               deltas[valid],
+                               numpy.linalg.inv(spaces[valid]))
+
+        return valid, translates[valid] + offsets
+
+    return solve
+
+
+class MockScene(object):
+    """
+    :class:`MockScene` stands in for Maya in :func:`benchmark`. It keeps
+    positions in memory and spends a fixed time per item on read and
+    write, roughly like DG reads and xform writes. That time either
+    sleeps, like work done in C++ without the GIL, or spins holding it,
+    the worst case for the workers.
+    """
+    def __init__(self,
+                 count,
+                 readCost=2e-7,
+                 writeCost=1e-6,
+                 holdGIL=False,
+                 seed=0):
+        """
+        :param count: Number of transforms.
+        :type count: int
+        :param readCost: Seconds per item read.
+        :type readCost: float
+        :param writeCost: Seconds per item written.
+        :type writeCost: float
+        :param holdGIL: Spin instead of sleeping.
+        :type holdGIL: bool
+        :param seed: Random seed.
+        :type seed: int
+        """
+        rng = numpy.random.RandomState(seed)
+
+        self.positions = rng.uniform(-20.0, 20.0, (count, 3))
+        self.readCost = readCost
+        self.writeCost = writeCost
+        self.holdGIL = holdGIL
+
+    def _busy(self, seconds):
+        if not self.holdGIL:
+            time.sleep(seconds)
+            return
+
+        end = time.time() + seconds
+        while time.time() < end:
+            pass
+
+    def read(self, chunk):
+        start, end = chunk
+        self._busy(self.readCost * (end - start))
+
+        return self.positions[start:end].copy(), None
+
+    def write(self, chunk, result):
+        start, end = chunk
+        valid, offsets = result
+        self._busy(self.writeCost * len(offsets))
+
+        self.positions[start:end][valid] += offsets
+
+
+class MockFrames(MockScene):
+    """
+    :class:`MockFrames` stands in for Maya in :func:`benchmarkFrames`, a
+    moving camera and transforms with their own parent spaces over a
+    frame range. Reads cost readCost per item per frame, like the
+    getAttr calls of :func:`ViewNudger.api.nudgeFrames`, and keys cost
+    writeCost per item per frame.
+    """
+    def __init__(self,
+                 count,
+                 frames,
+                 readCost=3e-6,
+                 writeCost=3e-6,
+                 holdGIL=False,
+                 seed=0):
+        """
+        :param count: Number of transforms.
+        :type count: int
+        :param frames: Number of frames.
+        :type frames: int
+        :param readCost: Seconds per item read on a frame.
+        :type readCost: float
+        :param writeCost: Seconds per item keyed on a frame.
+        :type writeCost: float
+        :param holdGIL: Spin instead of sleeping.
+        :type holdGIL: bool
+        :param seed: Random seed.
+        :type seed: int
+        """
+        from . import corpus
+
+        MockScene.__init__(self, count, readCost, writeCost, holdGIL, seed)
+
+        rng = numpy.random.RandomState(seed)
+        setup = corpus.generate()[0]
+        viewMatrix, projectionMatrix = corpus.setupMatrices(setup)
+        world = numpy.linalg.inv(viewMatrix)
+
+        self.width = setup["width"]
+        self.height = setup["height"]
+
+        # Truck the camera along its x axis.
+        self.cameraMatrices = numpy.empty((frames, 3, 4, 4))
+        for frame in range(frames):
+            moved = world.copy()
+            moved[3, :3] += world[0, :3] * 0.1 * frame
+
+            self.cameraMatrices[frame, cache.WORLD] = moved
+            self.cameraMatrices[frame, cache.VIEW] = numpy.linalg.inv(moved)
+            self.cameraMatrices[frame, cache.PROJECTION] = projectionMatrix
+
+        # Points in front of the camera, drifting a little every frame.
+        self.positions = world[3, :3] + \
+            rng.uniform(-10.0, 10.0, (count, 1)) * world[0, :3] + \
+            rng.uniform(-10.0, 10.0, (count, 1)) * world[1, :3] - \
+            rng.uniform(20.0, 60.0, (count, 1)) * world[2, :3]
+        self.velocities = rng.uniform(-0.1, 0.1, (count, 3))
+
+        # Scaled, rotated parent spaces with an offset.
+        spaces = numpy.zeros((count, 4, 4))
+        spaces[:, :3, :3] = numpy.linalg.qr(
+            rng.normal(size=(count, 3, 3)))[0] * \
+            rng.uniform(0.5, 2.0, (count, 1, 1))
+        spaces[:, 3, :3] = rng.uniform(-5.0, 5.0, (count, 3))
+        spaces[:, 3, 3] = 1.0
+        self.spaces = spaces
+
+        self.keys = numpy.zeros((frames, count, 3))
+
+    def read(self, chunk):
+        index, frame = chunk
+        self._busy(self.readCost * len(self.positions))
+
+        points = self.positions + self.velocities * index
+        translates = numpy.einsum("ni,nij->nj",
+                                  points - self.spaces[:, 3, :3],
+                                  numpy.linalg.inv(self.spaces[:, :3, :3]))
+
+        matrices = numpy.tile(numpy.identity(4), (len(points), 1, 1))
+        matrices[:, 3, :3] = translates
+
+        return (self.cameraMatrices[index],
+                numpy.matmul(matrices, self.spaces),
+                matrices,
+                translates)
+
+    def write(self, results):
+        for (index, frame), (valid, translates) in results.items():
+            self._busy(self.writeCost * len(translates))
+            self.keys[index][valid] = translates
+
+
+def benchmarkFrames(count=2000,
+                    frames=100,
+                    workers=DEFAULT_WORKERS,
+                    depth=DEFAULT_DEPTH,
+                    holdGIL=False,
+                    repeat=3):
+    """
+    Compares a serial read and solve of every frame with
+    :class:`Pipeline` on :class:`MockFrames`, both followed by the same
+    keying pass, like :func:`ViewNudger.api.nudgeFrames`.
+
+    :param count: Number of transforms.
+    :type count: int
+    :param frames: Number of frames.
+    :type frames: int
+    :param workers: Number of worker threads.
+    :type workers: int
+    :param depth: Chunks allowed in each queue.
+    :type depth: int
+    :param holdGIL: Make the mock reads and keys hold the GIL.
+    :type holdGIL: bool
+    :param repeat: Runs of each, the fastest is kept.
+    :type repeat: int
+
+    :raises: None
+
+    :return: Seconds and keys per second of each and the speedup.
+    :rtype: dict
+    """
+    chunks = list(enumerate(range(1, frames + 1)))
+
+    def run(scene, pipelined):
+        solve = frameSolver([3.0, -2.0],
+                            scene.width,
+                            scene.height,
+                            projection.DEPTH_VIEW)
+        results = {}
+
+        def write(chunk, result):
+            results[chunk] = result
+
+        if pipelined:
+            Pipeline(solve, workers, depth).run(chunks, scene.read, write)
+        else:
+            for chunk in chunks:
+                write(chunk, solve(chunk, scene.read(chunk)))
+
+        scene.write(results)
+
+    results = {}
+
+    for name, pipelined in (("serial", False), ("pipelined", True)):
+        best = None
+        for _ in range(repeat):
+            scene = MockFrames(count, frames, holdGIL=holdGIL)
+
+            start = time.time()
+            run(scene, pipelined)
+            elapsed = time.time() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        results[name] = {"seconds": best,
+                         "keysPerSecond": count * frames / best}
+        results[name + "Keys"] = scene.keys
+
+    match = numpy.allclose(results.pop("serialKeys"),
+                           results.pop("pipelinedKeys"))
+
+    results["speedup"] = results["serial"]["seconds"] / \
+        results["pipelined"]["seconds"]
+    results["match"] = match
+
+    return results
+
+
+def benchmark(count=200000,
+              chunkSize=5000,
+              workers=DEFAULT_WORKERS,
+              depth=DEFAULT_DEPTH,
+              holdGIL=False,
+              repeat=3):
+    """
+    Compares a serial read, solve, write loop with :class:`Pipeline` on a
+    :class:`MockScene`, so it runs without Maya.
+
+    :param count: Number of transforms.
+    :type count: int
+    :param chunkSize: Transforms per chunk.
+    :type chunkSize: int
+    :param workers: Number of worker threads.
+    :type workers: int
+    :param depth: Chunks allowed in each queue.
+    :type depth: int
+    :param holdGIL: Make the mock reads and writes hold the GIL.
+    :type holdGIL: bool
+    :param repeat: Runs of each, the fastest is kept.
+    :type repeat: int
+
+    :raises: None
+
+    :return: Seconds and points per second of each and the speedup.
+    :rtype: dict
+    """
+    from . import corpus
+
+    state = corpus.setupState(corpus.generate()[0])
+    solve = nudgeSolver(state, [3.0, -2.0], projection.DEPTH_VIEW)
+    chunks = chunkRanges(count, chunkSize)
+
+    def serial(scene):
+        for chunk in chunks:
+            scene.write(chunk, solve(chunk, scene.read(chunk)))
+
+    def pipelined(scene):
+        Pipeline(solve, workers, depth).run(chunks, scene.read, scene.write)
+
+    results = {}
+
+    for name, run in (("serial", serial), ("pipelined", pipelined)):
+        best = None
+        for _ in range(repeat):
+            scene = MockScene(count, holdGIL=holdGIL)
+
+            start = time.time()
+            run(scene)
+            elapsed = time.time() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        results[name] = {"seconds": best, "pointsPerSecond": count / best}
+        results[name + "Positions"] = scene.positions
+
+    match = numpy.allclose(results.pop("serialPositions"),
+                           results.pop("pipelinedPositions"))
+
+    results["speedup"] = results["serial"]["seconds"] / \
+        results["pipelined"]["seconds"]
+    results["match"] = match
+
+    return results
+
+
+if __name__ == '__main__':
+
+    print(benchmark())
+    print(benchmark(holdGIL=True))
+    print(benchmarkFrames())
+    print(benchmarkFrames(holdGIL=True))
@@ -0,0 +1,604 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import collections
+
+try:
+    import numpy
+except:
+    pass
+
+# Points closer than this along the view axis are treated as behind camera.
+NEAR_CLIP = 0.01
+
+# Maya's filmFit enum.
+FIT_FILL = 0
+FIT_HORIZONTAL = 1
+FIT_VERTICAL = 2
+FIT_OVERSCAN = 3
+
+# Depth modes for solveDepth.
+DEPTH_DISTANCE = "distance"
+DEPTH_VIEW = "view"
+DEPTH_PLANE = "plane"
+DEPTH_MODES = (DEPTH_DISTANCE, DEPTH_VIEW, DEPTH_PLANE)
+
+# (point, normal) of the y up ground plane.
+GROUND_PLANE = ([0.0, 0.0, 0.0], [0.0, 1.0, 0.0])
+
+ViewState = collections.namedtuple("ViewState", [
+    "viewProjection",
+    "inverseViewProjection",
+    "width",
+    "height",
+    "cameraPoint",
+    "cameraDir",
+])
+
+
+def makeViewState(viewProjection,
+                  width,
+                  height,
+                  cameraPoint,
+                  cameraDir):
+    """
+    Builds a :class:`ViewState` from plain matrices and vectors.
+
+    :param viewProjection: Row major view * projection matrix.
+    :type viewProjection: numpy.ndarray (4, 4)
+    :param width: Viewport width in pixels.
+    :type width: int
+    :param height: Viewport height in pixels.
+    :type height: int
+    :param cameraPoint: World position of the camera.
+    :type cameraPoint: list of 3 floats
+    :param cameraDir: World view direction of the camera.
+    :type cameraDir: list of 3 floats
+
+    :raises: None
+
+    :return: View state usable by the array functions.
+    :rtype: ViewState
+    """
+    viewProjection = numpy.asarray(viewProjection, dtype=numpy.float64)
+
+    cameraDir = numpy.asarray(cameraDir, dtype=numpy.float64)
+    cameraDir = cameraDir / numpy.linalg.norm(cameraDir)
+
+    return ViewState(
+        viewProjection=viewProjection,
+        inverseViewProjection=numpy.linalg.inv(viewProjection),
+        width=float(width),
+        height=float(height),
+        cameraPoint=numpy.asarray(cameraPoint, dtype=numpy.float64),
+        cameraDir=cameraDir)
+
+
+def worldToScreenArray(state, points):
+    """
+    Converts world points into screen points in one pass.
+
+    Unlike :func:`ViewNudger.api.worldToScreen` points behind the camera
+    are not zeroed, check the returned depth against :data:`NEAR_CLIP`.
+
+    :param state: View to convert points with.
+    :type state: ViewState
+    :param points: World positions.
+    :type points: numpy.ndarray (N, 3)
+
+    :raises: None
+
+    :return: Screen positions and depth along the view axis.
+    :rtype: tuple of numpy.ndarray (N, 2) and numpy.ndarray (N,)
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+
+    depth = (points - state.cameraPoint).dot(state.cameraDir)
+
+    homogeneous = numpy.empty((len(points), 4))
+    homogeneous[:, :3] = points
+    homogeneous[:, 3] = 1.0
+
+    clip = homogeneous.dot(state.viewProjection)
+
+    screen = numpy.empty((len(points), 2))
+    screen[:, 0] = ((clip[:, 0] / clip[:, 3]) + 1.0) / 2.0 * state.width
+    screen[:, 1] = ((clip[:, 1] / clip[:, 3]) + 1.0) / 2.0 * state.height
+
+    return screen, depth
+
+
+def screenRays(state, points2D):
+    """
+    Gets normalized world directions from the camera through screen points.
+
+    :param state: View to convert points with.
+    :type state: ViewState
+    :param points2D: Screen positions.
+    :type points2D: numpy.ndarray (N, 2)
+
+    :raises: None
+
+    :return: Unit ray directions facing down the view axis.
+    :rtype: numpy.ndarray (N, 3)
+    """
+    points2D = numpy.asarray(points2D, dtype=numpy.float64).reshape(-1, 2)
+    viewProjection = state.viewProjection
+
+    # Same depth trick as screenToWorld, reuse the clip z/w of the origin.
+    clip = numpy.empty((len(points2D), 4))
+    clip[:, 2] = viewProjection[3, 2]
+    clip[:, 3] = viewProjection[3, 3]
+    clip[:, 0] = ((2.0 * (points2D[:, 0] / state.width)) - 1.0) * clip[:, 3]
+    clip[:, 1] = ((2.0 * (points2D[:, 1] / state.height)) - 1.0) * clip[:, 3]
+
+    world = clip.dot(state.inverseViewProjection)
+    world = world[:, :3] / world[:, 3:]
+
+    directions = world - state.cameraPoint
+    directions /= numpy.linalg.norm(directions, axis=1)[:, numpy.newaxis]
+
+    # Flip anything pointing away from the view.
+    behind = directions.dot(state.cameraDir) < 0
+    directions[behind] *= -1.0
+
+    return directions
+
+
+def screenToWorldArray(state, points2D, distances):
+    """
+    Converts screen points to world points at their own distances.
+
+    :param state: View to convert points with.
+    :type state: ViewState
+    :param points2D: Screen positions.
+    :type points2D: numpy.ndarray (N, 2)
+    :param distances: Distance from camera for each returned point.
+    :type distances: numpy.ndarray (N,) or float
+
+    :raises: None
+
+    :return: World positions.
+    :rtype: numpy.ndarray (N, 3)
+    """
+    directions = screenRays(state, points2D)
+    distances = numpy.broadcast_to(
+        numpy.asarray(distances, dtype=numpy.float64), (len(directions),))
+
+    return state.cameraPoint + directions * distances[:, numpy.newaxis]
+
+
+def snapToGrid(values, grid):
+    """
+    Rounds screen values to the nearest multiple of grid.
+
+    :param values: Screen values to snap.
+    :type values: numpy.ndarray
+    :param grid: Grid size in pixels.
+    :type grid: float
+
+    :raises ValueError: If grid isn't positive.
+
+    :return: Snapped values.
+    :rtype: numpy.ndarray
+    """
+    if grid <= 0:
+        raise ValueError("Grid size must be positive, got %s." % grid)
+
+    return numpy.round(numpy.asarray(values) / grid) * grid
+
+
+def checkAlign(grid=None, pixel=None, axis=None):
+    """
+    Checks arguments for :func:`alignTargets`.
+
+    :param grid: Pixel grid size to snap to.
+    :type grid: float
+    :param pixel: Exact pixel to snap to.
+    :type pixel: list of 2 floats
+    :param axis: "row" or "column" to only align along one screen axis.
+    :type axis: str
+
+    :raises ValueError: If axis isn't valid, grid isn't positive or
+                        nothing to snap to.
+
+    :return: None
+    :rtype: NoneType
+    """
+    if axis not in (None, "row", "column"):
+        raise ValueError("axis must be 'row' or 'column', got %s." % axis)
+
+    if axis is None and grid is None and pixel is None:
+        raise ValueError("Nothing to align to, set grid or pixel.")
+
+    if grid is not None and grid <= 0:
+        raise ValueError("Grid size must be positive, got %s." % grid)
+
+
+def alignTargets(screen, valid, grid=None, pixel=None, axis=None):
+    """
+    Gets the screen positions :func:`ViewNudger.api.align` moves points to,
+    a pixel grid, an exact pixel or a shared screen row/column.
+
+    :param screen: Current screen positions.
+    :type screen: numpy.ndarray (N, 2)
+    :param valid: Which points are in front of the camera, the first one
+                  anchors a row/column without pixel.
+    :type valid: numpy.ndarray (N,) of bool
+    :param grid: Pixel grid size to snap to.
+    :type grid: float
+    :param pixel: Exact pixel to snap to, takes precedence over grid.
+    :type pixel: list of 2 floats
+    :param axis: "row" or "column" to only align along one screen axis.
+    :type axis: str
+
+    :raises ValueError: If axis isn't valid, grid isn't positive or
+                        nothing to snap to.
+
+    :return: Target screen positions.
+    :rtype: numpy.ndarray (N, 2)
+    """
+    checkAlign(grid=grid, pixel=pixel, axis=axis)
+
+    screen = numpy.asarray(screen, dtype=float)
+    target = screen.copy()
+
+    if axis is None:
+        if pixel is not None:
+            target[:] = pixel
+        else:
+            target = snapToGrid(screen, grid)
+
+        return target
+
+    index = 1 if axis == "row" else 0
+
+    if pixel is not None:
+        value = pixel[index]
+    else:
+        value = screen[valid][0, index]
+
+    if grid is not None:
+        value = snapToGrid(value, grid)
+
+    target[:, index] = value
+
+    return target
+
+
+def cameraProjection(width,
+                     height,
+                     focalLength=35.0,
+                     horizontalFilmAperture=1.417,
+                     verticalFilmAperture=0.945,
+                     filmFit=FIT_FILL,
+                     overscan=1.0,
+                     orthographic=False,
+                     orthographicWidth=30.0,
+                     nearClipPlane=0.1,
+                     farClipPlane=10000.0):
+    """
+    Builds a row major projection matrix from camera attributes the same
+    way a Maya viewport does. Film offsets, lens squeeze, camera scale,
+    film transforms, 2D pan/zoom and shake aren't modelled,
+    :func:`ViewNudger.cache.checkCamera` refuses cameras that use them.
+
+    :param width: Viewport width in pixels.
+    :type width: int
+    :param height: Viewport height in pixels.
+    :type height: int
+    :param focalLength: Focal length in millimeters.
+    :type focalLength: float
+    :param horizontalFilmAperture: Film width in inches.
+    :type horizontalFilmAperture: float
+    :param verticalFilmAperture: Film height in inches.
+    :type verticalFilmAperture: float
+    :param filmFit: One of the FIT_* values.
+    :type filmFit: int
+    :param overscan: Camera overscan.
+    :type overscan: float
+    :param orthographic: Build an orthographic projection.
+    :type orthographic: bool
+    :param orthographicWidth: Orthographic view width.
+    :type orthographicWidth: float
+    :param nearClipPlane: Near clip distance.
+    :type nearClipPlane: float
+    :param farClipPlane: Far clip distance.
+    :type farClipPlane: float
+
+    :raises: None
+
+    :return: Projection matrix.
+    :rtype: numpy.ndarray (4, 4)
+    """
+    portAspect = width / height
+
+    if orthographic:
+        filmAspect = 1.0
+        halfWidth = orthographicWidth / 2.0
+        halfHeight = halfWidth
+    else:
+        filmAspect = horizontalFilmAperture / verticalFilmAperture
+        halfWidth = (horizontalFilmAperture * 25.4 / 2.0) / focalLength
+        halfHeight = (verticalFilmAperture * 25.4 / 2.0) / focalLength
+
+    if filmFit == FIT_FILL:
+        horizontal = portAspect >= filmAspect
+    elif filmFit == FIT_OVERSCAN:
+        horizontal = portAspect < filmAspect
+    else:
+        horizontal = filmFit == FIT_HORIZONTAL
+
+    if horizontal:
+        halfHeight = halfWidth / portAspect
+    else:
+        halfWidth = halfHeight * portAspect
+
+    halfWidth *= overscan
+    halfHeight *= overscan
+
+    near = nearClipPlane
+    far = farClipPlane
+    matrix = numpy.zeros((4, 4))
+
+    if orthographic:
+        matrix[0, 0] = 1.0 / halfWidth
+        matrix[1, 1] = 1.0 / halfHeight
+        matrix[2, 2] = -2.0 / (far - near)
+        matrix[3, 2] = -(far + near) / (far - near)
+        matrix[3, 3] = 1.0
+    else:
+        matrix[0, 0] = 1.0 / halfWidth
+        matrix[1, 1] = 1.0 / halfHeight
+        matrix[2, 2] = -(far + near) / (far - near)
+        matrix[2, 3] = -1.0
+        matrix[3, 2] = -2.0 * far * near / (far - near)
+
+    return matrix
+
+
+def solveDepth(state,
+               points2D,
+               points,
+               mode=DEPTH_DISTANCE,
+               plane=None):
+    """
+    Places screen points back in the world with a closed form ray solve.
+
+    DEPTH_DISTANCE keeps each point's distance from the camera (ray/sphere),
+    DEPTH_VIEW keeps its depth along the view axis (ray/camera plane) and
+    DEPTH_PLANE lands it on plane (ray/plane). Rays that miss fall back
+    to DEPTH_DISTANCE.
+
+    :param state: View to convert points with.
+    :type state: ViewState
+    :param points2D: New screen positions.
+    :type points2D: numpy.ndarray (N, 2)
+    :param points: Current world positions.
+    :type points: numpy.ndarray (N, 3)
+    :param mode: One of the DEPTH_* values.
+    :type mode: str
+    :param plane: (point, normal) for DEPTH_PLANE, defaults to the ground.
+    :type plane: tuple of 2 lists of 3 floats
+
+    :raises ValueError: If mode isn't valid.
+
+    :return: World positions.
+    :rtype: numpy.ndarray (N, 3)
+    """
+    if mode not in DEPTH_MODES:
+        raise ValueError("Unknown depth mode %s." % mode)
+
+    directions = screenRays(state, points2D)
+    offsets = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3) - \
+        state.cameraPoint
+
+    distances = numpy.linalg.norm(offsets, axis=1)
+
+    if mode == DEPTH_DISTANCE:
+        return state.cameraPoint + directions * distances[:, numpy.newaxis]
+
+    if mode == DEPTH_VIEW:
+        normal = state.cameraDir
+        numerator = offsets.dot(normal)
+
+    else:
+        planePoint, normal = plane or GROUND_PLANE
+        normal = numpy.asarray(normal, dtype=numpy.float64)
+        numerator = numpy.full(
+            len(directions),
+            (numpy.asarray(planePoint) - state.cameraPoint).dot(normal))
+
+    denominator = directions.dot(normal)
+    hit = numpy.abs(denominator) > 1e-9
+
+    t = distances.copy()
+    t[hit] = numerator[hit] / denominator[hit]
+
+    missed = ~hit | (t <= 0)
+    t[missed] = distances[missed]
+
+    return state.cameraPoint + directions * t[:, numpy.newaxis]
+
+
+def screenReportArrays(state, points, region=None):
+    """
+    Projects points and classifies them against the frame.
+
+    :param state: View to project into.
+    :type state: ViewState
+    :param points: World positions.
+    :type points: numpy.ndarray (N, 3)
+    :param region: Only keep points inside (xMin, yMin, xMax, yMax).
+    :type region: list of 4 floats
+
+    :raises: None
+
+    :return: screen (pixels), depth (along the view axis), distance (to the
+             camera), behind (behind camera), inFrame (in front of the
+             camera and inside the viewport), edgeDistance (pixels to the
+             closest frame edge, negative outside) and mask (which input
+             points were kept).
+    :rtype: dict
+    """
+    screen, depth = worldToScreenArray(state, points)
+
+    behind = depth < NEAR_CLIP
+
+    edgeDistance = numpy.minimum(
+        numpy.minimum(screen[:, 0], state.width - screen[:, 0]),
+        numpy.minimum(screen[:, 1], state.height - screen[:, 1]))
+    edgeDistance[behind] = -numpy.inf
+
+    mask = numpy.ones(len(screen), dtype=bool)
+
+    if region is not None:
+        xMin, yMin, xMax, yMax = region
+        mask = ~behind & \
+            (screen[:, 0] >= xMin) & (screen[:, 0] <= xMax) & \
+            (screen[:, 1] >= yMin) & (screen[:, 1] <= yMax)
+
+    return {
+        "screen": screen[mask],
+        "depth": depth[mask],
+        "distance": numpy.linalg.norm(
+            points[mask] - state.cameraPoint, axis=1),
+        "behind": behind[mask],
+        "inFrame": (edgeDistance >= 0)[mask],
+        "edgeDistance": edgeDistance[mask],
+        "mask": mask,
+    }
+
+
+def boxCorners(bounds):
+    """
+    Gets the 8 corners of a bounding box.
+
+    :param bounds: xMin, yMin, zMin, xMax, yMax, zMax.
+    :type bounds: list of 6 floats
+
+    :raises: None
+
+    :return: Corners.
+    :rtype: numpy.ndarray (8, 3)
+    """
+    xMin, yMin, zMin, xMax, yMax, zMax = bounds
+
+    return numpy.array([[x, y, z]
+                        for x in (xMin, xMax)
+                        for y in (yMin, yMax)
+                        for z in (zMin, zMax)], dtype=numpy.float64)
+
+
+def screenBounds(state, points):
+    """
+    Gets the screen rectangle around projected points.
+
+    :param state: View to project into.
+    :type state: ViewState
+    :param points: World positions, all in front of the camera.
+    :type points: numpy.ndarray (N, 3)
+
+    :raises ValueError: If any point is behind the camera.
+
+    :return: xMin, yMin, xMax, yMax in pixels.
+    :rtype: numpy.ndarray (4,)
+    """
+    screen, depth = worldToScreenArray(state, points)
+
+    if (depth < NEAR_CLIP).any():
+        raise ValueError("Bounds cross behind the camera.")
+
+    return numpy.concatenate([screen.min(axis=0), screen.max(axis=0)])
+
+
+def solveScreenSize(state, points, offsets, size, axis=1, iterations=8):
+    """
+    Solves how far to move points along offsets so their screen footprint
+    is size pixels, the points becoming points + t * offsets.
+
+    Each footprint edge is a ratio of terms linear in t, so for the two
+    points bounding it the size is a quadratic in t. When other points
+    take over an edge at the solved t, the new pair is solved again.
+
+    :param state: View to project into.
+    :type state: ViewState
+    :param points: World positions, all in front of the camera.
+    :type points: numpy.ndarray (N, 3)
+    :param offsets: World direction to move each point, or one for all.
+    :type offsets: numpy.ndarray (N, 3) or (3,)
+    :param size: Footprint to reach in pixels.
+    :type size: float
+    :param axis: 0 for width, 1 for height.
+    :type axis: int
+    :param iterations: Most pairs to try.
+    :type iterations: int
+
+    :raises ValueError: If no t keeps the points in front of the camera.
+
+    :return: Closest t to 0 that reaches size.
+    :rtype: float
+    """
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+    offsets = numpy.broadcast_to(
+        numpy.asarray(offsets, dtype=numpy.float64), points.shape)
+
+    half = (state.width if axis == 0 else state.height) / 2.0
+
+    homogeneous = numpy.ones((len(points), 4))
+    homogeneous[:, :3] = points
+
+    directions = numpy.zeros((len(points), 4))
+    directions[:, :3] = offsets
+
+    # Screen position of point i is half * (q + t * e) / (w + t * f) + half.
+    clip = homogeneous.dot(state.viewProjection)
+    delta = directions.dot(state.viewProjection)
+    q, w = clip[:, axis], clip[:, 3]
+    e, f = delta[:, axis], delta[:, 3]
+
+    depth = (points - state.cameraPoint).dot(state.cameraDir)
+    depthRate = offsets.dot(state.cameraDir)
+
+    def inFront(t):
+        return (depth + t * depthRate >= NEAR_CLIP).all()
+
+    t = 0.0
+
+    for _ in range(iterations):
+        screen = (q + t * e) / (w + t * f)
+        a, b = numpy.argmax(screen), numpy.argmin(screen)
+
+        A = size * f[a] * f[b] - half * (e[a] * f[b] - e[b] * f[a])
+        B = size * (w[a] * f[b] + f[a] * w[b]) - half * (
+            q[a] * f[b] + e[a] * w[b] - q[b] * f[a] - e[b] * w[a])
+        C = size * w[a] * w[b] - half * (q[a] * w[b] - q[b] * w[a])
+
+        if abs(A) < 1e-12 * max(abs(B), abs(C), 1.0):
+            roots = [-C / B] if B else []
+        else:
+            discriminant = B * B - 4.0 * A * C
+            if discriminant < 0:
+                roots = []
+            else:
+                root = numpy.sqrt(discriminant)
+                roots = [(-B + root) / (2.0 * A), (-B - root) / (2.0 * A)]
+
+        roots = sorted((r for r in roots if inFront(r)), key=abs)
+
+        if not roots:
+            raise ValueError("No move reaches %s px in front of the camera."
+                             % size)
+
+        if roots[0] == t:
+            break
+
+        t = roots[0]
+
+        screen = (q + t * e) / (w + t * f)
+        if numpy.argmax(screen) == a and numpy.argmin(screen) == b:
+            break
+
+    return float(t)
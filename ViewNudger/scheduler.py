@@ -0,0 +1,220 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import time
+import logging
+
+try:
+    from PySide import QtCore
+except:
+    pass
+
+log = logging.getLogger("ViewNudger")
+
+# Seconds of work per event-loop tick.
+DEFAULT_BUDGET = 0.015
+
+
+class Job(object):
+    """
+    :class:`Job` wraps a generator that does one chunk of work per step
+    and yields how many items are done so far.
+    """
+    def __init__(self, steps, total, rollback=None, name="job"):
+        """
+        :param steps: Generator yielding the number of items done.
+        :type steps: generator
+        :param total: Number of items in the job.
+        :type total: int
+        :param rollback: Called to undo the finished chunks on cancel.
+        :type rollback: callable
+        :param name: Name for logging.
+        :type name: str
+        """
+        self.steps = steps
+        self.total = total
+        self.rollback = rollback
+        self.name = name
+
+        self.done = 0
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+
+        self.progressCallbacks = []
+        self.finishedCallbacks = []
+
+    @property
+    def progress(self):
+        """
+        Fraction of the job done, between 0 and 1.
+        """
+        return self.done / self.total if self.total else 1.0
+
+    def step(self):
+        """
+        Runs one chunk.
+
+        :raises: None
+
+        :return: False once the job has finished.
+        :rtype: bool
+        """
+        try:
+            self.done = next(self.steps)
+        except StopIteration:
+            self.done = self.total
+            self.finish()
+            return False
+        except Exception as e:
+            log.exception("%s failed.", self.name)
+            self.error = e
+            self.cancel()
+            return False
+
+        for callback in self.progressCallbacks:
+            callback(self)
+
+        return True
+
+    def cancel(self):
+        """
+        Stops the job and rolls back the chunks already done.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        if self.finished:
+            return
+
+        self.cancelled = True
+        self.steps.close()
+
+        if self.rollback is not None:
+            log.debug("Rolling back %s...", self.name)
+            self.rollback()
+
+        self.finish()
+
+    def finish(self):
+        """
+        Marks the job finished and calls the finished callbacks.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self.finished = True
+
+        for callback in self.finishedCallbacks:
+            callback(self)
+
+
+class Scheduler(object):
+    """
+    :class:`Scheduler` runs jobs a few chunks at a time between Qt
+    event-loop ticks, so Maya stays interactive while they finish.
+    """
+    def __init__(self, budget=DEFAULT_BUDGET):
+        """
+        :param budget: Seconds of work per event-loop tick.
+        :type budget: float
+        """
+        self.budget = budget
+        self.jobs = []
+        self._timer = None
+
+    @property
+    def busy(self):
+        """
+        True while a job is still running. Nudging the same transforms
+        then would be overwritten by the job's later chunks.
+        """
+        return any(not job.finished for job in self.jobs)
+
+    def submit(self, job, start=True):
+        """
+        Queues a job and starts ticking.
+
+        :param job: Job to run.
+        :type job: Job
+        :param start: Start the event-loop timer, leave off for :meth:`run`.
+        :type start: bool
+
+        :raises: None
+
+        :return: The job.
+        :rtype: Job
+        """
+        self.jobs.append(job)
+
+        if not start:
+            return job
+
+        if self._timer is None:
+            self._timer = QtCore.QTimer()
+            self._timer.setInterval(0)
+            self._timer.timeout.connect(self.tick)
+
+        if not self._timer.isActive():
+            self._timer.start()
+
+        return job
+
+    def cancel(self, job=None):
+        """
+        Cancels a job, or every job, with rollback.
+
+        :param job: Job to cancel, defaults to all.
+        :type job: Job
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        for queued in list(self.jobs):
+            if job is None or queued is job:
+                queued.cancel()
+                self.jobs.remove(queued)
+
+    def tick(self):
+        """
+        Runs chunks until the budget is used up.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        start = time.time()
+
+        while self.jobs and time.time() - start < self.budget:
+            job = self.jobs[0]
+
+            if job.finished or not job.step():
+                self.jobs.pop(0)
+
+        if not self.jobs and self._timer is not None:
+            self._timer.stop()
+
+    def run(self):
+        """
+        Runs every queued job to completion without the event loop.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        while self.jobs:
+            self.tick()
+
+
+# Shared scheduler for the UI and api jobs.
+scheduler = Scheduler()
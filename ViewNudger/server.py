@@ -0,0 +1,622 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import division
+
+import collections
+import errno
+import functools
+import logging
+import math
+import os
+import select
+import socket
+import stat
+import struct
+import threading
+import time
+
+try:
+    from PySide import QtCore
+except:
+    pass
+
+from . import api
+
+log = logging.getLogger("ViewNudger")
+
+DEFAULT_ADDRESS = ("127.0.0.1", 7722)
+
+MODE_VIEW = 0
+MODE_OBJECT = 1
+MODE_ROTATE = 2
+MODES = (MODE_VIEW, MODE_OBJECT, MODE_ROTATE)
+
+# mode, dx, dy and byte length of the utf-8 target name that follows.
+HEADER = struct.Struct("!BffH")
+
+_server = None
+
+
+def encode(target, dx, dy, mode=MODE_VIEW):
+    """
+    Packs a single nudge into a frame.
+
+    :param target: Transform to nudge, empty for the current selection.
+    :type target: str
+    :param dx: Pixel amount in x.
+    :type dx: float
+    :param dy: Pixel amount in y.
+    :type dy: float
+    :param mode: One of MODE_VIEW, MODE_OBJECT or MODE_ROTATE.
+    :type mode: int
+
+    :raises: None
+
+    :return: Encoded frame.
+    :rtype: bytes
+    """
+    name = target.encode("utf-8") if target else b""
+    return HEADER.pack(mode, dx, dy, len(name)) + name
+
+
+def decode(buffer):
+    """
+    Unpacks every complete frame from the front of buffer.
+
+    :param buffer: Received bytes, consumed frames are removed in place.
+    :type buffer: bytearray
+
+    Frames with an unknown mode or a pixel amount that isn't finite are
+    consumed and dropped.
+
+    :raises ValueError: If a target name isn't utf-8, the frames before it
+                        are still consumed.
+
+    :return: Decoded (target, dx, dy, mode) messages.
+    :rtype: list of tuple
+    """
+    messages = []
+    offset = 0
+    end = len(buffer)
+
+    while end - offset >= HEADER.size:
+        mode, dx, dy, length = HEADER.unpack_from(buffer, offset)
+        start = offset + HEADER.size
+
+        if end - start < length:
+            break
+
+        try:
+            name = bytes(buffer[start:start + length]).decode("utf-8")
+        except UnicodeDecodeError:
+            del buffer[:offset]
+            raise ValueError("Malformed nudge frame.")
+
+        offset = start + length
+
+        if mode not in MODES:
+            log.warning("Dropping nudge with unknown mode %s.", mode)
+            continue
+
+        if any(math.isinf(value) or math.isnan(value) for value in (dx, dy)):
+            log.warning("Dropping nudge of %s, %s.", dx, dy)
+            continue
+
+        messages.append((name, dx, dy, mode))
+
+    del buffer[:offset]
+
+    return messages
+
+
+def coalesce(messages, pending=None):
+    """
+    Sums messages per target and mode, keeping arrival order.
+
+    :param messages: Decoded (target, dx, dy, mode) messages.
+    :type messages: list of tuple
+    :param pending: Existing totals to add to.
+    :type pending: collections.OrderedDict
+
+    :raises: None
+
+    :return: Pixel totals keyed by (target, mode).
+    :rtype: collections.OrderedDict
+    """
+    if pending is None:
+        pending = collections.OrderedDict()
+
+    for name, dx, dy, mode in messages:
+        total = pending.get((name, mode))
+
+        if total is None:
+            pending[(name, mode)] = [dx, dy]
+        else:
+            total[0] += dx
+            total[1] += dy
+
+    return pending
+
+
+def applyNudges(nudges):
+    """
+    Applies coalesced nudges, the objects of a tick are moved together by
+    :func:`ViewNudger.api.nudgeObjects` and everything else goes through
+    :func:`ViewNudger.api.nudge`.
+
+    :param nudges: Pixel totals keyed by (target, mode).
+    :type nudges: collections.OrderedDict
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    objects = collections.OrderedDict()
+
+    for (name, mode), pixelAmount in nudges.items():
+        try:
+            name = name or api.getSelection()
+
+            if mode == MODE_OBJECT and not api.isPointNode(name):
+                total = objects.setdefault(name, [0.0, 0.0])
+                total[0] += pixelAmount[0]
+                total[1] += pixelAmount[1]
+                continue
+
+            api.nudge(name,
+                      pixelAmount=pixelAmount,
+                      moveObject=mode == MODE_OBJECT,
+                      rotateView=mode == MODE_ROTATE)
+        except Exception:
+            log.exception("Failed to nudge %s.", name or "selection")
+
+    if not objects:
+        return
+
+    try:
+        api.nudgeObjects(list(objects.keys()),
+                         pixelAmount=list(objects.values()))
+    except Exception:
+        log.exception("Failed to nudge %s objects.", len(objects))
+
+
+def _removeStaleSocket(path):
+    """
+    Removes a Unix socket file left behind by a server that didn't stop,
+    a socket something still listens on is left alone.
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except OSError:
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except socket.error as e:
+        if e.args[0] == errno.ECONNREFUSED:
+            log.debug("Removing stale socket %s.", path)
+            os.unlink(path)
+    finally:
+        probe.close()
+
+
+class NudgeServer(object):
+    """
+    :class:`NudgeServer` receives framed nudges over a local socket.
+
+    Inside Maya use :meth:`attach` so reads happen on socket activity and
+    everything received during one event-loop tick is applied together.
+    Outside Maya :meth:`serve` runs a plain select loop.
+    """
+    def __init__(self, address=DEFAULT_ADDRESS, apply=applyNudges):
+        """
+        :param address: (host, port) for TCP or a path for a Unix socket.
+        :type address: tuple or str
+        :param apply: Called with the coalesced nudges of each tick.
+        :type apply: callable
+        """
+        self.address = address
+        self.apply = apply
+        self.received = 0
+
+        self._socket = None
+        self._clients = {}
+        self._notifiers = {}
+        self._pending = collections.OrderedDict()
+        self._flushScheduled = False
+        self._running = False
+        self._serving = False
+
+    def start(self):
+        """
+        Binds and listens on the address.
+
+        :raises: socket.error if the address is unavailable.
+
+        :return: None
+        :rtype: NoneType
+        """
+        if isinstance(self.address, str):
+            _removeStaleSocket(self.address)
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        self._socket.bind(self.address)
+        self._socket.listen(5)
+        self._socket.setblocking(False)
+
+        self.address = self._socket.getsockname()
+        self._running = True
+
+        log.info("Nudge server listening on %s.", self.address)
+
+    def stop(self):
+        """
+        Closes the server and every client. When :meth:`serve` is running
+        on another thread the loop closes them on its way out.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self._running = False
+
+        if not self._serving:
+            self._close()
+
+    def _close(self):
+        for notifier in self._notifiers.values():
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+        self._notifiers.clear()
+
+        for client in list(self._clients):
+            client.close()
+        self._clients.clear()
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+            if isinstance(self.address, str):
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+
+    def accept(self):
+        """
+        Accepts every waiting client.
+
+        :raises: None
+
+        :return: Newly connected clients.
+        :rtype: list of socket.socket
+        """
+        accepted = []
+
+        while True:
+            try:
+                client, _ = self._socket.accept()
+            except socket.error as e:
+                if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+
+            client.setblocking(False)
+            self._clients[client] = bytearray()
+            accepted.append(client)
+
+        return accepted
+
+    def read(self, client):
+        """
+        Reads everything available from a client into the pending nudges.
+
+        :param client: Connected client.
+        :type client: socket.socket
+
+        :raises: None
+
+        :return: False if the client disconnected.
+        :rtype: bool
+        """
+        buffer = self._clients[client]
+        connected = True
+
+        while True:
+            try:
+                data = client.recv(65536)
+            except socket.error as e:
+                if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                data = b""
+
+            if not data:
+                connected = False
+                break
+
+            buffer.extend(data)
+
+        try:
+            messages = decode(buffer)
+        except ValueError:
+            log.warning("Dropping client that sent a malformed frame.")
+            messages = []
+            connected = False
+
+        self.received += len(messages)
+        coalesce(messages, self._pending)
+
+        if not connected:
+            self.disconnect(client)
+
+        return connected
+
+    def disconnect(self, client):
+        """
+        Drops a client.
+
+        :param client: Connected client.
+        :type client: socket.socket
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        notifier = self._notifiers.pop(client, None)
+        if notifier is not None:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+
+        self._clients.pop(client, None)
+        client.close()
+
+    def flush(self):
+        """
+        Applies the pending nudges in one go.
+
+        :raises: None
+
+        :return: Number of coalesced nudges applied.
+        :rtype: int
+        """
+        self._flushScheduled = False
+
+        if not self._pending:
+            return 0
+
+        pending = self._pending
+        self._pending = collections.OrderedDict()
+        self.apply(pending)
+
+        return len(pending)
+
+    def serve(self, timeout=0.05):
+        """
+        Runs a blocking select loop until :meth:`stop` is called.
+
+        :param timeout: Seconds between checks for stop.
+        :type timeout: float
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self._serving = True
+
+        try:
+            while self._running:
+                sockets = [self._socket] + list(self._clients)
+                readable = select.select(sockets, [], [], timeout)[0]
+
+                for sock in readable:
+                    if sock is self._socket:
+                        self.accept()
+                    elif sock in self._clients:
+                        self.read(sock)
+
+                self.flush()
+
+        finally:
+            self._serving = False
+            self._close()
+
+    def attach(self):
+        """
+        Drives the server from the Qt event loop with socket notifiers.
+        Reads are coalesced and flushed once per event-loop tick.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        notifier = QtCore.QSocketNotifier(
+            self._socket.fileno(), QtCore.QSocketNotifier.Read)
+        notifier.activated.connect(self._onAccept)
+        self._notifiers[self._socket] = notifier
+
+    def _onAccept(self, *args):
+        for client in self.accept():
+            notifier = QtCore.QSocketNotifier(
+                client.fileno(), QtCore.QSocketNotifier.Read)
+            notifier.activated.connect(functools.partial(self._onRead, client))
+            self._notifiers[client] = notifier
+
+    def _onRead(self, client, *args):
+        if client not in self._clients:
+            return
+
+        self.read(client)
+
+        if self._pending and not self._flushScheduled:
+            self._flushScheduled = True
+            QtCore.QTimer.singleShot(0, self.flush)
+
+
+class NudgeClient(object):
+    """
+    :class:`NudgeClient` is a reference client for :class:`NudgeServer`.
+    """
+    def __init__(self, address=DEFAULT_ADDRESS):
+        """
+        :param address: (host, port) for TCP or a path for a Unix socket.
+        :type address: tuple or str
+        """
+        if isinstance(address, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        self._socket.connect(address)
+
+    def nudge(self, target, dx, dy, mode=MODE_VIEW):
+        """
+        Sends a single nudge.
+
+        :param target: Transform to nudge, empty for the current selection.
+        :type target: str
+        :param dx: Pixel amount in x.
+        :type dx: float
+        :param dy: Pixel amount in y.
+        :type dy: float
+        :param mode: One of MODE_VIEW, MODE_OBJECT or MODE_ROTATE.
+        :type mode: int
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self._socket.sendall(encode(target, dx, dy, mode))
+
+    def send(self, messages):
+        """
+        Sends many nudges in one write.
+
+        :param messages: (target, dx, dy, mode) messages.
+        :type messages: list of tuple
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self._socket.sendall(b"".join(encode(*m) for m in messages))
+
+    def close(self):
+        """
+        Closes the connection.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self._socket.close()
+
+
+def start(address=DEFAULT_ADDRESS):
+    """
+    Starts the nudge server inside Maya's event loop.
+
+    :param address: (host, port) for TCP or a path for a Unix socket.
+    :type address: tuple or str
+
+    :raises: None
+
+    :return: Running server.
+    :rtype: NudgeServer
+    """
+    global _server
+
+    stop()
+
+    _server = NudgeServer(address)
+    _server.start()
+    _server.attach()
+
+    return _server
+
+
+def stop():
+    """
+    Stops the nudge server started by :func:`start`.
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    """
+    global _server
+
+    if _server is not None:
+        _server.stop()
+        _server = None
+
+
+def benchmark(count=100000, burst=100, address=("127.0.0.1", 0)):
+    """
+    Measures server throughput against a stand-in that only counts nudges,
+    so it runs without Maya.
+
+    :param count: Number of messages to send.
+    :type count: int
+    :param burst: Messages per client write.
+    :type burst: int
+    :param address: Address for the benchmark server.
+    :type address: tuple or str
+
+    :raises: None
+
+    :return: Messages, seconds, messages per second and apply calls.
+    :rtype: dict
+    """
+    applied = []
+    server = NudgeServer(address, apply=lambda nudges: applied.append(
+        len(nudges)))
+    server.start()
+
+    thread = threading.Thread(target=server.serve, args=(0.001,))
+    thread.daemon = True
+    thread.start()
+
+    client = NudgeClient(server.address)
+    messages = [("pSphere1", 1.0, 0.0, MODE_OBJECT)] * burst
+
+    start = time.time()
+
+    for _ in range(count // burst):
+        client.send(messages)
+
+    while server.received < (count // burst) * burst:
+        time.sleep(0.0005)
+
+    elapsed = time.time() - start
+
+    client.close()
+    server.stop()
+    thread.join()
+
+    return {"messages": server.received,
+            "seconds": elapsed,
+            "messagesPerSecond": server.received / elapsed,
+            "applies": len(applied)}
+
+
+if __name__ == '__main__':
+
+    print(benchmark())
@@ -0,0 +1,162 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import logging
+
+try:
+    from maya import OpenMaya
+except:
+    pass
+
+try:
+    import numpy
+except:
+    pass
+
+log = logging.getLogger("ViewNudger")
+
+# Depth mode that lands nudged points on a mesh.
+DEPTH_SURFACE = "surface"
+
+# Mesh plugs that mean the geometry changed when dirtied.
+GEOMETRY_PLUGS = ("inMesh", "outMesh", "cachedInMesh")
+
+
+class SurfaceAccelerator(object):
+    """
+    :class:`SurfaceAccelerator` keeps an MFnMesh and its intersection
+    acceleration grid per mesh so repeated raycasts reuse it. An entry is
+    dropped only when the mesh geometry is dirtied, moving the mesh's
+    transform keeps it.
+    """
+    def __init__(self):
+        self._meshes = {}
+
+    def get(self, mesh):
+        """
+        Gets the function set and accelerator of a mesh, building them
+        on first use.
+
+        :param mesh: Mesh shape or its transform.
+        :type mesh: str
+
+        :raises RuntimeError: If mesh isn't a mesh.
+
+        :return: Function set and accelerator parameters.
+        :rtype: tuple of OpenMaya.MFnMesh and OpenMaya.MMeshIsectAccelParams
+        """
+        selection = OpenMaya.MSelectionList()
+        selection.add(mesh)
+
+        dagPath = OpenMaya.MDagPath()
+        selection.getDagPath(0, dagPath)
+
+        try:
+            dagPath.extendToShape()
+        except RuntimeError:
+            pass
+
+        if not dagPath.hasFn(OpenMaya.MFn.kMesh):
+            log.error("%s isn't a mesh.", mesh)
+            raise RuntimeError("%s isn't a mesh." % mesh)
+
+        key = dagPath.fullPathName()
+        entry = self._meshes.get(key)
+
+        if entry is None:
+            log.debug("Building intersection accelerator for %s...", key)
+
+            fnMesh = OpenMaya.MFnMesh(dagPath)
+            callbackId = OpenMaya.MNodeMessage.addNodeDirtyPlugCallback(
+                dagPath.node(), self._onDirty, key)
+
+            entry = (fnMesh, fnMesh.autoUniformGridParams(), callbackId)
+            self._meshes[key] = entry
+
+        return entry[0], entry[1]
+
+    def _onDirty(self, node, plug, key):
+        if plug.partialName(False, False, False, False, False, True) in \
+                GEOMETRY_PLUGS:
+            self.invalidate(key)
+
+    def invalidate(self, mesh):
+        """
+        Drops the cached accelerator of a mesh.
+
+        :param mesh: Full path of the mesh shape.
+        :type mesh: str
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        entry = self._meshes.pop(mesh, None)
+
+        if entry is not None:
+            fnMesh, _, callbackId = entry
+            fnMesh.freeCachedIntersectionAccelerator()
+            OpenMaya.MMessage.removeCallback(callbackId)
+
+    def clear(self):
+        """
+        Drops every cached accelerator.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        for mesh in list(self._meshes):
+            self.invalidate(mesh)
+
+    def raycast(self, mesh, source, directions, maxDistance=1e7):
+        """
+        Casts rays from one source onto a mesh in world space.
+
+        :param mesh: Mesh shape or its transform.
+        :type mesh: str
+        :param source: Ray origin, usually the camera.
+        :type source: list of 3 floats
+        :param directions: Unit ray directions.
+        :type directions: numpy.ndarray (N, 3)
+        :param maxDistance: Longest ray.
+        :type maxDistance: float
+
+        :raises RuntimeError: If mesh isn't a mesh.
+
+        :return: Hit positions and which rays hit.
+        :rtype: tuple of numpy.ndarray (N, 3) and numpy.ndarray (N,)
+        """
+        fnMesh, accelParams = self.get(mesh)
+
+        raySource = OpenMaya.MFloatPoint(*[float(v) for v in source])
+        rayDirection = OpenMaya.MFloatVector()
+        hitPoint = OpenMaya.MFloatPoint()
+
+        hits = numpy.zeros((len(directions), 3))
+        hit = numpy.zeros(len(directions), dtype=bool)
+
+        for index, direction in enumerate(directions.tolist()):
+            rayDirection.x, rayDirection.y, rayDirection.z = direction
+
+            if fnMesh.closestIntersection(raySource,
+                                          rayDirection,
+                                          None,
+                                          None,
+                                          False,
+                                          OpenMaya.MSpace.kWorld,
+                                          maxDistance,
+                                          False,
+                                          accelParams,
+                                          hitPoint,
+                                          None,
+                                          None,
+                                          None,
+                                          None,
+                                          None):
+                hits[index] = hitPoint.x, hitPoint.y, hitPoint.z
+                hit[index] = True
+
+        return hits, hit
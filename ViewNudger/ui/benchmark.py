@@ -0,0 +1,68 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import sys
+import time
+import importlib
+
+try:
+    from PySide import QtGui, QtCore
+except:
+    pass
+
+
+class PaintWatcher(QtCore.QObject):
+    """
+    :class:`PaintWatcher` records the time of the first paint event.
+    """
+    def __init__(self, parent=None):
+        super(PaintWatcher, self).__init__(parent)
+        self.painted = None
+
+    def eventFilter(self, obj, event):
+        if self.painted is None and event.type() == QtCore.QEvent.Paint:
+            self.painted = time.time()
+
+        return False
+
+
+def startup(cold=True):
+    """
+    Times opening the dialog from import to first paint.
+
+    :param cold: Drop the cached ViewNudger.ui modules first, which also
+                 drops the cached stylesheet and icon atlas.
+    :type cold: bool
+
+    :raises: None
+
+    :return: Seconds spent importing, constructing and until first paint.
+    :rtype: dict
+    """
+    if cold:
+        for name in list(sys.modules):
+            if name == "ViewNudger.ui" or (
+                    name.startswith("ViewNudger.ui.") and name != __name__):
+                del sys.modules[name]
+
+    start = time.time()
+
+    ui = importlib.import_module("ViewNudger.ui")
+    imported = time.time()
+
+    dialog = ui.UI()
+    constructed = time.time()
+
+    watcher = PaintWatcher(dialog)
+    dialog.installEventFilter(watcher)
+    dialog.create()
+
+    while watcher.painted is None:
+        QtGui.qApp.processEvents()
+
+    painted = watcher.painted
+    dialog.close()
+
+    return {"import": imported - start,
+            "construct": constructed - imported,
+            "firstPaint": painted - start}
@@ -1,10 +1,10 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import os
 import logging
 from . import utils
 from . import widgets
+from .. import scheduler
 from functools import partial
 
 try:
@@ -12,20 +12,23 @@ try:
 except:
     pass
 
-from .. import api
-reload(api)
-
-this_package = os.path.abspath(os.path.dirname(__file__))
-icon_path = partial(os.path.join, this_package)
+# Imported on the first nudge so opening the dialog skips api and NumPy.
+api = utils.LazyModule("..api", __name__.rpartition(".")[0])
 
 log = logging.getLogger("ViewNudger")
 
+# Selections larger than this nudge a chunk at a time in the background.
+JOB_THRESHOLD = 1000
+
 
 class UI(QtGui.QDialog):
     """
     :class:`UI` deals with building our UI.
     """
-    def __init__(self, parent=utils.get_maya_window()):
+    def __init__(self, parent=None):
+
+        if parent is None:
+            parent = utils.get_maya_window()
 
         super(UI, self).__init__(parent)
 
@@ -36,8 +39,7 @@ class UI(QtGui.QDialog):
         self.setObjectName("viewNudger")
         self.setWindowFlags(QtCore.Qt.Window)
 
-        with open(icon_path("style.css")) as f:
-            self.setStyleSheet(f.read())
+        self.setStyleSheet(utils.get_stylesheet())
 
         # Center to frame.
         qr = self.frameGeometry()
@@ -70,36 +72,36 @@ class UI(QtGui.QDialog):
         self.button_layout = QtGui.QGridLayout()
 
         self.nudgeUp_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeUp_normal.png"),
-            icon_hover=icon_path("icons", "nudgeUp_hover.png"),
+            icon=utils.get_icon("nudgeUp_normal"),
+            icon_hover=utils.get_icon("nudgeUp_hover"),
         )
         self.nudgeDown_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeDown_normal.png"),
-            icon_hover=icon_path("icons", "nudgeDown_hover.png"),
+            icon=utils.get_icon("nudgeDown_normal"),
+            icon_hover=utils.get_icon("nudgeDown_hover"),
         )
         self.nudgeLeft_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeLeft_normal.png"),
-            icon_hover=icon_path("icons", "nudgeLeft_hover.png"),
+            icon=utils.get_icon("nudgeLeft_normal"),
+            icon_hover=utils.get_icon("nudgeLeft_hover"),
         )
         self.nudgeRight_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeRight_normal.png"),
-            icon_hover=icon_path("icons", "nudgeRight_hover.png"),
+            icon=utils.get_icon("nudgeRight_normal"),
+            icon_hover=utils.get_icon("nudgeRight_hover"),
         )
         self.nudgeUpLeft_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeUpLeft_normal.png"),
-            icon_hover=icon_path("icons", "nudgeUpLeft_hover.png"),
+            icon=utils.get_icon("nudgeUpLeft_normal"),
+            icon_hover=utils.get_icon("nudgeUpLeft_hover"),
         )
         self.nudgeUpRight_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeUpRight_normal.png"),
-            icon_hover=icon_path("icons", "nudgeUpRight_hover.png"),
+            icon=utils.get_icon("nudgeUpRight_normal"),
+            icon_hover=utils.get_icon("nudgeUpRight_hover"),
         )
         self.nudgeDownLeft_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeDownLeft_normal.png"),
-            icon_hover=icon_path("icons", "nudgeDownLeft_hover.png"),
+            icon=utils.get_icon("nudgeDownLeft_normal"),
+            icon_hover=utils.get_icon("nudgeDownLeft_hover"),
         )
         self.nudgeDownRight_Btn = widgets.IconButton(
-            icon=icon_path("icons", "nudgeDownRight_normal.png"),
-            icon_hover=icon_path("icons", "nudgeDownRight_hover.png"),
+            icon=utils.get_icon("nudgeDownRight_normal"),
+            icon_hover=utils.get_icon("nudgeDownRight_hover"),
         )
 
         self.button_separator = widgets.LineWidget("main_seperator")
@@ -114,12 +116,62 @@ class UI(QtGui.QDialog):
 
         self.nudgeValue_SPNBOX = widgets.DoubleSpinBox("nudgeValue", 1.0)
 
+        self.depth_LBL = widgets.LabelWidget("Depth : ")
+        self.depth_CMBOX = widgets.ComboBox("depth", [
+            ("Distance", "distance"),
+            ("View Depth", "view"),
+            ("Ground", "plane"),
+            ("Surface", "surface"),
+        ])
+
         self.bottom_layout.addWidget(self.rotateView_LBL)
         self.bottom_layout.addWidget(self.rotateView_CHKBOX)
         self.bottom_layout.addWidget(self.moveObject_LBL)
         self.bottom_layout.addWidget(self.moveObject_CHKBOX)
         self.bottom_layout.addWidget(self.nudgeValue_SPNBOX)
 
+        self.offset_layout = QtGui.QHBoxLayout()
+
+        self.offset_LBL = widgets.LabelWidget("Apply : ")
+        offsetItems = [("Current Frame", None)]
+        if utils.has_offset_parent():
+            offsetItems.append(("Offset Parent", "offsetParent"))
+        offsetItems.append(("Anim Layer", "animLayer"))
+        offsetItems.append(("Playback Range", "frames"))
+
+        self.offset_CMBOX = widgets.ComboBox("offset", offsetItems)
+
+        self.offsetEnabled_LBL = widgets.LabelWidget("Offsets On : ")
+        self.offsetEnabled_CHKBOX = widgets.CheckBox("offsetEnabled", True)
+
+        self.offset_layout.addWidget(self.offset_LBL)
+        self.offset_layout.addWidget(self.offset_CMBOX)
+        self.offset_layout.addWidget(self.offsetEnabled_LBL)
+        self.offset_layout.addWidget(self.offsetEnabled_CHKBOX)
+
+        self.history_layout = QtGui.QHBoxLayout()
+
+        self.history_layout.addWidget(self.depth_LBL)
+        self.history_layout.addWidget(self.depth_CMBOX)
+
+        self.revert_Btn = QtGui.QPushButton("Revert")
+        self.reset_Btn = QtGui.QPushButton("Reset")
+
+        self.history_layout.addWidget(self.revert_Btn)
+        self.history_layout.addWidget(self.reset_Btn)
+
+        self.job_layout = QtGui.QHBoxLayout()
+
+        self.job_PRGBAR = QtGui.QProgressBar()
+        self.job_PRGBAR.setRange(0, 100)
+        self.cancel_Btn = QtGui.QPushButton("Cancel")
+
+        self.job_layout.addWidget(self.job_PRGBAR)
+        self.job_layout.addWidget(self.cancel_Btn)
+
+        self.job_PRGBAR.hide()
+        self.cancel_Btn.hide()
+
         self.button_layout.addWidget(self.nudgeUpLeft_Btn, 0, 0)
         self.button_layout.addWidget(self.nudgeUp_Btn, 0, 1)
         self.button_layout.addWidget(self.nudgeUpRight_Btn, 0, 2)
@@ -135,6 +187,9 @@ class UI(QtGui.QDialog):
         self.central_boxLayout.addLayout(self.button_layout)
         self.central_boxLayout.addWidget(self.button_separator)
         self.central_boxLayout.addLayout(self.bottom_layout)
+        self.central_boxLayout.addLayout(self.offset_layout)
+        self.central_boxLayout.addLayout(self.history_layout)
+        self.central_boxLayout.addLayout(self.job_layout)
 
     def create_connections(self):
         """
@@ -162,6 +217,12 @@ class UI(QtGui.QDialog):
         self.nudgeDownRight_Btn.clicked.connect(
             partial(self.nudge, [1.0, -1.0]))
 
+        self.revert_Btn.clicked.connect(self.revert)
+        self.reset_Btn.clicked.connect(self.reset)
+        self.cancel_Btn.clicked.connect(self.cancel)
+
+        self.offsetEnabled_CHKBOX.stateChanged.connect(self.toggleOffsets)
+
         self.rotateView_CHKBOX.stateChanged.connect(self.testChkBox)
 
     def testChkBox(self, stateChanged):
@@ -209,19 +270,204 @@ class UI(QtGui.QDialog):
         :return: None
         :rtype: NoneType
         """
+        if self.job_running():
+            return
+
         pixelMove = self.nudgeValue_SPNBOX.value()
         moveObject = self.moveObject_CHKBOX.isChecked()
         rotateView = self.rotateView_CHKBOX.isChecked()
+        depthMode = self.depth_CMBOX.itemData(
+            self.depth_CMBOX.currentIndex())
+        offsetMode = self.offset_CMBOX.itemData(
+            self.offset_CMBOX.currentIndex())
 
-        transform = api.getSelection()
+        transforms = api.getSelection(multiple=True)
+
+        # Slide on the last selected mesh, like Maya's constrain tools.
+        mesh = None
+        if depthMode == "surface":
+            if len(transforms) < 2:
+                log.error("Select objects then the mesh to slide on.")
+                raise RuntimeError("Select objects then the mesh to slide on.")
+            mesh = transforms.pop()
 
         pixelAmount = [pixelMove * i for i in vector]
 
+        if offsetMode == "frames":
+            if not moveObject:
+                log.error("Playback Range keys objects, check Move Object.")
+                raise RuntimeError(
+                    "Playback Range keys objects, check Move Object.")
+
+            api.nudgeFrames(
+                transforms,
+                pixelAmount=pixelAmount,
+                depthMode=depthMode)
+            return
+
+        if moveObject and len(transforms) > JOB_THRESHOLD and not offsetMode:
+            self.submit(api.nudgeObjectsJob(
+                transforms,
+                pixelAmount=pixelAmount,
+                depthMode=depthMode,
+                mesh=mesh))
+            return
+
+        if moveObject and len(transforms) > 1 and not offsetMode:
+            api.nudgeObjects(
+                transforms,
+                pixelAmount=pixelAmount,
+                depthMode=depthMode,
+                mesh=mesh)
+            return
+
         api.nudge(
-            transform,
+            transforms[0],
             pixelAmount=pixelAmount,
             moveObject=moveObject,
-            rotateView=rotateView)
+            rotateView=rotateView,
+            depthMode=depthMode,
+            offsetMode=offsetMode,
+            mesh=mesh)
+
+    def submit(self, job):
+        """
+        Runs a job in the background, showing its progress.
+
+        :param job: Job to run.
+        :type job: ViewNudger.scheduler.Job
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        job.progressCallbacks.append(self.update_progress)
+        job.finishedCallbacks.append(self.finish_job)
+
+        self.job_PRGBAR.setValue(0)
+        self.job_PRGBAR.show()
+        self.cancel_Btn.show()
+
+        scheduler.scheduler.submit(job)
+
+    def update_progress(self, job):
+        """
+        Updates the progress bar from a job.
+
+        :param job: Running job.
+        :type job: ViewNudger.scheduler.Job
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        self.job_PRGBAR.setValue(int(job.progress * 100))
+
+    def finish_job(self, job):
+        """
+        Hides the progress bar once no jobs are left.
+
+        :param job: Finished job.
+        :type job: ViewNudger.scheduler.Job
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        if job.cancelled:
+            log.warning("%s cancelled, rolled back.", job.name)
+
+        if scheduler.scheduler.busy:
+            return
+
+        self.job_PRGBAR.hide()
+        self.cancel_Btn.hide()
+
+    def job_running(self):
+        """
+        Warns if a job is still running, nudges and reverts wait for it so
+        its later chunks don't overwrite them.
+
+        :raises: None
+
+        :return: True while a job is running.
+        :rtype: bool
+        """
+        if not scheduler.scheduler.busy:
+            return False
+
+        log.warning("Wait for the running nudge to finish or cancel it.")
+        return True
+
+    def cancel(self):
+        """
+        Cancels every running job and rolls them back.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        scheduler.scheduler.cancel()
+
+    def toggleOffsets(self, stateChanged):
+        """
+        Enables or disables every written offset.
+
+        :param stateChanged: Value of state change on checkbox.
+        :type stateChanged:  int
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        api.setOffsetEnabled(enabled=bool(stateChanged))
+
+    def history_targets(self):
+        """
+        Gets the transforms the current settings nudge.
+
+        :raises: None
+
+        :return: Selected transforms or the view camera.
+        :rtype: list of str
+        """
+        if self.moveObject_CHKBOX.isChecked():
+            return api.getSelection(multiple=True)
+
+        return [api.getViewCamera()]
+
+    def revert(self):
+        """
+        Steps back the last nudge.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        if self.job_running():
+            return
+
+        api.revertNudges(self.history_targets())
+
+    def reset(self):
+        """
+        Resets to before the first recorded nudge.
+
+        :raises: None
+
+        :return: None
+        :rtype: NoneType
+        """
+        if self.job_running():
+            return
+
+        api.resetNudges(self.history_targets())
 
     def create_tooltips(self):
         """
@@ -232,7 +478,18 @@ class UI(QtGui.QDialog):
         :return: None
         :rtype: NoneType
         """
-        pass
+        self.revert_Btn.setToolTip("Step back the last nudge.")
+        self.reset_Btn.setToolTip("Reset to before the first nudge.")
+        self.cancel_Btn.setToolTip(
+            "Stop the running nudge and put back what it already moved.")
+        self.offset_CMBOX.setToolTip(
+            "Key the current frame, write a constant offset"
+            " for the whole animation or key every frame of the"
+            " playback range against its camera.")
+        self.depth_CMBOX.setToolTip(
+            "Keep the distance to camera, the depth along the view axis"
+            " or stay on the ground plane. Surface slides on the last"
+            " selected mesh.")
 
     def close_dialog(self):
         """
@@ -1,8 +1,136 @@
+import os
 import time
+import importlib
 import shiboken
-from PySide import QtGui
+from PySide import QtGui, QtCore
+from maya import cmds
 from maya.OpenMayaUI import MQtUtil
 
+this_package = os.path.abspath(os.path.dirname(__file__))
+
+# Icons packed in icons/atlas.png, left to right then top to bottom.
+ICON_NAMES = [
+    "{0}_{1}".format(name, state)
+    for name in ("nudgeUpLeft", "nudgeUp", "nudgeUpRight", "nudgeLeft",
+                 "nudgeRight", "nudgeDownLeft", "nudgeDown", "nudgeDownRight")
+    for state in ("normal", "hover")
+]
+ICON_SIZE = 100
+ATLAS_COLUMNS = 4
+
+# First Maya API version with offsetParentMatrix.
+OFFSET_PARENT_API_VERSION = 20200000
+
+_stylesheets = {}
+_icons = {}
+
+
+class LazyModule(object):
+    """
+    :class:`LazyModule` imports a module on first attribute access.
+    """
+    def __init__(self, name, package=None):
+        self._name = name
+        self._package = package
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(
+                self._name, self._package)
+
+        return getattr(self._module, attr)
+
+
+def get_stylesheet(path=os.path.join(this_package, "style.css")):
+    """
+    Reads a stylesheet once per process.
+
+    :param path: Stylesheet file.
+    :type path: str
+
+    :raises: None
+
+    :return: Stylesheet contents.
+    :rtype: str
+    """
+    if path not in _stylesheets:
+        with open(path) as f:
+            _stylesheets[path] = f.read()
+
+    return _stylesheets[path]
+
+
+def get_icon(name):
+    """
+    Gets an icon from the atlas, decoding the atlas only once per process.
+
+    :param name: Icon name from ICON_NAMES.
+    :type name: str
+
+    :raises ValueError: If name isn't in the atlas.
+
+    :return: Icon.
+    :rtype: QtGui.QPixmap
+    """
+    if not _icons:
+        atlas = QtGui.QPixmap(
+            os.path.join(this_package, "icons", "atlas.png"))
+
+        for index, iconName in enumerate(ICON_NAMES):
+            _icons[iconName] = atlas.copy(
+                (index % ATLAS_COLUMNS) * ICON_SIZE,
+                (index // ATLAS_COLUMNS) * ICON_SIZE,
+                ICON_SIZE,
+                ICON_SIZE)
+
+    return _icons[name]
+
+
+def build_icon_atlas():
+    """
+    Packs the separate icon files into icons/atlas.png.
+    Run after changing any of the icons.
+
+    :raises: None
+
+    :return: Atlas path.
+    :rtype: str
+    """
+    rows = (len(ICON_NAMES) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+    atlas = QtGui.QImage(ATLAS_COLUMNS * ICON_SIZE,
+                         rows * ICON_SIZE,
+                         QtGui.QImage.Format_ARGB32)
+    atlas.fill(QtCore.Qt.transparent)
+
+    painter = QtGui.QPainter(atlas)
+
+    for index, iconName in enumerate(ICON_NAMES):
+        painter.drawImage(
+            (index % ATLAS_COLUMNS) * ICON_SIZE,
+            (index // ATLAS_COLUMNS) * ICON_SIZE,
+            QtGui.QImage(os.path.join(
+                this_package, "icons", iconName + ".png")))
+
+    painter.end()
+
+    path = os.path.join(this_package, "icons", "atlas.png")
+    atlas.save(path)
+
+    return path
+
+
+def has_offset_parent():
+    """
+    Checks if this Maya has offsetParentMatrix on transforms.
+
+    :raises: None
+
+    :return: True from Maya 2020.
+    :rtype: bool
+    """
+    return int(cmds.about(apiVersion=True)) >= OFFSET_PARENT_API_VERSION
+
 
 def get_maya_window():
     """
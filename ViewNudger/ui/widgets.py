@@ -22,15 +22,30 @@ class IconButton(QtGui.QLabel):
     def __init__(self, icon, icon_hover, *args, **kwargs):
         super(IconButton, self).__init__(*args, **kwargs)
 
+        self.normal = self.load(icon)
+        self.hover = self.load(icon_hover)
+        self.hovering = False
+        self.setPixmap(self.normal)
+
+    def load(self, icon):
+        """
+        Gets a pixmap from a pixmap or an image path.
+
+        :param icon: Pixmap or image path.
+        :type icon: QtGui.QPixmap or str
+
+        :raises: None
+
+        :return: Pixmap.
+        :rtype: QtGui.QPixmap
+        """
+        if isinstance(icon, QtGui.QPixmap):
+            return icon
+
         if icon not in self.cache:
             self.cache[icon] = QtGui.QPixmap(QtGui.QImage(icon))
-        if icon_hover not in self.cache:
-            self.cache[icon_hover] = QtGui.QPixmap(QtGui.QImage(icon_hover))
 
-        self.normal = self.cache[icon]
-        self.hover = self.cache[icon_hover]
-        self.hovering = False
-        self.setPixmap(self.normal)
+        return self.cache[icon]
 
     def mousePressEvent(self, event):
 
@@ -136,3 +151,20 @@ class DoubleSpinBox(QtGui.QDoubleSpinBox):
         self.setMaximum(100000)
         self.setMinimum(0.0)
         self.setValue(value)
+
+
+class ComboBox(QtGui.QComboBox):
+    '''
+    :class:`ComboBox` deals with building a QComboBox.
+
+    :raises: None
+
+    :return: None
+    :rtype: NoneType
+    '''
+    def __init__(self, name, items, parent=None):
+        super(ComboBox, self).__init__(parent)
+        self.setObjectName(name + "_CMBOX")
+
+        for label, data in items:
+            self.addItem(label, data)
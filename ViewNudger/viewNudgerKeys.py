@@ -0,0 +1,41 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Maya plugin registering the undoable command behind
+:func:`ViewNudger.keys.setKeys`. Loaded by
+:func:`ViewNudger.keys.loadPlugin`.
+"""
+
+from maya import OpenMayaMPx
+
+from ViewNudger import keys
+
+
+class SetKeysCommand(OpenMayaMPx.MPxCommand):
+    """
+    Runs the waiting :class:`ViewNudger.keys.KeyEdit` as one undo step.
+    """
+    def doIt(self, args):
+        self.edit = keys.take()
+        self.edit.doIt()
+
+    def undoIt(self):
+        self.edit.undoIt()
+
+    def redoIt(self):
+        self.edit.redoIt()
+
+    def isUndoable(self):
+        return True
+
+
+def creator():
+    return OpenMayaMPx.asMPxPtr(SetKeysCommand())
+
+
+def initializePlugin(plugin):
+    OpenMayaMPx.MFnPlugin(plugin).registerCommand(keys.COMMAND, creator)
+
+
+def uninitializePlugin(plugin):
+    OpenMayaMPx.MFnPlugin(plugin).deregisterCommand(keys.COMMAND)
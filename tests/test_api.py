@@ -0,0 +1,189 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import numpy
+
+from ViewNudger import api
+from ViewNudger import corpus
+from ViewNudger import projection
+from ViewNudger.history import NudgeHistory
+from ViewNudger.scheduler import Scheduler
+
+
+class Scene(object):
+    """
+    Stands in for maya.cmds with a hierarchy of translate only transforms,
+    enough for the batch nudges.
+    """
+    def __init__(self, paths, positions):
+        self.paths = paths
+        self.local = {}
+        self.undoState = True
+        self.chunks = 0
+        self.undoable = []
+
+        for path, position in zip(paths, positions):
+            self.xform(path, translation=position, worldSpace=True)
+
+    def _path(self, name):
+        if name.startswith("|"):
+            return name
+        return [path for path in self.paths
+                if path.split("|")[-1] == name][0]
+
+    def world(self, name):
+        parts = self._path(name).split("|")
+        return sum((self.local.get("|".join(parts[:depth]), numpy.zeros(3))
+                    for depth in range(2, len(parts) + 1)),
+                   numpy.zeros(3))
+
+    def ls(self, names, long=False):
+        if not isinstance(names, list):
+            names = [names]
+        return [self._path(name) for name in names]
+
+    def xform(self, names, query=False, worldSpace=False, translation=None,
+              matrix=None, relative=False):
+        if query:
+            if not isinstance(names, list):
+                names = [names]
+
+            result = []
+            for name in names:
+                world = self.world(name).tolist()
+                if matrix:
+                    result.extend([1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0] +
+                                  world + [1])
+                else:
+                    result.extend(world)
+            return result
+
+        path = self._path(names)
+        if matrix is not None:
+            translation = matrix[12:15]
+
+        translation = numpy.asarray(translation, dtype=float)
+        if relative:
+            translation = translation + self.world(path)
+
+        self.local[path] = self.local.get(path, numpy.zeros(3)) + \
+            translation - self.world(path)
+
+        if self.undoState and self.chunks:
+            self.undoable.append((path, self.world(path)))
+
+    def undoInfo(self, query=False, state=None, stateWithoutFlush=None,
+                 openChunk=False, closeChunk=False):
+        if query:
+            return self.undoState
+        if stateWithoutFlush is not None:
+            self.undoState = stateWithoutFlush
+        if openChunk:
+            self.chunks += 1
+        if closeChunk:
+            self.chunks -= 1
+
+
+class TestBatchNudge(unittest.TestCase):
+
+    pixelAmount = [10.0, 0.0]
+
+    def setUp(self):
+        self.state = corpus.setupState(corpus.generate()[0])
+
+        cameraPoint = numpy.asarray(self.state.cameraPoint)
+        cameraDir = numpy.asarray(self.state.cameraDir)
+        parent = cameraPoint + cameraDir * 10.0
+        child = cameraPoint + cameraDir * 30.0
+
+        # The child is selected, and so written, first.
+        self.names = ["C", "P"]
+        self.scene = Scene(["|P", "|P|C"], [parent, child])
+
+        self.before = self.screen()
+
+        patches = [
+            mock.patch.object(api, "cmds", self.scene, create=True),
+            mock.patch.object(api, "parseArgs", lambda *a, **k: None),
+            mock.patch.object(api, "getRenderer",
+                              lambda view: "vp2Renderer"),
+            mock.patch.object(api, "getViewState", lambda view: self.state),
+            mock.patch.object(api, "history", NudgeHistory()),
+        ]
+
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def screen(self):
+        points = numpy.array([self.scene.world(name) for name in self.names])
+        return projection.worldToScreenArray(self.state, points)[0]
+
+    def assertNudged(self):
+        numpy.testing.assert_allclose(self.screen() - self.before,
+                                      [self.pixelAmount] * 2,
+                                      atol=1e-6)
+
+    def test_nudge_objects(self):
+        api.nudgeObjects(self.names, pixelAmount=self.pixelAmount)
+
+        self.assertNudged()
+
+    def test_nudge_objects_per_row(self):
+        amounts = [[10.0, 0.0], [-4.0, 6.0]]
+        api.nudgeObjects(self.names, pixelAmount=amounts)
+
+        numpy.testing.assert_allclose(self.screen() - self.before,
+                                      amounts,
+                                      atol=1e-6)
+
+    def test_pipelined_moves_children_once(self):
+        api.nudgeObjectsPipelined(self.names,
+                                  pixelAmount=self.pixelAmount,
+                                  chunkSize=1)
+
+        self.assertNudged()
+
+    def test_job_writes_parents_first(self):
+        scheduler = Scheduler()
+        scheduler.submit(api.nudgeObjectsJob(self.names,
+                                             pixelAmount=self.pixelAmount,
+                                             chunkSize=1),
+                         start=False)
+        scheduler.run()
+
+        self.assertNudged()
+
+    def test_job_is_one_undo_step(self):
+        job = api.nudgeObjectsJob(self.names,
+                                  pixelAmount=self.pixelAmount,
+                                  chunkSize=1)
+        Scheduler().submit(job, start=False)
+
+        job.step()
+        self.assertEqual(self.scene.undoable, [])
+
+        while job.step():
+            pass
+
+        # Only the final write is undoable, and it lands the nudge.
+        self.assertEqual(sorted(path for path, world in
+                                self.scene.undoable), ["|P", "|P|C"])
+        for path, world in self.scene.undoable:
+            numpy.testing.assert_allclose(world, self.scene.world(path))
+
+        self.assertTrue(self.scene.undoState)
+        self.assertEqual(self.scene.chunks, 0)
+        self.assertEqual(api.history.count("C"), 1)
+        self.assertNudged()
+
+
+if __name__ == '__main__':
+    unittest.main()
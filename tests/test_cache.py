@@ -0,0 +1,58 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from ViewNudger import cache
+
+
+class Camera(object):
+    """
+    Stands in for maya.cmds with one camera shape.
+    """
+    def __init__(self, **values):
+        self.values = dict((attr, default)
+                           for attr, default in cache.UNSUPPORTED_ATTRS)
+        self.values.update(panZoomEnabled=False, shakeEnabled=False,
+                           horizontalPan=0.0, verticalPan=0.0, zoom=1.0,
+                           horizontalShake=0.0, verticalShake=0.0)
+        self.values.update(values)
+
+    def listRelatives(self, camera, **kwargs):
+        return ["|camera1|cameraShape1"]
+
+    def getAttr(self, plug, time=None):
+        return self.values[plug.rpartition(".")[2]]
+
+
+class TestCheckCamera(unittest.TestCase):
+
+    def check(self, **values):
+        with mock.patch.object(cache, "cmds", Camera(**values), create=True):
+            cache.checkCamera("|camera1", 1)
+
+    def test_defaults(self):
+        self.check()
+
+    def test_film_offset(self):
+        with self.assertRaises(RuntimeError):
+            self.check(horizontalFilmOffset=0.1)
+
+    def test_lens_squeeze(self):
+        with self.assertRaises(RuntimeError):
+            self.check(lensSqueezeRatio=2.0)
+
+    def test_pan_zoom_only_when_enabled(self):
+        self.check(zoom=0.5)
+
+        with self.assertRaises(RuntimeError):
+            self.check(zoom=0.5, panZoomEnabled=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
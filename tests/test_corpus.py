@@ -0,0 +1,19 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ViewNudger import corpus
+
+
+class TestCorpus(unittest.TestCase):
+
+    def test_backends_match_corpus(self):
+        report = corpus.check(["numpy", "python"], repeat=1, bulkSize=100)
+
+        for name in ("numpy", "python"):
+            self.assertTrue(report[name]["passed"], report[name]["failures"])
+
+
+if __name__ == '__main__':
+    unittest.main()
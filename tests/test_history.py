@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ViewNudger.history import NudgeHistory
+
+
+def matrix(x):
+    return [1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            x, 0.0, 0.0, 1.0]
+
+
+class TestNudgeHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.history = NudgeHistory(size=3)
+
+        for x in range(4):
+            self.history.record(["a"], [matrix(x)], [matrix(x + 1)])
+
+    def test_keeps_size(self):
+        self.assertEqual(self.history.count("a"), 3)
+        self.assertEqual(self.history.latest("a"), matrix(4))
+
+    def test_revert(self):
+        names, matrices = self.history.revert(["a", "b"])
+
+        self.assertEqual(names, ["a"])
+        self.assertEqual(matrices, [matrix(3)])
+        self.assertEqual(self.history.count("a"), 2)
+
+    def test_revert_past_oldest(self):
+        names, matrices = self.history.revert(["a"], count=10)
+
+        self.assertEqual(matrices, [matrix(1)])
+        self.assertEqual(self.history.count("a"), 0)
+        self.assertEqual(self.history.revert(["a"]), ([], []))
+
+    def test_reset(self):
+        self.assertEqual(self.history.reset(["a"]), (["a"], [matrix(1)]))
+
+    def test_revert_non_positive(self):
+        for count in (0, -1):
+            self.assertRaises(ValueError,
+                              self.history.revert, ["a"], count=count)
+
+        self.assertEqual(self.history.count("a"), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
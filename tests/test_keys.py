@@ -0,0 +1,23 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ViewNudger import keys
+
+
+class TestRuns(unittest.TestCase):
+
+    def test_runs(self):
+        mask = [True, True, False, True, False, False, True]
+        self.assertEqual(keys.runs(mask), [(0, 2), (3, 4), (6, 7)])
+
+    def test_all_keyed(self):
+        self.assertEqual(keys.runs([True] * 4), [(0, 4)])
+
+    def test_none_keyed(self):
+        self.assertEqual(keys.runs([False] * 4), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy
+
+from ViewNudger import cache
+from ViewNudger import pipeline
+from ViewNudger import projection
+
+
+def translation(point):
+    matrix = numpy.identity(4)
+    matrix[3, :3] = point
+    return matrix
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_matches_serial(self):
+        chunks = pipeline.chunkRanges(1000, 64)
+        solve = lambda chunk, data: data * 2.0
+
+        source = numpy.arange(1000.0)
+        result = numpy.zeros(1000)
+
+        def read(chunk):
+            return source[chunk[0]:chunk[1]]
+
+        def write(chunk, value):
+            result[chunk[0]:chunk[1]] = value
+
+        pipeline.Pipeline(solve, workers=3, depth=2).run(chunks, read, write)
+
+        numpy.testing.assert_allclose(result, source * 2.0)
+
+    def test_error_stops_workers(self):
+        def solve(chunk, data):
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            pipeline.Pipeline(solve).run(range(10),
+                                         lambda chunk: chunk,
+                                         lambda chunk, result: None)
+
+
+class TestFrameSolver(unittest.TestCase):
+
+    pixelAmount = [12.0, -7.0]
+
+    def setUp(self):
+        self.scene = pipeline.MockFrames(50, 3, readCost=0, writeCost=0)
+        self.solve = pipeline.frameSolver(self.pixelAmount,
+                                          self.scene.width,
+                                          self.scene.height,
+                                          projection.DEPTH_VIEW)
+
+    def state(self, index):
+        return cache.frameViewState(self.scene.cameraMatrices[index],
+                                    self.scene.width,
+                                    self.scene.height)
+
+    def test_nudges_on_frame(self):
+        chunk = (2, 3)
+        cameraMatrices, worlds, matrices, translates = \
+            self.scene.read(chunk)
+
+        valid, result = self.solve(chunk, (cameraMatrices,
+                                           worlds,
+                                           matrices,
+                                           translates))
+        self.assertTrue(valid.all())
+
+        # Put the new translates back through each parent space.
+        spaces = self.scene.spaces
+        points = numpy.einsum("ni,nij->nj", result, spaces[:, :3, :3]) + \
+            spaces[:, 3, :3]
+
+        state = self.state(2)
+        before, depth = projection.worldToScreenArray(state, worlds[:, 3, :3])
+        after, newDepth = projection.worldToScreenArray(state, points)
+
+        numpy.testing.assert_allclose(after - before,
+                                      [self.pixelAmount] * 50,
+                                      atol=1e-6)
+
+    def test_child_of_nudged_parent(self):
+        chunk = (0, 1)
+        cameraMatrices = self.scene.cameraMatrices[0]
+        state = self.state(0)
+
+        center = state.cameraPoint + state.cameraDir * 30.0
+        parent = translation(center)
+        child = translation([1.0, 2.0, 0.5])
+
+        worlds = numpy.array([parent, child.dot(parent)])
+        matrices = numpy.array([parent, child])
+        translates = numpy.array([parent[3, :3], child[3, :3]])
+        data = (cameraMatrices, worlds, matrices, translates)
+
+        valid, alone = self.solve(chunk, data)
+
+        solve = pipeline.frameSolver(self.pixelAmount,
+                                     self.scene.width,
+                                     self.scene.height,
+                                     projection.DEPTH_VIEW,
+                                     hierarchy=(numpy.array([1]),
+                                                numpy.array([0])))
+        valid, result = solve(chunk, data)
+
+        # The parent moves the child, which lands where it would alone.
+        newParent = translation(result[0])
+        newChild = translation(result[1]).dot(newParent)
+
+        numpy.testing.assert_allclose(newChild[3, :3],
+                                      alone[1] + center,
+                                      atol=1e-9)
+        numpy.testing.assert_allclose(result[0], alone[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy
+
+from ViewNudger import corpus
+from ViewNudger import projection
+
+
+class TestSolveDepth(unittest.TestCase):
+
+    def setUp(self):
+        self.state = corpus.setupState(corpus.generate()[0])
+
+        # Points in front of the camera, along its view axis.
+        cameraPoint = numpy.asarray(self.state.cameraPoint)
+        cameraDir = numpy.asarray(self.state.cameraDir)
+        self.points = cameraPoint + numpy.outer([5.0, 20.0, 80.0], cameraDir)
+
+        screen, depth = projection.worldToScreenArray(self.state,
+                                                      self.points)
+        self.screen = screen + [30.0, -12.0]
+
+    def solve(self, mode, plane=None):
+        result = projection.solveDepth(self.state,
+                                       self.screen,
+                                       self.points,
+                                       mode=mode,
+                                       plane=plane)
+
+        screen, _ = projection.worldToScreenArray(self.state, result)
+        numpy.testing.assert_allclose(screen, self.screen, atol=1e-6)
+
+        return result
+
+    def test_distance(self):
+        result = self.solve(projection.DEPTH_DISTANCE)
+
+        numpy.testing.assert_allclose(
+            numpy.linalg.norm(result - self.state.cameraPoint, axis=1),
+            numpy.linalg.norm(self.points - self.state.cameraPoint, axis=1))
+
+    def test_view(self):
+        result = self.solve(projection.DEPTH_VIEW)
+
+        _, before = projection.worldToScreenArray(self.state, self.points)
+        _, after = projection.worldToScreenArray(self.state, result)
+        numpy.testing.assert_allclose(after, before)
+
+    def test_plane(self):
+        # A plane through the middle point facing the camera.
+        plane = (self.points[1], self.state.cameraDir)
+        result = self.solve(projection.DEPTH_PLANE, plane=plane)
+
+        numpy.testing.assert_allclose(
+            (result - self.points[1]).dot(self.state.cameraDir), 0.0,
+            atol=1e-6)
+
+    def test_unknown_mode(self):
+        self.assertRaises(ValueError, projection.solveDepth,
+                          self.state, self.screen, self.points, mode="none")
+
+
+class TestSolveScreenSize(unittest.TestCase):
+
+    def setUp(self):
+        self.state = corpus.setupState(corpus.generate()[0])
+
+        # A 1x1x4 box about 10 units in front of the camera.
+        cameraPoint = numpy.asarray(self.state.cameraPoint)
+        cameraDir = numpy.asarray(self.state.cameraDir)
+        center = cameraPoint + cameraDir * 10.0
+        self.corners = projection.boxCorners(
+            numpy.concatenate([center - [0.5, 0.5, 2.0],
+                               center + [0.5, 0.5, 2.0]]))
+
+    def size(self, points):
+        bounds = projection.screenBounds(self.state, points)
+        return bounds[3] - bounds[1]
+
+    def test_dolly(self):
+        size = self.size(self.corners)
+        cameraDir = numpy.asarray(self.state.cameraDir)
+
+        for pixels in (20.0, 100.0, -30.0):
+            t = projection.solveScreenSize(
+                self.state, self.corners, -cameraDir, size + pixels)
+
+            self.assertAlmostEqual(
+                self.size(self.corners - t * cameraDir), size + pixels, 6)
+
+    def test_scale(self):
+        size = self.size(self.corners)
+        center = self.corners.mean(axis=0)
+
+        for pixels in (20.0, 100.0, -30.0):
+            t = projection.solveScreenSize(
+                self.state, self.corners, self.corners - center,
+                size + pixels)
+
+            self.assertAlmostEqual(
+                self.size(center + (1.0 + t) * (self.corners - center)),
+                size + pixels, 6)
+
+    def test_unreachable(self):
+        # A dolly can't shrink the box to nothing.
+        self.assertRaises(ValueError, projection.solveScreenSize,
+                          self.state, self.corners,
+                          -numpy.asarray(self.state.cameraDir), 0.0)
+
+
+
+class TestScreenReport(unittest.TestCase):
+
+    def setUp(self):
+        self.state = corpus.setupState(corpus.generate()[0])
+
+        # In frame, 10 px inside the left edge, 40 px past the right edge
+        # and 30 px above the top, then one behind the camera.
+        self.pixels = numpy.array([[960.0, 540.0],
+                                   [10.0, 300.0],
+                                   [1960.0, 500.0],
+                                   [700.0, -30.0]])
+        self.distances = numpy.array([20.0, 30.0, 40.0, 50.0])
+
+        inFront = projection.screenToWorldArray(self.state,
+                                                self.pixels,
+                                                self.distances)
+        behind = numpy.asarray(self.state.cameraPoint) - \
+            numpy.asarray(self.state.cameraDir) * 10.0
+        self.points = numpy.vstack([inFront, behind])
+
+    def test_classify(self):
+        report = projection.screenReportArrays(self.state, self.points)
+
+        numpy.testing.assert_array_equal(report["behind"],
+                                         [False] * 4 + [True])
+        numpy.testing.assert_array_equal(report["inFrame"],
+                                         [True, True, False, False, False])
+        numpy.testing.assert_allclose(report["edgeDistance"],
+                                      [540.0, 10.0, -40.0, -30.0, -numpy.inf],
+                                      atol=1e-6)
+        numpy.testing.assert_allclose(report["screen"][:4], self.pixels,
+                                      atol=1e-6)
+        numpy.testing.assert_allclose(report["distance"],
+                                      [20.0, 30.0, 40.0, 50.0, 10.0],
+                                      atol=1e-6)
+        self.assertLess(report["depth"][4], 0.0)
+        self.assertTrue(report["mask"].all())
+
+    def test_region(self):
+        # Covers a bit over the left half of the frame and past its top.
+        report = projection.screenReportArrays(self.state,
+                                               self.points,
+                                               region=[0, -100, 1000, 1080])
+
+        numpy.testing.assert_array_equal(report["mask"],
+                                         [True, True, False, True, False])
+        numpy.testing.assert_allclose(report["screen"],
+                                      self.pixels[[0, 1, 3]],
+                                      atol=1e-6)
+        numpy.testing.assert_array_equal(report["inFrame"],
+                                         [True, True, False])
+        self.assertFalse(report["behind"].any())
+
+
+class TestAlignTargets(unittest.TestCase):
+
+    def setUp(self):
+        self.screen = numpy.array([[12.0, 47.0],
+                                   [103.0, 9.0],
+                                   [-26.0, 61.0]])
+
+        # The first point is behind the camera.
+        self.valid = numpy.array([False, True, True])
+
+    def targets(self, **kwargs):
+        return projection.alignTargets(self.screen, self.valid, **kwargs)
+
+    def test_snap_to_grid(self):
+        numpy.testing.assert_allclose(
+            projection.snapToGrid([-26.0, 12.0, 103.0, 47.0], 25.0),
+            [-25.0, 0.0, 100.0, 50.0])
+
+    def test_grid(self):
+        numpy.testing.assert_allclose(self.targets(grid=10.0),
+                                      [[10.0, 50.0],
+                                       [100.0, 10.0],
+                                       [-30.0, 60.0]])
+
+    def test_pixel(self):
+        numpy.testing.assert_allclose(self.targets(pixel=[320.0, 240.0],
+                                                   grid=10.0),
+                                      [[320.0, 240.0]] * 3)
+
+    def test_row(self):
+        # Anchored on the first point in front of the camera.
+        numpy.testing.assert_allclose(self.targets(axis="row"),
+                                      [[12.0, 9.0],
+                                       [103.0, 9.0],
+                                       [-26.0, 9.0]])
+
+    def test_column_pixel_grid(self):
+        numpy.testing.assert_allclose(self.targets(axis="column",
+                                                   pixel=[37.0, 0.0],
+                                                   grid=25.0),
+                                      [[25.0, 47.0],
+                                       [25.0, 9.0],
+                                       [25.0, 61.0]])
+
+    def test_bad_grid(self):
+        for grid in (0.0, -5.0):
+            self.assertRaises(ValueError, projection.snapToGrid,
+                              self.screen, grid)
+            self.assertRaises(ValueError, self.targets, grid=grid)
+            self.assertRaises(ValueError, self.targets,
+                              axis="row", grid=grid)
+
+    def test_bad_arguments(self):
+        self.assertRaises(ValueError, self.targets)
+        self.assertRaises(ValueError, self.targets, axis="depth", grid=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ViewNudger.scheduler import Job, Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.done = []
+        self.rolledBack = []
+
+    def job(self, total=5, fail=None):
+        def steps():
+            for index in range(total):
+                if index == fail:
+                    raise RuntimeError("failed")
+                self.done.append(index)
+                yield index + 1
+
+        return Job(steps(), total,
+                   rollback=lambda: self.rolledBack.append(len(self.done)))
+
+    def test_run(self):
+        scheduler = Scheduler()
+        job = scheduler.submit(self.job(), start=False)
+
+        progress = []
+        job.progressCallbacks.append(lambda job: progress.append(job.done))
+
+        scheduler.run()
+
+        self.assertEqual(self.done, list(range(5)))
+        self.assertEqual(progress, [1, 2, 3, 4, 5])
+        self.assertTrue(job.finished)
+        self.assertFalse(job.cancelled)
+        self.assertEqual(job.progress, 1.0)
+        self.assertEqual(scheduler.jobs, [])
+
+    def test_cancel_rolls_back(self):
+        scheduler = Scheduler()
+        job = scheduler.submit(self.job(), start=False)
+
+        finished = []
+        job.finishedCallbacks.append(finished.append)
+
+        job.step()
+        job.step()
+        scheduler.cancel(job)
+
+        self.assertTrue(job.cancelled)
+        self.assertEqual(self.rolledBack, [2])
+        self.assertEqual(finished, [job])
+        self.assertEqual(scheduler.jobs, [])
+
+    def test_error_rolls_back(self):
+        scheduler = Scheduler()
+        job = scheduler.submit(self.job(fail=3), start=False)
+
+        scheduler.run()
+
+        self.assertTrue(job.cancelled)
+        self.assertIsInstance(job.error, RuntimeError)
+        self.assertEqual(self.rolledBack, [3])
+
+    def test_cancel_finished(self):
+        scheduler = Scheduler()
+        job = scheduler.submit(self.job(), start=False)
+
+        scheduler.run()
+        job.cancel()
+
+        self.assertFalse(job.cancelled)
+        self.assertEqual(self.rolledBack, [])
+
+    def test_busy(self):
+        scheduler = Scheduler()
+        self.assertFalse(scheduler.busy)
+
+        job = scheduler.submit(self.job(), start=False)
+        job.step()
+        self.assertTrue(scheduler.busy)
+
+        scheduler.run()
+        self.assertFalse(scheduler.busy)
+
+
+if __name__ == '__main__':
+    unittest.main()
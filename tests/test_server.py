@@ -0,0 +1,115 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from ViewNudger import server
+
+
+class TestFrames(unittest.TestCase):
+
+    def test_round_trip(self):
+        buffer = bytearray(server.encode("pSphere1", 1.5, -2.0,
+                                         server.MODE_OBJECT) +
+                           server.encode("", 3.0, 0.0))
+
+        self.assertEqual(server.decode(buffer),
+                         [("pSphere1", 1.5, -2.0, server.MODE_OBJECT),
+                          ("", 3.0, 0.0, server.MODE_VIEW)])
+        self.assertEqual(len(buffer), 0)
+
+    def test_partial_frame(self):
+        frame = server.encode("pCube1", 1.0, 1.0)
+        buffer = bytearray(frame + frame[:-2])
+
+        self.assertEqual(len(server.decode(buffer)), 1)
+        self.assertEqual(buffer, bytearray(frame[:-2]))
+
+        buffer.extend(frame[-2:])
+        self.assertEqual(server.decode(buffer),
+                         [("pCube1", 1.0, 1.0, server.MODE_VIEW)])
+
+    def test_malformed_name(self):
+        good = server.encode("a", 1.0, 1.0)
+        bad = server.HEADER.pack(server.MODE_VIEW, 1.0, 1.0, 2) + b"\xff\xfe"
+        buffer = bytearray(good + bad)
+
+        self.assertRaises(ValueError, server.decode, buffer)
+        self.assertEqual(buffer, bytearray(bad))
+
+    def test_unknown_mode(self):
+        buffer = bytearray(server.encode("a", 1.0, 1.0, mode=7) +
+                           server.encode("b", 1.0, 1.0))
+
+        self.assertEqual(server.decode(buffer),
+                         [("b", 1.0, 1.0, server.MODE_VIEW)])
+        self.assertEqual(len(buffer), 0)
+
+    def test_not_finite(self):
+        buffer = bytearray(server.encode("a", float("nan"), 1.0) +
+                           server.encode("b", 1.0, float("inf")) +
+                           server.encode("c", float("-inf"), 1.0) +
+                           server.encode("d", 2.0, 1.0))
+
+        self.assertEqual(server.decode(buffer),
+                         [("d", 2.0, 1.0, server.MODE_VIEW)])
+        self.assertEqual(len(buffer), 0)
+
+    def test_coalesce(self):
+        pending = server.coalesce([("a", 1.0, 2.0, server.MODE_VIEW),
+                                   ("b", 1.0, 0.0, server.MODE_VIEW),
+                                   ("a", 1.0, 2.0, server.MODE_OBJECT)])
+        server.coalesce([("a", 0.5, 0.5, server.MODE_VIEW)], pending)
+
+        self.assertEqual(list(pending.items()),
+                         [(("a", server.MODE_VIEW), [1.5, 2.5]),
+                          (("b", server.MODE_VIEW), [1.0, 0.0]),
+                          (("a", server.MODE_OBJECT), [1.0, 2.0])])
+
+
+
+class TestApplyNudges(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(server, "api")
+        self.api = patch.start()
+        self.addCleanup(patch.stop)
+
+        self.api.getSelection.return_value = "a"
+        self.api.isPointNode.return_value = False
+
+    def test_objects_in_one_call(self):
+        server.applyNudges(server.coalesce([
+            ("a", 1.0, 2.0, server.MODE_OBJECT),
+            ("b", 3.0, 0.0, server.MODE_OBJECT),
+            ("", 1.0, 1.0, server.MODE_OBJECT),
+            ("c", 1.0, 0.0, server.MODE_VIEW)]))
+
+        # The selection is "a", so its nudge adds to the named one.
+        self.api.nudgeObjects.assert_called_once_with(
+            ["a", "b"], pixelAmount=[[2.0, 3.0], [3.0, 0.0]])
+        self.api.nudge.assert_called_once_with("c",
+                                               pixelAmount=[1.0, 0.0],
+                                               moveObject=False,
+                                               rotateView=False)
+
+    def test_points_nudged_alone(self):
+        self.api.isPointNode.side_effect = lambda name: name == "particle1"
+
+        server.applyNudges(server.coalesce([
+            ("particle1", 1.0, 2.0, server.MODE_OBJECT)]))
+
+        self.assertFalse(self.api.nudgeObjects.called)
+        self.api.nudge.assert_called_once_with("particle1",
+                                               pixelAmount=[1.0, 2.0],
+                                               moveObject=True,
+                                               rotateView=False)
+
+
+if __name__ == '__main__':
+    unittest.main()